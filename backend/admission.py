@@ -0,0 +1,235 @@
+import os
+import time
+import uuid
+import asyncio
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, asynccontextmanager
+
+
+class WaitingRoomFull(Exception):
+    """Raised when the waiting room cannot take another candidate."""
+
+
+class AdmissionController:
+    """Caps concurrently active interviews and LLM-bound start requests.
+
+    An interview holds an active slot from start until its overall summary is requested or
+    it sees no activity for INTERVIEW_IDLE_SECONDS. When all MAX_ACTIVE_INTERVIEWS slots are
+    taken, start requests get a ticket in a FIFO waiting room instead. Tickets are promoted
+    in order as slots free up, and an admitted ticket keeps its slot reserved for
+    WAITING_TICKET_TTL_SECONDS so the candidate can start. Tickets that stop polling for
+    that long are dropped. New arrivals never overtake waiting tickets.
+
+    Independently, at most MAX_LLM_REQUESTS start requests run LLM calls at once; requests
+    that cannot get an LLM slot within LLM_SLOT_WAIT_SECONDS use fallback content.
+    """
+
+    def __init__(self, max_active=None, max_llm=None, max_waiting=None, idle_seconds=None, ticket_ttl=None, llm_wait=None):
+        self.max_active = max_active or int(os.getenv('MAX_ACTIVE_INTERVIEWS', '200'))
+        self.max_llm = max_llm or int(os.getenv('MAX_LLM_REQUESTS', '32'))
+        self.max_waiting = max_waiting or int(os.getenv('WAITING_ROOM_SIZE', '5000'))
+        self.idle_seconds = idle_seconds or float(os.getenv('INTERVIEW_IDLE_SECONDS', '1800'))
+        self.ticket_ttl = ticket_ttl or float(os.getenv('WAITING_TICKET_TTL_SECONDS', '30'))
+        self.llm_wait = llm_wait if llm_wait is not None else float(os.getenv('LLM_SLOT_WAIT_SECONDS', '5'))
+
+        self._lock = threading.Lock()
+        # interview_id -> last activity, least recently active first
+        self._active = OrderedDict()
+        # ticket_id -> [sequence number, last poll], oldest ticket first
+        self._waiting = OrderedDict()
+        # ticket_id -> time of admission, for tickets holding a reserved slot
+        self._admitted = {}
+        self._next_seq = 0
+        self._last_sweep = time.monotonic()
+        # Smoothed seconds between slot releases; until measured, assume idle timeouts spread evenly
+        self._release_interval = self.idle_seconds / self.max_active
+        self._last_release = None
+
+        self._llm = threading.BoundedSemaphore(self.max_llm)
+        self._llm_in_flight = 0
+
+    def _expire(self, now):
+        # Callers hold self._lock
+        while self._active:
+            interview_id, last_seen = next(iter(self._active.items()))
+            if now - last_seen < self.idle_seconds:
+                break
+            self._release(interview_id, now)
+
+        for ticket_id, admitted_at in list(self._admitted.items()):
+            if now - admitted_at > self.ticket_ttl:
+                del self._admitted[ticket_id]
+
+        # Abandoned tickets anywhere in the queue are swept at most once per TTL
+        if now - self._last_sweep > self.ticket_ttl:
+            self._last_sweep = now
+            for ticket_id, (_, last_poll) in list(self._waiting.items()):
+                if now - last_poll > self.ticket_ttl:
+                    del self._waiting[ticket_id]
+
+    def _promote(self, now):
+        # Callers hold self._lock
+        while self._waiting and len(self._active) + len(self._admitted) < self.max_active:
+            ticket_id, (_, last_poll) = self._waiting.popitem(last=False)
+            if now - last_poll <= self.ticket_ttl:
+                self._admitted[ticket_id] = now
+
+    def _release(self, interview_id, now):
+        # Callers hold self._lock
+        if self._active.pop(interview_id, None) is None:
+            return
+        if self._last_release is not None:
+            self._release_interval = 0.8 * self._release_interval + 0.2 * (now - self._last_release)
+        self._last_release = now
+
+    def _ticket_status(self, ticket_id):
+        # Callers hold self._lock
+        if ticket_id in self._admitted:
+            return {"status": "admitted", "ticket_id": ticket_id}
+        seq = self._waiting[ticket_id][0]
+        head_seq = next(iter(self._waiting.values()))[0]
+        # Sequence distance to the head; an upper bound, since tickets ahead may have left
+        position = seq - head_seq + 1
+        return {
+            "status": "waiting",
+            "ticket_id": ticket_id,
+            "position": position,
+            "estimated_wait_seconds": round(position * self._release_interval, 1)
+        }
+
+    def admit(self, interview_id, ticket_id=None):
+        """Give interview_id an active slot, or a place in the waiting room.
+
+        Returns None when admitted, otherwise the ticket status to send to the client.
+        Raises WaitingRoomFull when the waiting room is full as well.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._promote(now)
+
+            if ticket_id is not None and self._admitted.pop(ticket_id, None) is not None:
+                self._active[interview_id] = now
+                return None
+
+            if ticket_id in self._waiting:
+                self._waiting[ticket_id][1] = now
+                return self._ticket_status(ticket_id)
+
+            if not self._waiting and len(self._active) + len(self._admitted) < self.max_active:
+                self._active[interview_id] = now
+                return None
+
+            if len(self._waiting) >= self.max_waiting:
+                raise WaitingRoomFull()
+
+            ticket_id = str(uuid.uuid4())
+            self._waiting[ticket_id] = [self._next_seq, now]
+            self._next_seq += 1
+            return self._ticket_status(ticket_id)
+
+    def poll(self, ticket_id):
+        """Current status of a ticket, or None if it is unknown or expired."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._promote(now)
+            if ticket_id in self._waiting:
+                self._waiting[ticket_id][1] = now
+            elif ticket_id not in self._admitted:
+                return None
+            return self._ticket_status(ticket_id)
+
+    def touch(self, interview_id):
+        """Record activity on an interview so it is not released as idle."""
+        with self._lock:
+            if interview_id in self._active:
+                self._active[interview_id] = time.monotonic()
+                self._active.move_to_end(interview_id)
+
+    def release(self, interview_id):
+        """Free the slot of a finished interview."""
+        with self._lock:
+            now = time.monotonic()
+            self._release(interview_id, now)
+            self._promote(now)
+
+    @contextmanager
+    def starting(self, interview_id):
+        """Give interview_id's slot back if the start in the block fails or is cancelled.
+
+        Otherwise a start that never reaches the candidate would hold its slot for the
+        whole idle window while the waiting room stalls.
+        """
+        try:
+            yield
+        except BaseException:
+            self.release(interview_id)
+            raise
+
+    def acquire_llm_slot(self, timeout=None):
+        """Take one of the MAX_LLM_REQUESTS slots within `timeout` (LLM_SLOT_WAIT_SECONDS by default).
+
+        Returns whether a slot was taken; a taken slot is given back with release_llm_slot.
+        """
+        acquired = self._llm.acquire(timeout=self.llm_wait if timeout is None else timeout)
+        if acquired:
+            with self._lock:
+                self._llm_in_flight += 1
+        return acquired
+
+    async def acquire_llm_slot_async(self, timeout=None):
+        """acquire_llm_slot for coroutines; polls for a free slot instead of blocking the event loop."""
+        deadline = time.monotonic() + (self.llm_wait if timeout is None else timeout)
+        acquired = self._llm.acquire(blocking=False)
+        while not acquired and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+            acquired = self._llm.acquire(blocking=False)
+        if acquired:
+            with self._lock:
+                self._llm_in_flight += 1
+        return acquired
+
+    def release_llm_slot(self):
+        with self._lock:
+            self._llm_in_flight -= 1
+        self._llm.release()
+
+    @contextmanager
+    def llm_slot(self):
+        """Hold one of the MAX_LLM_REQUESTS slots; yields False if none freed up in time."""
+        acquired = self.acquire_llm_slot()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release_llm_slot()
+
+    @asynccontextmanager
+    async def llm_slot_async(self):
+        """llm_slot for coroutines."""
+        acquired = await self.acquire_llm_slot_async()
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self.release_llm_slot()
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._promote(now)
+            return {
+                "active_interviews": len(self._active),
+                "reserved_slots": len(self._admitted),
+                "max_active_interviews": self.max_active,
+                "waiting": len(self._waiting),
+                "llm_requests_in_flight": self._llm_in_flight,
+                "max_llm_requests": self.max_llm,
+                "estimated_seconds_per_slot": round(self._release_interval, 1)
+            }
+
+# Create a global instance
+admission = AdmissionController()
@@ -1,35 +1,305 @@
 import os
-import json
+import logging
+import random
 import asyncio
-from openai import OpenAI
+import threading
+import httpx
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from openai import OpenAI, AsyncOpenAI
 from dotenv import load_dotenv
+from question_index import question_index
+from transcription import OpenAIWhisperEngine, create_transcription_engine
+from tenants import DEFAULT_TENANT, default_tenant_config
+from structured_output import EVALUATION_SCHEMA, OVERALL_SUMMARY_SCHEMA, parse_structured
+from model_router import ModelRouter
+from cache_snapshot import cache_snapshot
+from role_profile import role_profile_text
+
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
+# Evaluations and summaries returned in demo mode, when the reply held no usable JSON,
+# and when the call failed; callers get a copy
+DEMO_EVALUATION = {
+    "skills_demonstrated": ["Communication", "Problem Solving"],
+    "strengths": ["Clear articulation", "Relevant experience"],
+    "weaknesses": ["Could provide more specific examples"],
+    "overall_assessment": "Demo Mode",
+    "justification": "This is a demo evaluation. With OpenAI API key, you would get AI-powered analysis."
+}
+UNPARSED_EVALUATION = {
+    "skills_demonstrated": ["Communication", "Problem Solving"],
+    "strengths": ["Clear articulation", "Relevant experience"],
+    "weaknesses": ["Could provide more specific examples"],
+    "overall_assessment": "Unable to Assess",
+    "justification": "The candidate provided a reasonable response but could benefit from more detailed examples."
+}
+FAILED_EVALUATION = {
+    "skills_demonstrated": ["Communication"],
+    "strengths": ["Attempted to answer the question"],
+    "weaknesses": ["Limited detail provided"],
+    "overall_assessment": "Needs Development",
+    "justification": "The response was minimal and lacked specific details or examples."
+}
+DEMO_OVERALL_SUMMARY = {
+    "overall_assessment": "Demo Mode - Overall Assessment",
+    "key_insights": [
+        "Candidate completed all interview questions",
+        "Video responses were recorded successfully",
+        "AI analysis would provide detailed insights with API key"
+    ],
+    "recommendations": [
+        "Review individual question responses for detailed evaluation",
+        "Consider technical skills demonstrated in responses",
+        "Assess communication and problem-solving abilities"
+    ],
+    "strengths": ["Completed interview process", "Provided video responses"],
+    "areas_for_improvement": ["Detailed analysis requires OpenAI API key"],
+    "final_recommendation": "Proceed with manual review of responses"
+}
+UNPARSED_OVERALL_SUMMARY = {
+    "overall_assessment": "Unable to Assess",
+    "key_insights": ["Candidate provided responses to all questions", "Video format allows for communication assessment"],
+    "recommendations": ["Review individual question responses", "Consider technical assessment if needed"],
+    "strengths": ["Completed interview process"],
+    "areas_for_improvement": ["Detailed analysis requires manual review"],
+    "final_recommendation": "Proceed with manual review"
+}
+FAILED_OVERALL_SUMMARY = {
+    "overall_assessment": "Unable to Assess",
+    "key_insights": ["Technical error in summary generation"],
+    "recommendations": ["Manual review required"],
+    "strengths": ["Completed interview"],
+    "areas_for_improvement": ["Summary generation failed"],
+    "final_recommendation": "Manual review needed"
+}
+
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _grant(quota, future):
+    if future.cancelled():
+        # The coroutine stopped waiting before the slot reached it; pass the slot on
+        quota.release()
+    else:
+        future.set_result(None)
+
+
+class TenantQuota:
+    """Concurrent-call slots shared by blocking and async callers, granted in arrival order.
+
+    Threads wait on an Event and coroutines on a future of their own event loop, so no
+    one polls. release() hands the slot straight to the longest waiter, whichever kind,
+    and a new caller never overtakes a waiting one.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._free = limit
+        # threading.Event for a thread, (loop, future) for a coroutine
+        self._waiters = deque()
+
+    def acquire(self):
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+        waiter.wait()
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free and not self._waiters:
+                self._free -= 1
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            if not queued and future.done() and not future.cancelled():
+                # Granted just as the wait was cancelled; pass the slot on
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(_grant, self, future)
+                    return
+            self._free += 1
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+# One concurrency quota per tenant, kept across service instances, so a tenant re-created
+# after eviction does not get a second quota while calls on the old instance still run
+_tenant_quotas = {}
+_tenant_quotas_lock = threading.Lock()
+
+
+def tenant_quota(tenant_id, limit):
+    with _tenant_quotas_lock:
+        quota = _tenant_quotas.get(tenant_id)
+        if quota is None:
+            quota = _tenant_quotas[tenant_id] = TenantQuota(limit)
+        return quota
+
+
 class AIService:
-    def __init__(self):
-        api_key = os.getenv('OPENAI_API_KEY')
+    """OpenAI-backed interview features for one tenant (hiring company).
+
+    Each instance has its own pooled HTTP client, model settings, a cap of
+    `max_concurrency` simultaneous OpenAI calls and its own caches, so one busy tenant
+    cannot use up another's connections or rate limit.
+    """
+
+    def __init__(self, config=None):
+        config = config or default_tenant_config()
+        self.tenant_id = config.tenant_id
+        api_key = config.api_key
         if api_key and api_key != 'your_openai_api_key_here':
-            self.client = OpenAI(api_key=api_key)
+            self.client = OpenAI(
+                api_key=api_key,
+                http_client=httpx.Client(limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    max_keepalive_connections=config.max_connections
+                ))
+            )
             self.has_api_key = True
         else:
             self.client = None
             self.has_api_key = False
-            print("Warning: OpenAI API key not set. AI features will use fallback content.")
+            logger.warning("OpenAI API key not set for tenant %s. AI features will use fallback content.", self.tenant_id)
         
-        self.company_name = os.getenv('COMPANY_NAME', 'TechCorp')
-        self.openai_model = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
-        self.whisper_model = os.getenv('WHISPER_MODEL', 'whisper-1')
-
-    def generate_interview_greeting(self, role_title):
-        """Generate a role-specific interview greeting using OpenAI GPT."""
-        if not self.has_api_key:
-            # Fallback greeting when no API key is available
-            return f"Hello! Welcome to your interview for the {role_title} position at {self.company_name}. I'm excited to learn more about your experience and skills. Let's begin with some questions to better understand your background and capabilities."
+        self.company_name = config.company_name
+        self.openai_model = config.openai_model
+        self.whisper_model = config.whisper_model
+        # Chooses a model per call from the tenant's tiers, cheapest first
+        self.router = ModelRouter(config.model_tiers)
+        self.transcription_engine = create_transcription_engine(self.client, self.whisper_model)
+        # Calls beyond the tenant's quota wait here instead of competing with other tenants;
+        # sync and async calls draw from the same quota
+        self.max_concurrency = config.max_concurrency
+        self.max_connections = config.max_connections
+        self._quota = tenant_quota(self.tenant_id, config.max_concurrency)
+        # Created on first use by the async methods, so WSGI deployments never build it
+        self._async_client = None
+        self._async_loop = None
+        # Calls in flight and leases; a closed service releases its clients when the last one ends
+        self._calls_lock = threading.Lock()
+        self._in_flight = 0
+        self._closing = False
         
+        # Last AI greeting per role, served when a fresh one is not ready in time; the
+        # cache snapshot's greetings are merged in on first lookup
+        self._greeting_cache = {}
+        self._greetings_restored = False
+
+    def _begin_call(self):
+        with self._calls_lock:
+            self._in_flight += 1
+
+    def _end_call(self):
+        with self._calls_lock:
+            self._in_flight -= 1
+            release = self._closing and self._in_flight == 0
+        if release:
+            self._close_clients()
+
+    @contextmanager
+    def _slot(self):
+        """Hold one of the tenant's concurrent-call slots for the duration of an OpenAI call."""
+        with self._quota:
+            self._begin_call()
+            try:
+                yield
+            finally:
+                self._end_call()
+
+    @asynccontextmanager
+    async def _slot_async(self):
+        """_slot for coroutines; waits its turn in the same queue as blocking callers."""
+        await self._quota.acquire_async()
+        self._begin_call()
         try:
-            prompt = f"""You are an AI Interview Bot designed to greet candidates for a first-round interview. Your tone should be professional, welcoming, and encouraging. Based on the following role details, generate a concise, 2-3 sentence introduction for the candidate.
+            yield
+        finally:
+            self._end_call()
+            self._quota.release()
+
+    def retain(self):
+        """Keep the clients open until the matching release(), even if the service is closed meanwhile.
+
+        Taken by TenantRegistry.lease for work that outlives a request.
+        """
+        self._begin_call()
+
+    def release(self):
+        self._end_call()
+
+    def close(self):
+        """Release the HTTP clients, once calls in flight and leases have finished.
+
+        Called by TenantRegistry when the tenant is evicted. The transcription engine holds
+        nothing of its own: it uses this service's client, or the process-wide local engine.
+        """
+        with self._calls_lock:
+            self._closing = True
+            idle = self._in_flight == 0
+        if idle:
+            self._close_clients()
+
+    def _close_clients(self):
+        close = getattr(self.client, 'close', None)
+        if close is not None:
+            close()
+        if self._async_client is not None and self._async_loop is not None and not self._async_loop.is_closed():
+            # The async client belongs to the event loop that created it
+            asyncio.run_coroutine_threadsafe(self._async_client.close(), self._async_loop)
+
+    def question_history_key(self, role_title):
+        """Key of the role's question history; tenants keep separate ones, the default tenant the plain role title."""
+        if self.tenant_id == DEFAULT_TENANT:
+            return role_title
+        return f"{self.tenant_id}/{role_title}"
+
+    def record_questions(self, role_title, questions):
+        """Add questions served from a question stream that was cut short to the role's history."""
+        for question in questions:
+            question_index.add(self.question_history_key(role_title), question)
+
+    def fallback_greeting(self, role_title):
+        """Greeting used when the model is unavailable or too slow."""
+        return f"Hello! Welcome to your interview for the {role_title} position at {self.company_name}. I'm excited to learn more about your experience and skills. Let's begin with some questions to better understand your background and capabilities."
+
+    def _greeting_messages(self, role_title):
+        prompt = f"""You are an AI Interview Bot designed to greet candidates for a first-round interview. Your tone should be professional, welcoming, and encouraging. Based on the following role details, generate a concise, 2-3 sentence introduction for the candidate.
 
 Role Title: {role_title}
 Company: {self.company_name}
@@ -42,36 +312,16 @@ Generate a warm, professional greeting that:
 
 Keep it concise and friendly."""
 
-            response = self.client.chat.completions.create(
-                model=self.openai_model,
-                messages=[
-                    {"role": "system", "content": "You are a professional AI interview assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
-            )
-
-            greeting = response.choices[0].message.content.strip()
-            return greeting
-
-        except Exception as e:
-            print(f"Error generating greeting: {e}")
-            # Fallback greeting
-            return f"Hello! Welcome to your interview for the {role_title} position at {self.company_name}. I'm excited to learn more about your experience and skills. Let's begin with some questions to better understand your background and capabilities."
+        return [
+            {"role": "system", "content": "You are a professional AI interview assistant."},
+            {"role": "user", "content": prompt}
+        ]
 
-    def generate_interview_questions(self, role_title, role_description):
-        """Generate role-specific interview questions using OpenAI GPT."""
-        if not self.has_api_key:
-            # Use fallback questions when no API key is available
-            return self._get_fallback_questions(role_title)
+    def _questions_messages(self, role_title, role_description):
+        # Add randomization to ensure different questions each time
+        random_seed = random.randint(1, 1000)
         
-        try:
-            # Add randomization to ensure different questions each time
-            import random
-            random_seed = random.randint(1, 1000)
-            
-            prompt = f"""You are an expert interviewer specializing in {role_title} roles. Based on the provided job description, generate 5 to 7 unique interview questions. Ensure a mix of:
+        prompt = f"""You are an expert interviewer specializing in {role_title} roles. Based on the provided job description, generate 5 to 7 unique interview questions. Ensure a mix of:
 
 1. Technical questions assessing core skills
 2. Behavioral questions exploring past experiences (e.g., STAR method)
@@ -92,228 +342,475 @@ Generate questions that are:
 
 Return only the questions, one per line, without numbering or additional text."""
 
-            response = self.client.chat.completions.create(
-                model=self.openai_model,
-                messages=[
-                    {"role": "system", "content": "You are an expert HR interviewer. Always generate unique, creative questions."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=600,
-                temperature=0.9  # Higher temperature for more creativity
-            )
+        return [
+            {"role": "system", "content": "You are an expert HR interviewer. Always generate unique, creative questions."},
+            {"role": "user", "content": prompt}
+        ]
 
-            questions_text = response.choices[0].message.content.strip()
-            # Split by lines and clean up
-            questions = [q.strip() for q in questions_text.split('\n') if q.strip()]
-            
-            # Ensure we have 5-7 questions
-            if len(questions) < 5:
-                questions.extend(self._get_fallback_questions(role_title))
-            elif len(questions) > 7:
-                questions = questions[:7]
+    def generate_interview_greeting(self, role_title):
+        """Generate a role-specific interview greeting using OpenAI GPT."""
+        if not self.has_api_key:
+            # Fallback greeting when no API key is available
+            return self.fallback_greeting(role_title)
+        
+        try:
+            model = self.router.choose("greeting", 0)
+            with self._slot(), self.router.track(model, "greeting"):
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=self._greeting_messages(role_title),
+                    max_tokens=200,
+                    temperature=0.7
+                )
 
-            return questions
+            greeting = response.choices[0].message.content.strip()
+            self._greeting_cache[role_title] = greeting
+            return greeting
 
         except Exception as e:
-            print(f"Error generating questions: {e}")
+            logger.error("Error generating greeting: %s", e, extra={"method": "generate_interview_greeting"})
+            # Fallback greeting
+            return self.fallback_greeting(role_title)
+
+    def get_cached_greeting(self, role_title):
+        """Return the most recent AI greeting generated for the role, if any."""
+        if not self._greetings_restored:
+            self._restore_greetings()
+        return self._greeting_cache.get(role_title)
+
+    def _restore_greetings(self):
+        self._greetings_restored = True
+        for role_title, greeting in (cache_snapshot.get_json(f"greetings:{self.tenant_id}") or {}).items():
+            # Greetings generated since boot are newer than the snapshot's
+            self._greeting_cache.setdefault(role_title, greeting)
+
+    def snapshot_sections(self):
+        """This tenant's cached greetings, for the cache snapshot."""
+        if not self._greetings_restored:
+            self._restore_greetings()
+        return {f"greetings:{self.tenant_id}": cache_snapshot.json_section(dict(self._greeting_cache))}
+
+    def stream_interview_greeting(self, role_title):
+        """Yield the interview greeting in pieces as the model produces them."""
+        if not self.has_api_key:
+            yield self.fallback_greeting(role_title)
+            return
+        
+        produced = False
+        try:
+            # The quota slot is held until the stream is fully read
+            model = self.router.choose("greeting", 0)
+            with self._slot(), self.router.track(model, "greeting") as call:
+                stream = self.client.chat.completions.create(
+                    model=model,
+                    messages=self._greeting_messages(role_title),
+                    max_tokens=200,
+                    temperature=0.7,
+                    stream=True
+                )
+
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        produced = True
+                        # Time the reader spends on a piece is not the model's
+                        with call.paused():
+                            yield delta
+
+        except Exception as e:
+            logger.error("Error streaming greeting: %s", e, extra={"method": "stream_interview_greeting"})
+        
+        if not produced:
+            yield self.fallback_greeting(role_title)
+
+    def _select_questions(self, role_title, questions_text):
+        # Split by lines and clean up
+        questions = [q.strip() for q in questions_text.split('\n') if q.strip()]
+        
+        # Ensure we have 5-7 distinct questions, padding with fallback questions
+        # and skipping near-duplicates of each other or of recent interviews
+        count = max(5, min(len(questions), 7))
+        return question_index.select(self.question_history_key(role_title), questions, count, fallback=self._get_fallback_questions(role_title))
+
+    def generate_interview_questions(self, role_title, role_description):
+        """Generate role-specific interview questions using OpenAI GPT."""
+        if not self.has_api_key:
+            # Use fallback questions when no API key is available
             return self._get_fallback_questions(role_title)
+        
+        try:
+            model = self.router.choose("questions", len(role_description or ''))
+            with self._slot(), self.router.track(model, "questions"):
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=self._questions_messages(role_title, role_description),
+                    max_tokens=600,
+                    temperature=0.9  # Higher temperature for more creativity
+                )
+
+            return self._select_questions(role_title, response.choices[0].message.content.strip())
 
-    def transcribe_video(self, video_path):
-        """Transcribe audio from video file using OpenAI Whisper."""
+        except Exception as e:
+            logger.error("Error generating questions: %s", e, extra={"method": "generate_interview_questions"})
+            return self._get_fallback_questions(role_title)
+
+    def stream_interview_questions(self, role_title, role_description):
+        """Yield interview questions one by one as soon as each line of the completion is done."""
         if not self.has_api_key:
-            return "[DEMO_MODE] Video transcription would be processed here with OpenAI Whisper API."
+            yield from self._get_fallback_questions(role_title)
+            return
         
+        # Accept up to 7 distinct questions as they arrive, pad to at least 5 at the end
+        selector = question_index.selector(self.question_history_key(role_title), 7)
         try:
-            with open(video_path, "rb") as video_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model=self.whisper_model,
-                    file=video_file,
-                    response_format="text",
-                    language="en"  # Specify language for faster processing
+            model = self.router.choose("questions", len(role_description or ''))
+            with self._slot(), self.router.track(model, "questions") as call:
+                stream = self.client.chat.completions.create(
+                    model=model,
+                    messages=self._questions_messages(role_title, role_description),
+                    max_tokens=600,
+                    temperature=0.9,  # Higher temperature for more creativity
+                    stream=True
                 )
+
+                buffer = ""
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if not delta:
+                        continue
+                    buffer += delta
+                    *lines, buffer = buffer.split('\n')
+                    for line in lines:
+                        if selector.offer(line):
+                            with call.paused():
+                                yield line.strip()
+                    if selector.full:
+                        stream.close()
+                        break
+                else:
+                    if selector.offer(buffer):
+                        with call.paused():
+                            yield buffer.strip()
+
+        except Exception as e:
+            logger.error("Error streaming questions: %s", e, extra={"method": "stream_interview_questions"})
+        
+        if len(selector.questions) < 5:
+            selector.count = 5
+            yield from selector.pad(self._get_fallback_questions(role_title))
+        # Only a set that was delivered in full counts towards the role's history
+        selector.commit()
+
+    def transcribe_video(self, video_path, prompt=None):
+        """Transcribe audio from video file using the configured Whisper engine.
+
+        `prompt` carries the preceding text when transcribing one segment of a longer answer.
+        The engine is chosen per deployment with TRANSCRIPTION_ENGINE (see transcription.py).
+        """
+        if self.transcription_engine is None:
+            return "[DEMO_MODE] Video transcription would be processed here with OpenAI Whisper API."
+        
+        try:
+            with self._slot():
+                transcript = self.transcription_engine.transcribe(video_path, prompt=prompt)
             return transcript.strip()
 
         except Exception as e:
-            print(f"Error transcribing video: {e}")
+            logger.error("Error transcribing video: %s", e, extra={"method": "transcribe_video"})
             return "[TRANSCRIPTION_ERROR] Unable to transcribe the video."
 
-    def generate_answer_summary(self, question_text, transcription):
-        """Generate a concise summary of the candidate's answer."""
-        if not self.has_api_key:
-            return f"[DEMO_MODE] Summary: The candidate provided a response to the question about {question_text[:50]}..."
+    def _summary_messages(self, question_text, transcription):
+        """Summary prompt; returns the full answer length, used for routing, and the messages."""
+        answer_chars = len(transcription)
         
-        try:
-            # Truncate transcription if too long to speed up processing
-            max_transcription_length = 1000
-            if len(transcription) > max_transcription_length:
-                transcription = transcription[:max_transcription_length] + "..."
-            
-            prompt = f"""Summarize this interview answer in 1-2 sentences. Focus on key points only.
+        # Truncate transcription if too long to speed up processing
+        max_transcription_length = 1000
+        if len(transcription) > max_transcription_length:
+            transcription = transcription[:max_transcription_length] + "..."
+        
+        prompt = f"""Summarize this interview answer in 1-2 sentences. Focus on key points only.
 
 Question: {question_text}
 Answer: {transcription}
 
 Summary:"""
 
-            response = self.client.chat.completions.create(
-                model=self.openai_model,
-                messages=[
-                    {"role": "system", "content": "You are a concise HR analyst. Keep summaries brief and focused."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100,
-                temperature=0.3
-            )
+        return answer_chars, [
+            {"role": "system", "content": "You are a concise HR analyst. Keep summaries brief and focused."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def generate_answer_summary(self, question_text, transcription):
+        """Generate a concise summary of the candidate's answer."""
+        if not self.has_api_key:
+            return f"[DEMO_MODE] Summary: The candidate provided a response to the question about {question_text[:50]}..."
+        
+        try:
+            # Route on the full answer length; long answers go to a stronger tier
+            answer_chars, messages = self._summary_messages(question_text, transcription)
+            model = self.router.choose("summary", answer_chars)
+            with self._slot(), self.router.track(model, "summary"):
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=100,
+                    temperature=0.3
+                )
 
             summary = response.choices[0].message.content.strip()
             return summary
 
         except Exception as e:
-            print(f"Error generating summary: {e}")
+            logger.error("Error generating summary: %s", e, extra={"method": "generate_answer_summary"})
             return f"Summary: The candidate provided a response to the question about {question_text[:50]}..."
 
-    def generate_evaluation(self, role_description, question_text, transcription):
-        """Generate a structured skill evaluation of the candidate's answer."""
-        if not self.has_api_key:
-            return {
-                "skills_demonstrated": ["Communication", "Problem Solving"],
-                "strengths": ["Clear articulation", "Relevant experience"],
-                "weaknesses": ["Could provide more specific examples"],
-                "overall_assessment": "Demo Mode",
-                "justification": "This is a demo evaluation. With OpenAI API key, you would get AI-powered analysis."
-            }
+    def _evaluation_messages(self, role_profile, question_text, transcription):
+        """Evaluation prompt; returns the full answer length, used for routing, and the messages."""
+        answer_chars = len(transcription)
         
-        try:
-            # Truncate transcription if too long to speed up processing
-            max_transcription_length = 800
-            if len(transcription) > max_transcription_length:
-                transcription = transcription[:max_transcription_length] + "..."
-            
-            prompt = f"""Evaluate this interview answer quickly. Return JSON with: skills_demonstrated (2-3 skills), strengths (2-3 points), weaknesses (1-2 points), overall_assessment (Strong/Moderate/Needs Development), justification (brief reason).
+        # Truncate transcription if too long to speed up processing
+        max_transcription_length = 800
+        if len(transcription) > max_transcription_length:
+            transcription = transcription[:max_transcription_length] + "..."
+        
+        prompt = f"""Evaluate this interview answer quickly against the role's key skills and must-haves. Return JSON with: skills_demonstrated (2-3 skills), strengths (2-3 points), weaknesses (1-2 points), overall_assessment (Strong/Moderate/Needs Development), justification (brief reason).
 
+{role_profile_text(role_profile)}
 Question: {question_text}
-Answer: {transcription}
-Role: {role_description[:200]}..."""
-
-            response = self.client.chat.completions.create(
-                model=self.openai_model,
-                messages=[
-                    {"role": "system", "content": "You are a fast HR evaluator. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=300,
-                temperature=0.2
-            )
+Answer: {transcription}"""
 
-            evaluation_text = response.choices[0].message.content.strip()
-            
-            # Try to parse JSON
-            try:
-                evaluation = json.loads(evaluation_text)
-                return evaluation
-            except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
-                return {
-                    "skills_demonstrated": ["Communication", "Problem Solving"],
-                    "strengths": ["Clear articulation", "Relevant experience"],
-                    "weaknesses": ["Could provide more specific examples"],
-                    "overall_assessment": "Moderate Fit",
-                    "justification": "The candidate provided a reasonable response but could benefit from more detailed examples."
-                }
+        return answer_chars, [
+            {"role": "system", "content": "You are a fast HR evaluator. Return only valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
 
-        except Exception as e:
-            print(f"Error generating evaluation: {e}")
-            return {
-                "skills_demonstrated": ["Communication"],
-                "strengths": ["Attempted to answer the question"],
-                "weaknesses": ["Limited detail provided"],
-                "overall_assessment": "Needs Development",
-                "justification": "The response was minimal and lacked specific details or examples."
-            }
-
-    def generate_overall_summary(self, role_title, role_description, transcriptions, evaluations):
-        """Generate an overall summary of the candidate's interview performance."""
+    def generate_evaluation(self, role_profile, question_text, transcription):
+        """Generate a structured skill evaluation of the candidate's answer.
+
+        `role_profile` is the interview's compiled RoleProfile (see role_profile.py).
+        """
         if not self.has_api_key:
-            return {
-                "overall_assessment": "Demo Mode - Overall Assessment",
-                "key_insights": [
-                    "Candidate completed all interview questions",
-                    "Video responses were recorded successfully",
-                    "AI analysis would provide detailed insights with API key"
-                ],
-                "recommendations": [
-                    "Review individual question responses for detailed evaluation",
-                    "Consider technical skills demonstrated in responses",
-                    "Assess communication and problem-solving abilities"
-                ],
-                "strengths": ["Completed interview process", "Provided video responses"],
-                "areas_for_improvement": ["Detailed analysis requires OpenAI API key"],
-                "final_recommendation": "Proceed with manual review of responses"
-            }
+            return dict(DEMO_EVALUATION)
         
         try:
-            # Truncate and combine transcriptions for faster processing
-            combined_text = ""
-            for i, trans in enumerate(transcriptions):
-                if len(trans) > 300:  # Limit each transcription
-                    trans = trans[:300] + "..."
-                combined_text += f"Q{i+1}: {trans}\n"
-            
-            # Extract key metrics from evaluations
-            all_skills = []
-            all_strengths = []
-            all_weaknesses = []
-            
-            for eval_data in evaluations:
-                if isinstance(eval_data, dict):
-                    all_skills.extend(eval_data.get('skills_demonstrated', []))
-                    all_strengths.extend(eval_data.get('strengths', []))
-                    all_weaknesses.extend(eval_data.get('weaknesses', []))
+            # Route on the full answer length; long answers go to a stronger tier
+            answer_chars, messages = self._evaluation_messages(role_profile, question_text, transcription)
+            model = self.router.choose("evaluation", answer_chars)
+            with self._slot(), self.router.track(model, "evaluation"):
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=300,
+                    temperature=0.2
+                )
+
+            evaluation_text = response.choices[0].message.content.strip()
             
-            prompt = f"""Quick overall assessment. Return JSON with: overall_assessment (Strong/Moderate/Needs Development), key_insights (3 points), recommendations (3 points), strengths (3 points), areas_for_improvement (3 points), final_recommendation (Proceed/Reject/Further evaluation).
+            # Recover JSON wrapped in prose or fences, or cut off by max_tokens
+            evaluation = parse_structured(evaluation_text, EVALUATION_SCHEMA)
+            if evaluation is None:
+                evaluation = self._retry_structured("evaluation", model, messages, evaluation_text, EVALUATION_SCHEMA, 300)
+            # Fallback if no usable JSON came back
+            return evaluation if evaluation is not None else dict(UNPARSED_EVALUATION)
+
+        except Exception as e:
+            logger.error("Error generating evaluation: %s", e, extra={"method": "generate_evaluation"})
+            return dict(FAILED_EVALUATION)
+
+    def _overall_summary_messages(self, role_profile, transcriptions, evaluations):
+        """Overall summary prompt; returns the length of the combined answers, used for routing, and the messages."""
+        # Truncate and combine transcriptions for faster processing
+        combined_text = ""
+        for i, trans in enumerate(transcriptions):
+            if len(trans) > 300:  # Limit each transcription
+                trans = trans[:300] + "..."
+            combined_text += f"Q{i+1}: {trans}\n"
+        
+        # Extract key metrics from evaluations
+        all_skills = []
+        all_strengths = []
+        all_weaknesses = []
+        
+        for eval_data in evaluations:
+            if isinstance(eval_data, dict):
+                all_skills.extend(eval_data.get('skills_demonstrated', []))
+                all_strengths.extend(eval_data.get('strengths', []))
+                all_weaknesses.extend(eval_data.get('weaknesses', []))
+        
+        prompt = f"""Quick overall assessment against the role's key skills and must-haves. Return JSON with: overall_assessment (Strong/Moderate/Needs Development), key_insights (3 points), recommendations (3 points), strengths (3 points), areas_for_improvement (3 points), final_recommendation (Proceed/Reject/Further evaluation).
 
-Role: {role_title}
+{role_profile_text(role_profile)}
 Responses: {combined_text[:1000]}...
 Skills: {', '.join(set(all_skills))}
 Strengths: {', '.join(set(all_strengths))}
 Weaknesses: {', '.join(set(all_weaknesses))}"""
 
-            response = self.client.chat.completions.create(
-                model=self.openai_model,
-                messages=[
-                    {"role": "system", "content": "You are a fast HR analyst. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=400,
-                temperature=0.2
-            )
+        return len(combined_text), [
+            {"role": "system", "content": "You are a fast HR analyst. Return only valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
+
+    def generate_overall_summary(self, role_profile, transcriptions, evaluations):
+        """Generate an overall summary of the candidate's interview performance."""
+        if not self.has_api_key:
+            return dict(DEMO_OVERALL_SUMMARY)
+        
+        try:
+            combined_chars, messages = self._overall_summary_messages(role_profile, transcriptions, evaluations)
+            model = self.router.choose("overall_summary", combined_chars)
+            with self._slot(), self.router.track(model, "overall_summary"):
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=400,
+                    temperature=0.2
+                )
 
             summary_text = response.choices[0].message.content.strip()
             
-            try:
-                summary = json.loads(summary_text)
-                return summary
-            except json.JSONDecodeError:
-                # Fallback if JSON parsing fails
-                return {
-                    "overall_assessment": "Moderate Fit",
-                    "key_insights": ["Candidate provided responses to all questions", "Video format allows for communication assessment"],
-                    "recommendations": ["Review individual question responses", "Consider technical assessment if needed"],
-                    "strengths": ["Completed interview process"],
-                    "areas_for_improvement": ["Detailed analysis requires manual review"],
-                    "final_recommendation": "Proceed with manual review"
-                }
+            summary = parse_structured(summary_text, OVERALL_SUMMARY_SCHEMA)
+            if summary is None:
+                summary = self._retry_structured("overall_summary", model, messages, summary_text, OVERALL_SUMMARY_SCHEMA, 400)
+            # Fallback if no usable JSON came back
+            return summary if summary is not None else dict(UNPARSED_OVERALL_SUMMARY)
+
+        except Exception as e:
+            logger.error("Error generating overall summary: %s", e, extra={"method": "generate_overall_summary"})
+            return dict(FAILED_OVERALL_SUMMARY)
 
+    def _retry_messages(self, messages, previous_text):
+        return messages + [
+            {"role": "assistant", "content": previous_text},
+            {"role": "user", "content": "Reply again with only the JSON object, no other text."}
+        ]
+
+    def _retry_structured(self, task, model, messages, previous_text, schema, max_tokens):
+        """Ask once more for JSON when a reply held nothing recoverable; returns None if that fails too.
+
+        The retry goes to the next stronger model tier, or to the same model if it is the strongest.
+        """
+        model = self.router.escalate(model) or model
+        try:
+            with self._slot(), self.router.track(model, task):
+                response = self.client.chat.completions.create(
+                    model=model,
+                    messages=self._retry_messages(messages, previous_text),
+                    max_tokens=max_tokens,
+                    temperature=0
+                )
+            return parse_structured(response.choices[0].message.content, schema)
+        except Exception as e:
+            logger.error("Error retrying structured output: %s", e, extra={"method": task})
+            return None
+
+    # Async variants for the ASGI server (asgi.py). They share prompts, routing and parsing
+    # with the methods above but await an AsyncOpenAI client, so a waiting call holds no thread.
+
+    @property
+    def async_client(self):
+        """AsyncOpenAI client with the tenant's connection limit, created on first use."""
+        if self._async_client is None and self.has_api_key:
+            self._async_loop = asyncio.get_running_loop()
+            self._async_client = AsyncOpenAI(
+                api_key=self.client.api_key,
+                http_client=httpx.AsyncClient(limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ))
+            )
+        return self._async_client
+
+    async def _complete_async(self, task, model, messages, max_tokens, temperature):
+        """Await one chat completion within the tenant's quota and return its text."""
+        async with self._slot_async():
+            with self.router.track(model, task):
+                response = await self.async_client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    temperature=temperature
+                )
+        return response.choices[0].message.content.strip()
+
+    async def generate_interview_greeting_async(self, role_title):
+        if not self.has_api_key:
+            return self.fallback_greeting(role_title)
+        try:
+            model = self.router.choose("greeting", 0)
+            greeting = await self._complete_async("greeting", model, self._greeting_messages(role_title), 200, 0.7)
+            self._greeting_cache[role_title] = greeting
+            return greeting
+        except Exception as e:
+            logger.error("Error generating greeting: %s", e, extra={"method": "generate_interview_greeting"})
+            return self.fallback_greeting(role_title)
+
+    async def generate_interview_questions_async(self, role_title, role_description):
+        if not self.has_api_key:
+            return self._get_fallback_questions(role_title)
+        try:
+            model = self.router.choose("questions", len(role_description or ''))
+            questions_text = await self._complete_async(
+                "questions", model, self._questions_messages(role_title, role_description), 600, 0.9
+            )
+            return self._select_questions(role_title, questions_text)
+        except Exception as e:
+            logger.error("Error generating questions: %s", e, extra={"method": "generate_interview_questions"})
+            return self._get_fallback_questions(role_title)
+
+    async def transcribe_video_async(self, video_path, prompt=None):
+        if not isinstance(self.transcription_engine, OpenAIWhisperEngine):
+            # Demo mode, or the local engine, whose worker processes only hold a thread while it waits
+            return await asyncio.to_thread(self.transcribe_video, video_path, prompt)
+        try:
+            audio = await asyncio.to_thread(_read_file, video_path)
+            options = {"prompt": prompt} if prompt else {}
+            async with self._slot_async():
+                transcript = await self.async_client.audio.transcriptions.create(
+                    model=self.whisper_model,
+                    file=(os.path.basename(video_path), audio),
+                    response_format="text",
+                    language="en",
+                    **options
+                )
+            return transcript.strip()
+        except Exception as e:
+            logger.error("Error transcribing video: %s", e, extra={"method": "transcribe_video"})
+            return "[TRANSCRIPTION_ERROR] Unable to transcribe the video."
+
+    async def generate_answer_summary_async(self, question_text, transcription):
+        if not self.has_api_key:
+            return f"[DEMO_MODE] Summary: The candidate provided a response to the question about {question_text[:50]}..."
+        try:
+            answer_chars, messages = self._summary_messages(question_text, transcription)
+            model = self.router.choose("summary", answer_chars)
+            return await self._complete_async("summary", model, messages, 100, 0.3)
+        except Exception as e:
+            logger.error("Error generating summary: %s", e, extra={"method": "generate_answer_summary"})
+            return f"Summary: The candidate provided a response to the question about {question_text[:50]}..."
+
+    async def generate_evaluation_async(self, role_profile, question_text, transcription):
+        if not self.has_api_key:
+            return dict(DEMO_EVALUATION)
+        try:
+            answer_chars, messages = self._evaluation_messages(role_profile, question_text, transcription)
+            model = self.router.choose("evaluation", answer_chars)
+            evaluation_text = await self._complete_async("evaluation", model, messages, 300, 0.2)
+            evaluation = parse_structured(evaluation_text, EVALUATION_SCHEMA)
+            if evaluation is None:
+                evaluation = await self._retry_structured_async("evaluation", model, messages, evaluation_text, EVALUATION_SCHEMA, 300)
+            return evaluation if evaluation is not None else dict(UNPARSED_EVALUATION)
+        except Exception as e:
+            logger.error("Error generating evaluation: %s", e, extra={"method": "generate_evaluation"})
+            return dict(FAILED_EVALUATION)
+
+    async def _retry_structured_async(self, task, model, messages, previous_text, schema, max_tokens):
+        model = self.router.escalate(model) or model
+        try:
+            text = await self._complete_async(task, model, self._retry_messages(messages, previous_text), max_tokens, 0)
+            return parse_structured(text, schema)
         except Exception as e:
-            print(f"Error generating overall summary: {e}")
-            return {
-                "overall_assessment": "Unable to Assess",
-                "key_insights": ["Technical error in summary generation"],
-                "recommendations": ["Manual review required"],
-                "strengths": ["Completed interview"],
-                "areas_for_improvement": ["Summary generation failed"],
-                "final_recommendation": "Manual review needed"
-            }
+            logger.error("Error retrying structured output: %s", e, extra={"method": task})
+            return None
 
     def _get_fallback_questions(self, role_title):
         """Fallback questions if AI generation fails."""
@@ -363,5 +860,3 @@ Weaknesses: {', '.join(set(all_weaknesses))}"""
             "What are your career goals and how does this position align with them?"
         ])
 
-# Create a global instance
-ai_service = AIService()
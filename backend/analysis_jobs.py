@@ -0,0 +1,151 @@
+import os
+import logging
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from structured_logging import log_context
+
+logger = logging.getLogger(__name__)
+
+# Bytes hashed from each end of a video to fingerprint it without reading the whole file
+FINGERPRINT_BLOCK_SIZE = 64 * 1024
+
+
+def video_fingerprint(video_path):
+    """Return a cheap content hash for a stored video.
+
+    Hashes the size plus the first and last blocks of the file, which is enough to tell
+    re-recorded answers apart without reading a 100MB upload on the request thread.
+    Paths that do not exist on this host are fingerprinted by name.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        size = os.path.getsize(video_path)
+        digest.update(str(size).encode())
+        with open(video_path, 'rb') as f:
+            digest.update(f.read(FINGERPRINT_BLOCK_SIZE))
+            if size > FINGERPRINT_BLOCK_SIZE:
+                f.seek(max(FINGERPRINT_BLOCK_SIZE, size - FINGERPRINT_BLOCK_SIZE))
+                digest.update(f.read(FINGERPRINT_BLOCK_SIZE))
+    except (OSError, TypeError):
+        digest.update(str(video_path).encode())
+    return digest.hexdigest()
+
+
+class AnalysisJob:
+    """A single background analysis run shared by every submission with the same key."""
+
+    __slots__ = ('key', 'status', 'started_at', 'finished_at', 'submissions', '_done')
+
+    def __init__(self, key):
+        self.key = key
+        self.status = 'running'
+        self.started_at = time.time()
+        self.finished_at = None
+        self.submissions = 1
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the job finishes, returning True if it did."""
+        return self._done.wait(timeout)
+
+    def _finish(self, status):
+        self.status = status
+        self.finished_at = time.time()
+        self._done.set()
+        logger.info("Analysis job %s", status, extra={'duration_ms': round((self.finished_at - self.started_at) * 1000, 1)})
+
+    def log_context(self):
+        """Tag records logged while the job runs with its interview and question."""
+        interview_id, question_index = self.key[:2]
+        return log_context(interview_id=interview_id, question_index=question_index, method='analysis')
+
+
+class AnalysisJobRegistry:
+    """Single-flight coalescing of answer analysis jobs.
+
+    Jobs are keyed by (interview_id, question_index, video hash). A submission whose key
+    matches a running or recently finished job attaches to it instead of starting a second
+    round of transcription and LLM calls. Clients may also send an Idempotency-Key, which
+    maps a retried request to the job its first attempt created. Finished jobs are kept in
+    a bounded LRU so late retries are still recognised.
+    """
+
+    def __init__(self, max_jobs=None):
+        self.max_jobs = max_jobs if max_jobs is not None else int(os.getenv('ANALYSIS_JOB_HISTORY', '2000'))
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._idempotency_keys = OrderedDict()
+        self._tasks = set()
+
+    def _remember(self, mapping, key, value):
+        mapping[key] = value
+        mapping.move_to_end(key)
+        while len(mapping) > self.max_jobs:
+            mapping.popitem(last=False)
+
+    def claim(self, key, idempotency_key=None):
+        """Return (job, created) for a submission.
+
+        When created is False an equivalent job is already running or has finished, and
+        the caller should neither touch the question record nor start any work.
+        """
+        with self._lock:
+            if idempotency_key is not None:
+                known_key = self._idempotency_keys.get((key[0], idempotency_key))
+                if known_key is not None and known_key in self._jobs:
+                    key = known_key
+
+            job = self._jobs.get(key)
+            if job is not None and job.status != 'failed':
+                job.submissions += 1
+                self._jobs.move_to_end(key)
+                return job, False
+
+            job = AnalysisJob(key)
+            self._remember(self._jobs, key, job)
+            if idempotency_key is not None:
+                self._remember(self._idempotency_keys, (key[0], idempotency_key), key)
+            return job, True
+
+    def run(self, job, target):
+        """Run `target()` for a claimed job on a daemon thread."""
+        def run_job():
+            with job.log_context():
+                try:
+                    target()
+                    job._finish('done')
+                except Exception as e:
+                    logger.error("Error in analysis job: %s", e)
+                    job._finish('failed')
+
+        thread = threading.Thread(target=run_job)
+        thread.daemon = True
+        thread.start()
+
+    def run_async(self, job, coroutine):
+        """Run a coroutine for a claimed job as a task on the running event loop."""
+        async def run_job():
+            with job.log_context():
+                try:
+                    await coroutine
+                    job._finish('done')
+                except Exception as e:
+                    logger.error("Error in analysis job: %s", e)
+                    job._finish('failed')
+                finally:
+                    self._tasks.discard(task)
+
+        task = asyncio.ensure_future(run_job())
+        # The loop only keeps weak references to tasks
+        self._tasks.add(task)
+
+    def get(self, key):
+        """Return the job for a key, if it is still tracked."""
+        with self._lock:
+            return self._jobs.get(key)
+
+# Create a global instance
+analysis_jobs = AnalysisJobRegistry()
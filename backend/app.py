@@ -1,26 +1,106 @@
 import os
+import json
 import uuid
+import zlib
+import queue
 import threading
-from flask import Flask, request, jsonify, send_from_directory
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+from flask import Flask, Response, request, jsonify, send_from_directory, g
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
+import logging
 import datetime
 import tempfile
 import shutil
+from question_index import question_index
+from video_storage import VideoStorageManager
+from analysis_jobs import analysis_jobs, video_fingerprint
+from interview_store import InterviewRecord, PROCESSING
+from live_transcription import LiveTranscriptionManager
+from response_encoding import json_response, encoded_cache, dumps
+from cache_snapshot import cache_snapshot
+from structured_logging import configure_logging, init_request_logging
+from profiling import profiler
+from traffic_capture import traffic_capture
+from admission import admission, WaitingRoomFull
+from tenants import TenantRegistry
+from results_export import ResultsExporter
+from audio_analysis import analyze_delivery
+from video_analysis import video_analyzer
 
-# Import AI service
+# Transcription and video analysis run on spawned process pools. When the server is started
+# as `python app.py`, every spawned worker re-imports this script as __mp_main__; workers only
+# need the functions in transcription.py and video_analysis.py, so they skip the startup below
+SERVER_PROCESS = __name__ != '__mp_main__'
+
+# JSON log records through a non-blocking queue, before the services below log
+if SERVER_PROCESS:
+    configure_logging()
+logger = logging.getLogger(__name__)
+
+# Import AI service; each hiring company (tenant) gets its own lazily created instance
 try:
     from ai_service import AIService
-    ai_service = AIService()
+    ai_services = TenantRegistry(AIService)
+    ai_service = ai_services.get() if SERVER_PROCESS else None
 except ImportError:
     # Fallback for deployment
+    ai_services = None
     ai_service = None
 
+def ai_snapshot_sections():
+    """Cached content of every tenant's AIService, for the cache snapshot."""
+    sections = {}
+    for service in (ai_services.services() if ai_services else ()):
+        sections.update(service.snapshot_sections())
+    return sections
+
+def get_ai_service(tenant_id=None):
+    """AIService of a tenant (the default one for unknown ids), or None in deployment mode."""
+    return ai_services.get(tenant_id) if ai_services else None
+
+@contextmanager
+def leased_ai_service(tenant_id=None):
+    """get_ai_service for work that outlives the request, such as answer analysis.
+
+    The service stays open until the block exits, even if its tenant is evicted meanwhile.
+    """
+    if not ai_services:
+        yield None
+        return
+    with ai_services.lease(tenant_id) as service:
+        yield service
+
+def tenant_transcriber(tenant_id):
+    """Transcribe function for live sessions; leases the tenant's current service per segment."""
+    def transcribe(video_path, prompt=None):
+        with leased_ai_service(tenant_id) as service:
+            return service.transcribe_video(video_path, prompt=prompt)
+    return transcribe
+
+def authenticate_tenant(host, access_key):
+    """Tenant id for a request's host name and X-Tenant-Key access key (see TenantRegistry.authenticate)."""
+    return ai_services.authenticate(host, access_key) if ai_services else None
+
+def request_tenant_id():
+    """Tenant of the current request, from its X-Tenant-Key access key or its host name."""
+    return authenticate_tenant(request.host, request.headers.get('X-Tenant-Key'))
+
 app = Flask(__name__)
 
 # Configure CORS for Vercel deployment
 CORS(app, resources={r"/*": {"origins": ["*"]}})
 
+# One record per API request; records logged while handling it carry its interview and question
+init_request_logging(app)
+
+# Sampled stack profiling of requests and background jobs, off unless enabled
+profiler.init_app(app)
+# Anonymized request timing and shapes for load-test replay, off unless TRAFFIC_CAPTURE_FILE is set
+traffic_capture.init_app(app)
+
 # Configure upload folder for Vercel
 UPLOAD_FOLDER = '/tmp/uploads'
 if not os.path.exists(UPLOAD_FOLDER):
@@ -29,10 +109,47 @@ if not os.path.exists(UPLOAD_FOLDER):
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max file size
 
+# Bound disk use of stored answer videos with retention and a disk quota. Only the upload
+# folder is managed; files elsewhere (such as the sample videos in the repository) are never swept
+video_storage = VideoStorageManager([UPLOAD_FOLDER])
+
+# Warm-start snapshot of AI and encoded-response caches, off unless CACHE_SNAPSHOT_FILE is set
+cache_snapshot.add_source(ai_snapshot_sections)
+
+# Hedged start returns within this budget, using cached or fallback content for anything not ready
+START_INTERVIEW_MODE = os.getenv('START_INTERVIEW_MODE', 'blocking')
+START_INTERVIEW_BUDGET_SECONDS = float(os.getenv('START_INTERVIEW_BUDGET_SECONDS', '1.5'))
+# Shared pool for LLM calls that may outlive the request that started them
+ai_executor = ThreadPoolExecutor(max_workers=int(os.getenv('AI_EXECUTOR_WORKERS', '16')), thread_name_prefix='ai')
+
+# Transcribe answers segment by segment while they are still being recorded, with the
+# transcription of the interview's own tenant
+live_transcription = LiveTranscriptionManager(UPLOAD_FOLDER)
+# How long analysis waits for the last live segment before transcribing the whole file
+LIVE_TRANSCRIPTION_WAIT_SECONDS = float(os.getenv('LIVE_TRANSCRIPTION_WAIT_SECONDS', '30'))
+
+# How long clients may cache an answer video requested by version (?v=<its ETag>); the file
+# behind an unversioned URL can change when a preview is generated or the video is compacted
+VIDEO_CACHE_MAX_AGE = int(os.getenv('VIDEO_CACHE_MAX_AGE', str(7 * 24 * 3600)))
+# Hand file bodies to the front server (X-Sendfile) when one is configured
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+
 # In-memory storage for interview data (for demo purposes)
 # In production, use a database
 candidate_interview_data = {}
 
+# Columnar export of interview results for analytics (needs pyarrow)
+results_exporter = ResultsExporter(candidate_interview_data)
+
+def start_background_services():
+    """Start the storage sweeper, cache snapshots and results export, once per server process."""
+    video_storage.start()
+    cache_snapshot.start()
+    results_exporter.start()
+
+if SERVER_PROCESS:
+    start_background_services()
+
 # Health check endpoint
 @app.route('/')
 def home():
@@ -86,41 +203,233 @@ def test_ai():
             "timestamp": str(datetime.datetime.now())
         })
 
+ROLES = [
+    {
+        "title": "Software Engineer",
+        "description": "We're seeking a brilliant Software Engineer to join our innovative team. You'll be crafting cutting-edge applications, solving complex technical challenges, and contributing to products that impact millions of users worldwide. Experience with modern frameworks, cloud technologies, and a passion for clean code is essential.",
+        "icon": "💻",
+        "color": "#8B5CF6"
+    },
+    {
+        "title": "Data Scientist",
+        "description": "Join our data science team to unlock insights from massive datasets and build machine learning models that drive business decisions. You'll work with cutting-edge AI technologies, develop predictive models, and communicate complex findings to stakeholders.",
+        "icon": "📊",
+        "color": "#10B981"
+    },
+    {
+        "title": "Product Manager",
+        "description": "Lead product strategy and execution for innovative digital products. You'll work with cross-functional teams, conduct user research, define product roadmaps, and ensure successful product launches that delight users and drive business growth.",
+        "icon": "🎯",
+        "color": "#F59E0B"
+    },
+    {
+        "title": "UX Designer",
+        "description": "Create exceptional user experiences through thoughtful design, user research, and prototyping. You'll collaborate with product and engineering teams to design intuitive interfaces that solve real user problems and drive engagement.",
+        "icon": "🎨",
+        "color": "#F87171"
+    },
+    {
+        "title": "DevOps Engineer",
+        "description": "Build and maintain robust infrastructure and deployment pipelines. You'll work with cloud technologies, implement CI/CD processes, ensure system reliability, and optimize performance for scalable applications.",
+        "icon": "⚙️",
+        "color": "#14B8A6"
+    }
+]
+
+# Checksum of the encoded catalog: its ETag, and the snapshot name under which the encoded
+# bytes survive restarts, both change whenever the catalog does
+ROLES_VERSION = f"roles-{zlib.crc32(dumps(ROLES)):08x}"
+encoded_cache.persist(('roles',), ROLES_VERSION)
+
 @app.route('/api/roles')
 def get_roles():
-    roles = [
-        {
-            "title": "Software Engineer",
-            "description": "We're seeking a brilliant Software Engineer to join our innovative team. You'll be crafting cutting-edge applications, solving complex technical challenges, and contributing to products that impact millions of users worldwide. Experience with modern frameworks, cloud technologies, and a passion for clean code is essential.",
-            "icon": "💻",
-            "color": "#8B5CF6"
-        },
-        {
-            "title": "Data Scientist",
-            "description": "Join our data science team to unlock insights from massive datasets and build machine learning models that drive business decisions. You'll work with cutting-edge AI technologies, develop predictive models, and communicate complex findings to stakeholders.",
-            "icon": "📊",
-            "color": "#10B981"
-        },
-        {
-            "title": "Product Manager",
-            "description": "Lead product strategy and execution for innovative digital products. You'll work with cross-functional teams, conduct user research, define product roadmaps, and ensure successful product launches that delight users and drive business growth.",
-            "icon": "🎯",
-            "color": "#F59E0B"
-        },
-        {
-            "title": "UX Designer",
-            "description": "Create exceptional user experiences through thoughtful design, user research, and prototyping. You'll collaborate with product and engineering teams to design intuitive interfaces that solve real user problems and drive engagement.",
-            "icon": "🎨",
-            "color": "#F87171"
-        },
-        {
-            "title": "DevOps Engineer",
-            "description": "Build and maintain robust infrastructure and deployment pipelines. You'll work with cloud technologies, implement CI/CD processes, ensure system reliability, and optimize performance for scalable applications.",
-            "icon": "⚙️",
-            "color": "#14B8A6"
-        }
-    ]
-    return jsonify(roles)
+    # The catalog never changes at runtime, so its encoded bytes are cached once
+    return json_response(ROLES, cache_key=('roles',), etag=ROLES_VERSION)
+
+def fallback_greeting(ai_service, role_title):
+    """Static greeting used when the AI service is unavailable or too slow."""
+    if ai_service:
+        # The tenant's own greeting, naming its company
+        return ai_service.fallback_greeting(role_title)
+    return f"Hello! Welcome to your interview for the {role_title} position. I'm excited to learn more about your experience and skills. Let's begin with some questions to better understand your background and capabilities."
+
+def upgrade_placeholder_questions(ai_service, interview_data, placeholders, questions):
+    """Fill still-upgradable slots with late AI questions.
+
+    The placeholders they replace were never shown, so they leave the role's question
+    history again and stay available to later interviews.
+    """
+    replaced = interview_data.upgrade_questions(questions)
+    question_index.forget(question_history_key(ai_service, interview_data.role_title), [placeholders[index] for index in replaced])
+
+def build_start_response(interview_data):
+    """Build the start-interview response from an interview record."""
+    state = interview_data.state
+    return {
+        "status": "success",
+        "interview_id": interview_data.interview_id,
+        "greeting": interview_data.greeting_text,
+        "questions": [question.question_text for question in state.questions],
+        "total_questions": len(state.questions),
+        "upgradable_slots": sorted(state.upgradable)
+    }
+
+def start_hedged_interview(ai_service, interview_id, role_title, role_description, tenant_id=None):
+    """Create an interview within START_INTERVIEW_BUDGET_SECONDS, whatever the AI latency.
+
+    Greeting and questions are generated on the shared AI executor. Anything not ready
+    when the budget runs out is replaced by cached or fallback content. Fallback questions
+    after the first stay upgradable, and AI questions that finish later fill the slots
+    the candidate has not reached yet. The calls hold an admission LLM slot until both
+    finish, so they count against MAX_LLM_REQUESTS even after the response has gone out.
+    """
+    deadline = time.monotonic() + START_INTERVIEW_BUDGET_SECONDS
+    if not admission.acquire_llm_slot(timeout=START_INTERVIEW_BUDGET_SECONDS):
+        # Too many LLM calls in flight to start more within the budget
+        greeting_text = ai_service.get_cached_greeting(role_title) or ai_service.fallback_greeting(role_title)
+        questions = get_randomized_fallback_questions(ai_service, role_title)
+        return InterviewRecord(
+            interview_id, str(uuid.uuid4()), role_title, role_description, greeting_text, questions, tenant_id=tenant_id
+        )
+    
+    # The calls may finish after the response, so the service is held open until then
+    ai_service.retain()
+    greeting_future = ai_executor.submit(ai_service.generate_interview_greeting, role_title)
+    questions_future = ai_executor.submit(ai_service.generate_interview_questions, role_title, role_description)
+    pending = [2]
+    pending_lock = threading.Lock()
+    
+    def release_slot(future):
+        with pending_lock:
+            pending[0] -= 1
+            last = pending[0] == 0
+        if last:
+            admission.release_llm_slot()
+            ai_service.release()
+    greeting_future.add_done_callback(release_slot)
+    questions_future.add_done_callback(release_slot)
+    wait([greeting_future, questions_future], timeout=max(deadline - time.monotonic(), 0))
+    
+    if greeting_future.done() and greeting_future.exception() is None:
+        greeting_text = greeting_future.result()
+    else:
+        greeting_text = ai_service.get_cached_greeting(role_title) or ai_service.fallback_greeting(role_title)
+    
+    if questions_future.done() and questions_future.exception() is None:
+        questions = questions_future.result()
+        upgradable = ()
+    else:
+        questions = get_randomized_fallback_questions(ai_service, role_title)
+        # The first question is displayed right away, so only later slots can change
+        upgradable = range(1, len(questions))
+    
+    interview_data = InterviewRecord(
+        interview_id, str(uuid.uuid4()), role_title, role_description, greeting_text, questions, upgradable, tenant_id
+    )
+    
+    if upgradable:
+        def upgrade(future):
+            if future.exception() is None:
+                upgrade_placeholder_questions(ai_service, interview_data, questions, future.result())
+        questions_future.add_done_callback(upgrade)
+    
+    return interview_data
+
+def stream_hedged_start(ai_service, role_title, role_description):
+    """Greeting deltas and questions for a streamed start within START_INTERVIEW_BUDGET_SECONDS.
+
+    Returns two iterators, to be consumed in order. The greeting streams from the model
+    if its first words arrive within the budget, otherwise the cached or fallback greeting
+    is sent. Questions the model has finished by the end of the budget are sent and
+    fallback questions complete the set; the rest of the model's output is dropped.
+    Like start_hedged_interview, the calls hold an admission LLM slot until they end.
+    """
+    deadline = time.monotonic() + START_INTERVIEW_BUDGET_SECONDS
+    if not admission.acquire_llm_slot(timeout=START_INTERVIEW_BUDGET_SECONDS):
+        # Too many LLM calls in flight to start more within the budget
+        greeting_text = ai_service.get_cached_greeting(role_title) or ai_service.fallback_greeting(role_title)
+        return [greeting_text], get_randomized_fallback_questions(ai_service, role_title)
+    
+    # The calls may run on after the last event, so the service is held open until then
+    ai_service.retain()
+    greeting_deltas = queue.Queue()
+    pending_questions = queue.Queue()
+    stop_greeting = threading.Event()
+    stop_questions = threading.Event()
+    pending = [2]
+    pending_lock = threading.Lock()
+    
+    def produce(stream, target, stop):
+        try:
+            for item in stream:
+                if stop.is_set():
+                    break
+                target.put(item)
+        finally:
+            # A question stream closed early records nothing in the question history
+            stream.close()
+            target.put(None)
+            with pending_lock:
+                pending[0] -= 1
+                last = pending[0] == 0
+            if last:
+                admission.release_llm_slot()
+                ai_service.release()
+    
+    for stream, target, stop in ((ai_service.stream_interview_greeting(role_title), greeting_deltas, stop_greeting),
+                                 (ai_service.stream_interview_questions(role_title, role_description), pending_questions, stop_questions)):
+        thread = threading.Thread(target=produce, args=(stream, target, stop))
+        thread.daemon = True
+        thread.start()
+    
+    def greeting():
+        try:
+            # Once the greeting has started it is sent in full
+            delta = greeting_deltas.get(timeout=max(deadline - time.monotonic(), 0))
+        except queue.Empty:
+            delta = None
+        if delta is None:
+            stop_greeting.set()
+            yield ai_service.get_cached_greeting(role_title) or ai_service.fallback_greeting(role_title)
+            return
+        yield delta
+        yield from iter(greeting_deltas.get, None)
+    
+    def questions():
+        served = []
+        while True:
+            try:
+                question = pending_questions.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if question is None:
+                # The whole set arrived in time and is already recorded in the question history
+                return
+            served.append(question)
+            yield question
+        stop_questions.set()
+        ai_service.record_questions(role_title, served)
+        # At least five questions, as in a complete set from the model
+        yield from get_randomized_fallback_questions(ai_service, role_title, max(5 - len(served), 0))
+    
+    return greeting(), questions()
+
+def admission_response(interview_id, ticket_id):
+    """Admit a new interview, or return the waiting-room response for the client."""
+    try:
+        status = admission.admit(interview_id, ticket_id)
+    except WaitingRoomFull:
+        response = jsonify({"error": "The interview service is at capacity, please try again shortly"})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+    
+    if status is None:
+        return None
+    response = jsonify(status)
+    response.status_code = 202
+    response.headers['Retry-After'] = '2'
+    return response
 
 @app.route('/api/start-interview', methods=['POST'])
 def start_interview():
@@ -133,75 +442,179 @@ def start_interview():
     
     # Generate unique interview ID
     interview_id = str(uuid.uuid4())
+    tenant_id = request_tenant_id()
+    ai_service = get_ai_service(tenant_id)
     
-    try:
-        if ai_service:
-            # Generate AI greeting using OpenAI
-            greeting_text = ai_service.generate_interview_greeting(role_title)
-            
-            # Generate AI questions using OpenAI
-            questions = ai_service.generate_interview_questions(role_title, role_description)
+    # Over capacity the candidate waits in line, retrying with the ticket_id they were given
+    waiting = admission_response(interview_id, data.get('ticket_id'))
+    if waiting is not None:
+        return waiting
+    
+    with admission.starting(interview_id):
+        if ai_service and data.get('mode', START_INTERVIEW_MODE) == 'hedged':
+            interview_data = start_hedged_interview(ai_service, interview_id, role_title, role_description, tenant_id)
         else:
-            # Fallback for deployment
-            greeting_text = f"Hello! Welcome to your interview for the {role_title} position. I'm excited to learn more about your experience and skills. Let's begin with some questions to better understand your background and capabilities."
-            questions = get_randomized_fallback_questions(role_title)
-        
-        # Store interview data
-        candidate_interview_data[interview_id] = {
-            "candidate_id": str(uuid.uuid4()),
-            "interview_id": interview_id,
-            "role_title": role_title,
-            "role_description": role_description,
-            "greeting_text": greeting_text,
-            "questions": [{"question_text": q, "video_path": None, "transcription": None, "summary": None, "evaluation": None} for q in questions],
-            "overall_evaluation": None
-        }
-        
-        # Extract question text for frontend
-        question_texts = [q["question_text"] if isinstance(q, dict) else q for q in questions]
-        
-        response_data = {
-            "status": "success",
-            "interview_id": interview_id,
-            "greeting": greeting_text,
-            "questions": question_texts,
-            "total_questions": len(questions)
-        }
-        
-        return jsonify(response_data)
+            try:
+                with admission.llm_slot() as has_llm_slot:
+                    if ai_service and has_llm_slot:
+                        # Generate AI greeting using OpenAI
+                        greeting_text = ai_service.generate_interview_greeting(role_title)
+                    
+                        # Generate AI questions using OpenAI
+                        questions = ai_service.generate_interview_questions(role_title, role_description)
+                    else:
+                        # Fallback for deployment, or when too many LLM calls are in flight
+                        greeting_text = fallback_greeting(ai_service, role_title)
+                        questions = get_randomized_fallback_questions(ai_service, role_title)
+            except Exception as e:
+                logger.error("Error starting interview, using fallback content: %s", e)
+                # Fallback to static content if AI fails
+                greeting_text = fallback_greeting(ai_service, role_title)
+            
+                # Use fallback questions with randomization
+                questions = get_randomized_fallback_questions(ai_service, role_title)
         
-    except Exception as e:
-        # Fallback to static content if AI fails
-        greeting_text = f"Hello! Welcome to your interview for the {role_title} position. I'm excited to learn more about your experience and skills. Let's begin with some questions to better understand your background and capabilities."
+            interview_data = InterviewRecord(
+                interview_id, str(uuid.uuid4()), role_title, role_description, greeting_text, questions, tenant_id=tenant_id
+            )
         
-        # Use fallback questions with randomization
-        questions = get_randomized_fallback_questions(role_title)
+        # Store interview data
+        candidate_interview_data[interview_id] = interview_data
+        g.created_interview_id = interview_id
+    
+    return jsonify(build_start_response(interview_data))
+
+@app.route('/api/get-question/<interview_id>/<int:question_index>')
+def get_question(interview_id, question_index):
+    """Return a question's current text, fixing it so a late AI upgrade no longer changes it."""
+    if interview_id not in candidate_interview_data:
+        return jsonify({"error": "Interview not found"}), 404
+    
+    interview_data = candidate_interview_data[interview_id]
+    
+    if question_index >= len(interview_data.questions):
+        return jsonify({"error": "Invalid question index"}), 400
+    
+    admission.touch(interview_id)
+    return jsonify({
+        "status": "success",
+        "question_index": question_index,
+        "question_text": interview_data.claim_question(question_index)
+    })
+
+@app.route('/api/start-interview/stream', methods=['POST'])
+def start_interview_stream():
+    """Start an interview, streaming the greeting and questions as newline-delimited JSON.
+
+    The interview_id is sent first, then greeting text as the model produces it, then each
+    question as soon as its line is complete. Questions are generated concurrently with
+    the greeting, so the stream ends after the slower of the two completions. In hedged
+    mode the content is capped by START_INTERVIEW_BUDGET_SECONDS (see stream_hedged_start).
+    """
+    data = request.get_json()
+    role_title = data.get('role_title')
+    role_description = data.get('role_description')
+    
+    if not role_title:
+        return jsonify({"error": "Role title is required"}), 400
+    
+    interview_id = str(uuid.uuid4())
+    tenant_id = request_tenant_id()
+    ai_service = get_ai_service(tenant_id)
+    
+    # Waiting-room responses are plain JSON with status 202, not a stream
+    waiting = admission_response(interview_id, data.get('ticket_id'))
+    if waiting is not None:
+        return waiting
+    
+    interview_data = InterviewRecord(interview_id, str(uuid.uuid4()), role_title, role_description, "", [], tenant_id=tenant_id)
+    candidate_interview_data[interview_id] = interview_data
+    g.created_interview_id = interview_id
+    hedged = ai_service is not None and data.get('mode', START_INTERVIEW_MODE) == 'hedged'
+    
+    def event(payload):
+        return json.dumps(payload) + "\n"
+    
+    completed = False
+    
+    def generate():
+        nonlocal completed
+        yield event({"type": "interview", "status": "success", "interview_id": interview_id})
         
-        candidate_interview_data[interview_id] = {
-            "candidate_id": str(uuid.uuid4()),
-            "interview_id": interview_id,
-            "role_title": role_title,
-            "role_description": role_description,
-            "greeting_text": greeting_text,
-            "questions": [{"question_text": q, "video_path": None, "transcription": None, "summary": None, "evaluation": None} for q in questions],
-            "overall_evaluation": None
-        }
+        if hedged:
+            yield from send_content(*stream_hedged_start(ai_service, role_title, role_description))
+        else:
+            with admission.llm_slot() as has_llm_slot:
+                yield from generate_content(has_llm_slot)
+        completed = True
+    
+    def release_if_incomplete():
+        # The stream failed or the client went away before the interview was fully sent
+        if not completed:
+            admission.release(interview_id)
+    
+    def generate_content(has_llm_slot):
+        if ai_service and has_llm_slot:
+            pending_questions = queue.Queue()
+            
+            def produce_questions():
+                try:
+                    for question in ai_service.stream_interview_questions(role_title, role_description):
+                        pending_questions.put(question)
+                finally:
+                    pending_questions.put(None)
+            
+            thread = threading.Thread(target=produce_questions)
+            thread.daemon = True
+            thread.start()
+            
+            yield from send_content(ai_service.stream_interview_greeting(role_title), iter(pending_questions.get, None))
+        else:
+            # Fallback for deployment, or when too many LLM calls are in flight
+            yield from send_content([fallback_greeting(ai_service, role_title)], get_randomized_fallback_questions(ai_service, role_title))
+    
+    def send_content(greeting_deltas, questions):
+        greeting_parts = []
+        for delta in greeting_deltas:
+            greeting_parts.append(delta)
+            yield event({"type": "greeting_delta", "text": delta})
+        greeting_text = "".join(greeting_parts).strip()
         
-        # Extract question text for frontend
-        question_texts = [q["question_text"] if isinstance(q, dict) else q for q in questions]
+        interview_data.set_greeting(greeting_text)
+        yield event({"type": "greeting", "text": greeting_text})
         
-        response_data = {
-            "status": "success",
-            "interview_id": interview_id,
-            "greeting": greeting_text,
-            "questions": question_texts,
-            "total_questions": len(questions)
-        }
+        for index, question in enumerate(questions):
+            interview_data.append_question(question)
+            yield event({"type": "question", "index": index, "text": question})
         
-        return jsonify(response_data)
+        yield event({"type": "done", "total_questions": len(interview_data.questions)})
+    
+    response = Response(generate(), mimetype='application/x-ndjson', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # Stop proxies from buffering the stream
+    })
+    response.call_on_close(release_if_incomplete)
+    return response
+
+@app.route('/api/waiting-room')
+def waiting_room_stats():
+    """Current load: active interviews, waiting candidates and LLM calls in flight."""
+    return jsonify(admission.stats())
+
+@app.route('/api/waiting-room/<ticket_id>')
+def waiting_room_status(ticket_id):
+    """Position and estimated wait of a waiting-room ticket; polling keeps the ticket alive."""
+    status = admission.poll(ticket_id)
+    if status is None:
+        return jsonify({"error": "Ticket not found or expired"}), 404
+    return jsonify(status)
+
+def question_history_key(ai_service, role_title):
+    """Key of the role's question history, shared by AI and fallback questions of the tenant."""
+    return ai_service.question_history_key(role_title) if ai_service else role_title
 
-def get_randomized_fallback_questions(role_title):
-    """Generate randomized fallback questions for variety."""
+def get_randomized_fallback_questions(ai_service, role_title, num_questions=None):
+    """Generate randomized fallback questions for variety, 5-7 unless `num_questions` is given."""
     import random
     
     # Large pool of questions for each role
@@ -312,12 +725,11 @@ def get_randomized_fallback_questions(role_title):
         "How do you measure success in your work?"
     ])
     
-    # Randomly select 5-7 questions
-    num_questions = random.randint(5, 7)
-    selected_questions = random.sample(role_questions, min(num_questions, len(role_questions)))
-    
-    # Shuffle the order for additional variety
-    random.shuffle(selected_questions)
+    # Randomly select 5-7 questions, avoiding ones issued in recent interviews
+    if num_questions is None:
+        num_questions = random.randint(5, 7)
+    shuffled_questions = random.sample(role_questions, len(role_questions))
+    selected_questions = question_index.select(question_history_key(ai_service, role_title), shuffled_questions, num_questions)
     
     return selected_questions
 
@@ -332,58 +744,98 @@ def submit_answer(interview_id, question_index):
     if not video_path:
         return jsonify({"error": "Video path is required"}), 400
     
+    admission.touch(interview_id)
+    
     interview_data = candidate_interview_data[interview_id]
     
-    if question_index >= len(interview_data['questions']):
+    if question_index >= len(interview_data.questions):
         return jsonify({"error": "Invalid question index"}), 400
     
+    video_storage.touch(video_path)
+    
+    # Coalesce double submits and retries of the same recording into one analysis job
+    job_key = (interview_id, question_index, video_fingerprint(video_path))
+    job, created = analysis_jobs.claim(job_key, request.headers.get('Idempotency-Key'))
+    
+    if not created:
+        # A resubmitted earlier recording gets that job's results back, even if a newer
+        # recording replaced them in the meantime
+        interview_data.resume_analysis(question_index, job.key)
+        return jsonify({
+            "status": "success",
+            "message": f"Answer for question {question_index + 1} already submitted. AI analysis {'in progress' if job.status == 'running' else 'complete'}.",
+            "question_index": question_index,
+            "duplicate": True
+        })
+    
     # First, update with video path and start AI processing
-    interview_data['questions'][question_index].update({
-        "video_path": video_path,
-        "transcription": "Processing...",
-        "summary": "Processing...",
-        "evaluation": "Processing..."
-    })
+    interview_data.begin_analysis(question_index, job_key, video_path)
+    question_text = interview_data.questions[question_index].question_text
     
     # Start AI processing in background thread
     def process_ai_analysis():
-        try:
-            if ai_service:
-                # Step 1: Transcribe video
-                transcription = ai_service.transcribe_video(video_path)
+        # Camera and lighting metrics from sampled keyframes, computed on the video analysis
+        # process pool while transcription runs; stored whenever they are ready
+        def store_video_metrics(metrics):
+            if metrics:
+                interview_data.finish_analysis(question_index, job_key, video_metrics=metrics)
+        
+        # The service stays open for the whole job, even if its tenant is evicted meanwhile
+        with leased_ai_service(interview_data.tenant_id) as ai_service:
+            try:
+                video_analyzer.analyze_async(video_storage.resolve(video_path), store_video_metrics)
+                if ai_service:
+                    # Step 1: Transcribe video, reusing a cached transcription if the video was compacted
+                    # or the transcript streamed in while the candidate was recording
+                    transcription = video_storage.get_cached_transcription(video_path)
+                    if not transcription:
+                        transcription = live_transcription.get_transcription(video_path, LIVE_TRANSCRIPTION_WAIT_SECONDS)
+                        if transcription:
+                            video_storage.mark_transcribed(video_path, transcription)
+                    if not transcription:
+                        transcription = ai_service.transcribe_video(video_path)
+                        if not transcription.startswith('['):
+                            video_storage.mark_transcribed(video_path, transcription)
                 
-                # Step 2: Generate summary
-                question_text = interview_data['questions'][question_index]['question_text']
-                summary = ai_service.generate_answer_summary(question_text, transcription)
+                    # Step 2: Generate summary
+                    summary = ai_service.generate_answer_summary(question_text, transcription)
                 
-                # Step 3: Generate evaluation
-                role_description = interview_data['role_description']
-                evaluation = ai_service.generate_evaluation(role_description, question_text, transcription)
-            else:
-                # Fallback for deployment
-                transcription = f"[DEMO] Video transcription for question {question_index + 1}"
-                summary = f"[DEMO] Summary of answer for question {question_index + 1}"
-                evaluation = generate_unique_evaluation(interview_data['role_description'], interview_data['questions'][question_index]['question_text'], transcription, question_index)
+                    # Step 3: Generate evaluation
+                    evaluation = ai_service.generate_evaluation(interview_data.role_profile, question_text, transcription)
+                else:
+                    # Fallback for deployment
+                    transcription = f"[DEMO] Video transcription for question {question_index + 1}"
+                    summary = f"[DEMO] Summary of answer for question {question_index + 1}"
+                    evaluation = generate_unique_evaluation(interview_data.role_description, question_text, transcription, question_index)
             
-            # Update the data with AI results
-            interview_data['questions'][question_index].update({
-                "transcription": transcription,
-                "summary": summary,
-                "evaluation": evaluation
-            })
+                # Pace and pause metrics from the recording itself, when ffmpeg and numpy are available
+                delivery_metrics = analyze_delivery(video_storage.resolve(video_path), transcription)
+                if delivery_metrics and isinstance(evaluation, dict):
+                    evaluation = {**evaluation, "delivery_metrics": delivery_metrics}
             
-        except Exception as e:
-            # Set fallback values if AI processing fails
-            interview_data['questions'][question_index].update({
-                "transcription": f"[ERROR] Transcription failed for question {question_index + 1}",
-                "summary": f"[ERROR] Summary generation failed for question {question_index + 1}",
-                "evaluation": generate_fallback_evaluation(question_index)
-            })
+                # Update the data with AI results, unless a re-recorded answer superseded this job
+                interview_data.finish_analysis(
+                    question_index, job_key,
+                    transcription=transcription,
+                    summary=summary,
+                    evaluation=evaluation
+                )
+            
+            except Exception as e:
+                logger.error("Error analyzing answer: %s", e)
+                # Set fallback values if AI processing fails
+                interview_data.finish_analysis(
+                    question_index, job_key,
+                    transcription=f"[ERROR] Transcription failed for question {question_index + 1}",
+                    summary=f"[ERROR] Summary generation failed for question {question_index + 1}",
+                    evaluation=generate_fallback_evaluation(question_index)
+                )
+        
+        # Prepare the low-bitrate playback rendition off the request path
+        video_storage.generate_preview(video_path)
     
     # Start background processing
-    thread = threading.Thread(target=process_ai_analysis)
-    thread.daemon = True
-    thread.start()
+    analysis_jobs.run(job, profiler.wrap(f"analysis {interview_id}/{question_index}", process_ai_analysis))
     
     return jsonify({
         "status": "success",
@@ -391,6 +843,91 @@ def submit_answer(interview_id, question_index):
         "question_index": question_index
     })
 
+@app.route('/api/stream-answer/<interview_id>/<int:question_index>/chunk', methods=['POST'])
+def stream_answer_chunk(interview_id, question_index):
+    """Accept one MediaRecorder chunk of an answer that is still being recorded."""
+    if interview_id not in candidate_interview_data:
+        return jsonify({"error": "Interview not found"}), 404
+    
+    if question_index >= len(candidate_interview_data[interview_id].questions):
+        return jsonify({"error": "Invalid question index"}), 400
+    
+    admission.touch(interview_id)
+    seq = request.args.get('seq', type=int)
+    recording_id = request.args.get('recording_id')
+    if seq is None or seq < 0 or not recording_id:
+        return jsonify({"error": "Recording ID and chunk sequence number are required"}), 400
+    
+    if not ai_services:
+        return jsonify({"error": "Live transcription not available in deployment mode"}), 503
+    
+    live_transcription.append_chunk(
+        interview_id, question_index, seq, request.get_data(),
+        tenant_transcriber(candidate_interview_data[interview_id].tenant_id),
+        end_ms=request.args.get('end_ms', type=int),
+        recording_id=recording_id
+    )
+    
+    return jsonify({
+        "status": "success",
+        "seq": seq
+    })
+
+@app.route('/api/stream-answer/<interview_id>/<int:question_index>/finish', methods=['POST'])
+def stream_answer_finish(interview_id, question_index):
+    """Close a streamed recording; the returned video_path is then passed to submit-answer."""
+    if interview_id not in candidate_interview_data:
+        return jsonify({"error": "Interview not found"}), 404
+    
+    session = live_transcription.finish(interview_id, question_index)
+    if session is None:
+        return jsonify({"error": "No recording in progress for this question"}), 404
+    
+    return jsonify({
+        "status": "success",
+        "video_path": session.video_path,
+        "question_index": question_index
+    })
+
+@app.route('/api/video/<interview_id>/<int:question_index>')
+def get_answer_video(interview_id, question_index):
+    """Stream a stored answer video with Range and conditional request support."""
+    if interview_id not in candidate_interview_data:
+        return jsonify({"error": "Interview not found"}), 404
+    
+    questions = candidate_interview_data[interview_id].questions
+    
+    if question_index >= len(questions):
+        return jsonify({"error": "Invalid question index"}), 400
+    
+    video_path = video_storage.resolve(questions[question_index].video_path)
+    if not video_path:
+        return jsonify({"error": "Video not available"}), 404
+    
+    # Serve the pre-generated preview rendition when one is requested and exists
+    if request.args.get('rendition') == 'preview':
+        video_path = video_storage.resolve(video_storage.preview_path(video_path)) or video_path
+    
+    video_storage.touch(video_path)
+    
+    response = send_from_directory(
+        os.path.dirname(video_path),
+        os.path.basename(video_path),
+        mimetype='audio/webm' if video_path.endswith('.weba') else None,
+        conditional=True
+    )
+    response.headers['Accept-Ranges'] = 'bytes'
+    # Candidate recordings are never stored by shared caches
+    response.cache_control.private = True
+    etag, _ = response.get_etag()
+    if etag and request.args.get('v') == etag:
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = VIDEO_CACHE_MAX_AGE
+    else:
+        # Revalidated against the ETag on every use
+        response.cache_control.no_cache = True
+    return response
+
 def generate_unique_evaluation(role_description, question_text, transcription, question_index):
     """Generate unique evaluation for each answer based on question context."""
     import random
@@ -497,36 +1034,13 @@ def generate_overall_summary(interview_id):
     
     interview_data = candidate_interview_data[interview_id]
     
-    # Start AI processing in background thread
-    def process_overall_summary():
-        try:
-            # Collect all transcriptions and evaluations
-            all_transcriptions = []
-            all_evaluations = []
-            
-            for i, question in enumerate(interview_data['questions']):
-                if question.get('transcription') and question.get('transcription') != "Processing...":
-                    all_transcriptions.append(f"Question {i+1}: {question['transcription']}")
-                if question.get('evaluation') and isinstance(question.get('evaluation'), dict):
-                    all_evaluations.append(question['evaluation'])
-            
-            if all_transcriptions and all_evaluations:
-                # Generate overall summary using AI
-                overall_summary = generate_fast_overall_summary(
-                    interview_data['role_title'],
-                    interview_data['role_description'],
-                    all_transcriptions,
-                    all_evaluations,
-                    interview_id
-                )
-                
-                interview_data['overall_evaluation'] = overall_summary
-            
-        except Exception as e:
-            interview_data['overall_evaluation'] = generate_fallback_overall_summary(interview_data['role_title'])
+    # The candidate is done, so their slot can go to the next one in the waiting room
+    admission.release(interview_id)
     
     # Start background processing
-    thread = threading.Thread(target=process_overall_summary)
+    thread = threading.Thread(target=profiler.wrap(
+        f"overall summary {interview_id}", lambda: summarize_interview(interview_id, interview_data)
+    ))
     thread.daemon = True
     thread.start()
     
@@ -535,6 +1049,42 @@ def generate_overall_summary(interview_id):
         "message": "Overall summary generation started"
     })
 
+def summarize_interview(interview_id, interview_data):
+    """Build and store the overall evaluation from the answers analyzed so far."""
+    try:
+        # Collect all transcriptions and evaluations
+        all_transcriptions = []
+        all_evaluations = []
+        
+        for i, question in enumerate(interview_data.questions):
+            if question.transcription and question.transcription != PROCESSING:
+                all_transcriptions.append(f"Question {i+1}: {question.transcription}")
+            if question.evaluation and isinstance(question.evaluation, dict):
+                all_evaluations.append(question.evaluation)
+        
+        if all_transcriptions and all_evaluations:
+            with leased_ai_service(interview_data.tenant_id) as ai_service:
+                if ai_service and ai_service.has_api_key:
+                    # Judged against the same role profile as the per-answer evaluations
+                    overall_summary = ai_service.generate_overall_summary(
+                        interview_data.role_profile, all_transcriptions, all_evaluations
+                    )
+                else:
+                    # Template summary when the AI is not available
+                    overall_summary = generate_fast_overall_summary(
+                        interview_data.role_title,
+                        interview_data.role_description,
+                        all_transcriptions,
+                        all_evaluations,
+                        interview_id
+                    )
+            
+            interview_data.set_overall_evaluation(overall_summary)
+        
+    except Exception as e:
+        logger.error("Error generating overall summary: %s", e, extra={'interview_id': interview_id})
+        interview_data.set_overall_evaluation(generate_fallback_overall_summary(interview_data.role_title))
+
 def generate_fast_overall_summary(role_title, role_description, transcriptions, evaluations, interview_id):
     """Generate fast and unique overall summary."""
     import random
@@ -688,35 +1238,111 @@ def generate_fallback_overall_summary(role_title):
         "final_recommendation": "Manual review required"
     }
 
-@app.route('/api/get-report/<interview_id>')
-def get_report(interview_id):
-    if interview_id not in candidate_interview_data:
-        return jsonify({"error": "Interview not found"}), 404
-    
-    interview_data = candidate_interview_data[interview_id]
-    
+def build_report(interview_data, state):
+    """Report payload for one snapshot of an interview's state."""
     # Check if AI processing is complete
     ai_processing_complete = True
-    for question in interview_data['questions']:
-        if question.get('transcription') == "Processing..." or question.get('summary') == "Processing..." or question.get('evaluation') == "Processing...":
+    for question in state.questions:
+        if question.transcription == PROCESSING or question.summary == PROCESSING or question.evaluation == PROCESSING:
             ai_processing_complete = False
             break
     
     # Prepare report data
-    report_data = {
-        "interview_id": interview_id,
-        "candidate_id": interview_data['candidate_id'],
-        "role_title": interview_data['role_title'],
-        "role_description": interview_data['role_description'],
-        "greeting_text": interview_data['greeting_text'],
-        "questions": interview_data['questions'],
-        "overall_evaluation": interview_data.get('overall_evaluation'),
+    return {
+        "interview_id": interview_data.interview_id,
+        "candidate_id": interview_data.candidate_id,
+        "role_title": interview_data.role_title,
+        "role_description": interview_data.role_description,
+        "greeting_text": interview_data.greeting_text,
+        "questions": [question._asdict() for question in state.questions],
+        "overall_evaluation": state.overall_evaluation,
         "ai_processing_complete": ai_processing_complete,
-        "total_questions": len(interview_data['questions']),
-        "completed_questions": sum(1 for q in interview_data['questions'] if q.get('transcription') and q.get('transcription') != "Processing...")
+        "total_questions": len(state.questions),
+        "completed_questions": sum(1 for q in state.questions if q.transcription and q.transcription != PROCESSING)
     }
+
+@app.route('/api/get-report/<interview_id>')
+def get_report(interview_id):
+    if interview_id not in candidate_interview_data:
+        return jsonify({"error": "Interview not found"}), 404
+    
+    interview_data = candidate_interview_data[interview_id]
+    
+    # Take one consistent snapshot; writers swap in new state objects instead of mutating this one
+    state = interview_data.state
+    
+    # Unchanged interviews reuse their encoded report, and pollers get 304 via the ETag
+    response = json_response(
+        lambda: build_report(interview_data, state),
+        cache_key=('report', interview_id, state.version),
+        etag=f"{interview_id}-{state.version}"
+    )
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/model-routing')
+def model_routing_stats():
+    """Observed latency and error rate per model tier for the request's tenant."""
+    ai_service = get_ai_service(request_tenant_id())
+    if not ai_service:
+        return jsonify({"error": "AI service not available"}), 503
+    return jsonify({
+        "tenant_id": ai_service.tenant_id,
+        "tiers": ai_service.router.tiers,
+        "models": ai_service.router.stats()
+    })
+
+@app.route('/api/export', methods=['GET', 'POST'])
+def export_results():
+    """Start an incremental Parquet export of interview results, or report export status."""
+    if request.method == 'GET':
+        return jsonify(results_exporter.status())
+    
+    if not results_exporter.available:
+        return jsonify({"error": "Export requires pyarrow"}), 503
+    
+    data = request.get_json(silent=True) or {}
+    if not results_exporter.start_run(full=bool(data.get('full'))):
+        return jsonify({"error": "An export is already running"}), 409
+    
+    return jsonify({
+        "status": "started",
+        "since": 0.0 if data.get('full') else results_exporter.watermark()
+    }), 202
+
+@app.route('/api/profiling', methods=['GET', 'POST'])
+def profiling_summary():
+    """Slowest recent profiled requests and jobs; POST {"sample_rate": x} changes sampling at runtime."""
+    if not profiler.authorized(request.headers.get('X-Profile-Token')):
+        return jsonify({"error": "Profiling is not enabled"}), 403
+    
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            sample_rate = float(data.get('sample_rate', profiler.sample_rate))
+        except (TypeError, ValueError):
+            return jsonify({"error": "sample_rate must be a number"}), 400
+        profiler.sample_rate = min(max(sample_rate, 0.0), 1.0)
+    
+    return jsonify({
+        "sample_rate": profiler.sample_rate,
+        "interval_ms": profiler.interval_ms,
+        "slowest": profiler.slowest()
+    })
+
+@app.route('/api/profiling/<profile_id>')
+def get_profile(profile_id):
+    """Download a recent profile as speedscope JSON, or as folded stacks with ?format=folded."""
+    if not profiler.authorized(request.headers.get('X-Profile-Token')):
+        return jsonify({"error": "Profiling is not enabled"}), 403
+    
+    profile = profiler.find(profile_id)
+    if profile is None:
+        return jsonify({"error": "Profile not found"}), 404
     
-    return jsonify(report_data)
+    if request.args.get('format') == 'folded':
+        return Response(profile.to_folded(), mimetype='text/plain')
+    return jsonify(profile.to_speedscope(profiler.interval_ms))
 
 if __name__ == "__main__":
     app.run(debug=True, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
@@ -0,0 +1,479 @@
+import io
+import logging
+import os
+import re
+import sys
+import json
+import uuid
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from app import (
+    app as flask_app, candidate_interview_data, get_ai_service, leased_ai_service, authenticate_tenant, fallback_greeting, upgrade_placeholder_questions,
+    get_randomized_fallback_questions, build_start_response, build_report, summarize_interview, generate_unique_evaluation, generate_fallback_evaluation,
+    video_storage, live_transcription, ai_executor, START_INTERVIEW_MODE, START_INTERVIEW_BUDGET_SECONDS,
+    LIVE_TRANSCRIPTION_WAIT_SECONDS
+)
+from flask import g
+from admission import admission, WaitingRoomFull
+from analysis_jobs import analysis_jobs, video_fingerprint
+from interview_store import InterviewRecord
+from response_encoding import encode_json
+from audio_analysis import analyze_delivery
+from profiling import profiler
+from video_analysis import video_analyzer
+
+logger = logging.getLogger(__name__)
+
+# ASGI entry point: `uvicorn asgi:app` (pip install uvicorn).
+#
+# The AI-bound routes below are async handlers awaiting AIService's AsyncOpenAI client,
+# so a request waiting on OpenAI holds no thread and one process can keep thousands of
+# them in flight. Every other route is served by the Flask app on a small pool of
+# ASGI_WSGI_THREADS threads. Both share the same in-memory interviews, so clients see no
+# difference. The async routes run inside a Flask request context too, so the app's
+# request hooks (request logging, profiling, traffic capture) see every route.
+
+WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', '8'))
+wsgi_executor = ThreadPoolExecutor(max_workers=WSGI_THREADS, thread_name_prefix='wsgi')
+
+# Tasks that outlive their request; the event loop keeps only weak references
+_background_tasks = set()
+
+
+def _keep(task):
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+class Request:
+    __slots__ = ('scope', 'body', 'headers')
+
+    def __init__(self, scope, body):
+        self.scope = scope
+        self.body = body
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope['headers']}
+
+    def json(self):
+        try:
+            data = json.loads(self.body or b'null')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+
+def reply(payload, status=200, headers=None):
+    """An (status, headers, body) response with a JSON body."""
+    headers = dict(headers or {})
+    headers['content-type'] = 'application/json'
+    return status, headers, json.dumps(payload).encode('utf-8')
+
+
+def admission_reply(interview_id, ticket_id):
+    """Admit a new interview, or return the waiting-room response for the client."""
+    try:
+        status = admission.admit(interview_id, ticket_id)
+    except WaitingRoomFull:
+        return reply({"error": "The interview service is at capacity, please try again shortly"}, 503, {'retry-after': '30'})
+    if status is None:
+        return None
+    return reply(status, 202, {'retry-after': '2'})
+
+
+async def start_hedged_interview(ai_service, interview_id, role_title, role_description, tenant_id=None):
+    """Async form of app.start_hedged_interview: answer within the budget, upgrade questions later."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + START_INTERVIEW_BUDGET_SECONDS
+    if not await admission.acquire_llm_slot_async(timeout=START_INTERVIEW_BUDGET_SECONDS):
+        # Too many LLM calls in flight to start more within the budget
+        greeting_text = ai_service.get_cached_greeting(role_title) or ai_service.fallback_greeting(role_title)
+        questions = get_randomized_fallback_questions(ai_service, role_title)
+        return InterviewRecord(
+            interview_id, str(uuid.uuid4()), role_title, role_description, greeting_text, questions, tenant_id=tenant_id
+        )
+
+    greeting_task = _keep(asyncio.ensure_future(ai_service.generate_interview_greeting_async(role_title)))
+    questions_task = _keep(asyncio.ensure_future(ai_service.generate_interview_questions_async(role_title, role_description)))
+    # The LLM slot and the service are held until both calls finish, even after the response has gone out
+    ai_service.retain()
+    both = _keep(asyncio.gather(greeting_task, questions_task, return_exceptions=True))
+    both.add_done_callback(lambda _: (admission.release_llm_slot(), ai_service.release()))
+    await asyncio.wait([greeting_task, questions_task], timeout=max(deadline - loop.time(), 0))
+
+    if greeting_task.done() and greeting_task.exception() is None:
+        greeting_text = greeting_task.result()
+    else:
+        greeting_text = ai_service.get_cached_greeting(role_title) or ai_service.fallback_greeting(role_title)
+
+    if questions_task.done() and questions_task.exception() is None:
+        questions = questions_task.result()
+        upgradable = ()
+    else:
+        questions = get_randomized_fallback_questions(ai_service, role_title)
+        # The first question is displayed right away, so only later slots can change
+        upgradable = range(1, len(questions))
+
+    interview_data = InterviewRecord(
+        interview_id, str(uuid.uuid4()), role_title, role_description, greeting_text, questions, upgradable, tenant_id
+    )
+
+    if upgradable:
+        def upgrade(task):
+            if not task.cancelled() and task.exception() is None:
+                upgrade_placeholder_questions(ai_service, interview_data, questions, task.result())
+        questions_task.add_done_callback(upgrade)
+
+    return interview_data
+
+
+async def start_interview(request):
+    data = request.json() or {}
+    role_title = data.get('role_title')
+    role_description = data.get('role_description')
+
+    if not role_title:
+        return reply({"error": "Role title is required"}, 400)
+
+    interview_id = str(uuid.uuid4())
+    tenant_id = authenticate_tenant(request.headers.get('host'), request.headers.get('x-tenant-key'))
+    ai_service = get_ai_service(tenant_id)
+
+    # Over capacity the candidate waits in line, retrying with the ticket_id they were given
+    waiting = admission_reply(interview_id, data.get('ticket_id'))
+    if waiting is not None:
+        return waiting
+
+    # A start that fails or is cancelled when the client goes away gives its slot back
+    with admission.starting(interview_id):
+        if ai_service and data.get('mode', START_INTERVIEW_MODE) == 'hedged':
+            interview_data = await start_hedged_interview(ai_service, interview_id, role_title, role_description, tenant_id)
+        else:
+            try:
+                async with admission.llm_slot_async() as has_llm_slot:
+                    if ai_service and has_llm_slot:
+                        # Greeting and questions are requested concurrently
+                        greeting_text, questions = await asyncio.gather(
+                            ai_service.generate_interview_greeting_async(role_title),
+                            ai_service.generate_interview_questions_async(role_title, role_description)
+                        )
+                    else:
+                        greeting_text = fallback_greeting(ai_service, role_title)
+                        questions = get_randomized_fallback_questions(ai_service, role_title)
+            except Exception as e:
+                logger.error("Error starting interview: %s", e)
+                greeting_text = fallback_greeting(ai_service, role_title)
+                questions = get_randomized_fallback_questions(ai_service, role_title)
+
+            interview_data = InterviewRecord(
+                interview_id, str(uuid.uuid4()), role_title, role_description, greeting_text, questions, tenant_id=tenant_id
+            )
+
+        candidate_interview_data[interview_id] = interview_data
+        g.created_interview_id = interview_id
+    return reply(build_start_response(interview_data))
+
+
+async def analyze_answer(interview_data, question_index, job_key, video_path):
+    """Async form of the analysis in app.submit_answer; blocking file work runs on threads."""
+    question_text = interview_data.questions[question_index].question_text
+
+    def store_video_metrics(metrics):
+        if metrics:
+            interview_data.finish_analysis(question_index, job_key, video_metrics=metrics)
+
+    # The service stays open for the whole analysis, even if its tenant is evicted meanwhile
+    with leased_ai_service(interview_data.tenant_id) as ai_service:
+        try:
+            video_analyzer.analyze_async(video_storage.resolve(video_path), store_video_metrics)
+            if ai_service:
+                transcription = video_storage.get_cached_transcription(video_path)
+                if not transcription:
+                    transcription = await live_transcription.get_transcription_async(video_path, LIVE_TRANSCRIPTION_WAIT_SECONDS)
+                    if transcription:
+                        video_storage.mark_transcribed(video_path, transcription)
+                if not transcription:
+                    transcription = await ai_service.transcribe_video_async(video_path)
+                    if not transcription.startswith('['):
+                        video_storage.mark_transcribed(video_path, transcription)
+
+                summary, evaluation = await asyncio.gather(
+                    ai_service.generate_answer_summary_async(question_text, transcription),
+                    ai_service.generate_evaluation_async(interview_data.role_profile, question_text, transcription)
+                )
+            else:
+                transcription = f"[DEMO] Video transcription for question {question_index + 1}"
+                summary = f"[DEMO] Summary of answer for question {question_index + 1}"
+                evaluation = generate_unique_evaluation(interview_data.role_description, question_text, transcription, question_index)
+
+            delivery_metrics = await asyncio.to_thread(analyze_delivery, video_storage.resolve(video_path), transcription)
+            if delivery_metrics and isinstance(evaluation, dict):
+                evaluation = {**evaluation, "delivery_metrics": delivery_metrics}
+
+            interview_data.finish_analysis(
+                question_index, job_key,
+                transcription=transcription,
+                summary=summary,
+                evaluation=evaluation
+            )
+
+        except Exception as e:
+            logger.error("Error analyzing answer: %s", e)
+            interview_data.finish_analysis(
+                question_index, job_key,
+                transcription=f"[ERROR] Transcription failed for question {question_index + 1}",
+                summary=f"[ERROR] Summary generation failed for question {question_index + 1}",
+                evaluation=generate_fallback_evaluation(question_index)
+            )
+
+    await asyncio.to_thread(video_storage.generate_preview, video_path)
+
+
+async def submit_answer(request, interview_id, question_index):
+    question_index = int(question_index)
+    if interview_id not in candidate_interview_data:
+        return reply({"error": "Interview not found"}, 404)
+
+    video_path = (request.json() or {}).get('video_path')
+    if not video_path:
+        return reply({"error": "Video path is required"}, 400)
+
+    admission.touch(interview_id)
+    interview_data = candidate_interview_data[interview_id]
+
+    if question_index >= len(interview_data.questions):
+        return reply({"error": "Invalid question index"}, 400)
+
+    video_storage.touch(video_path)
+
+    # Coalesce double submits and retries of the same recording into one analysis job
+    job_key = (interview_id, question_index, video_fingerprint(video_path))
+    job, created = analysis_jobs.claim(job_key, request.headers.get('idempotency-key'))
+
+    if not created:
+        # A resubmitted earlier recording gets that job's results back, even if a newer
+        # recording replaced them in the meantime
+        interview_data.resume_analysis(question_index, job.key)
+        return reply({
+            "status": "success",
+            "message": f"Answer for question {question_index + 1} already submitted. AI analysis {'in progress' if job.status == 'running' else 'complete'}.",
+            "question_index": question_index,
+            "duplicate": True
+        })
+
+    interview_data.begin_analysis(question_index, job_key, video_path)
+    analysis_jobs.run_async(job, analyze_answer(interview_data, question_index, job_key, video_path))
+
+    return reply({
+        "status": "success",
+        "message": f"Answer submitted for question {question_index + 1}. AI analysis in progress...",
+        "question_index": question_index
+    })
+
+
+async def get_report(request, interview_id):
+    if interview_id not in candidate_interview_data:
+        return reply({"error": "Interview not found"}, 404)
+
+    interview_data = candidate_interview_data[interview_id]
+    state = interview_data.state
+
+    # Same weak ETag and encoded-body cache as the Flask route
+    etag = f'W/"{interview_id}-{state.version}"'
+    headers = {'etag': etag, 'cache-control': 'no-cache', 'vary': 'Accept-Encoding'}
+    if_none_match = request.headers.get('if-none-match', '')
+    if etag[2:] in (tag.strip().removeprefix('W/') for tag in if_none_match.split(',')):
+        return 304, headers, b''
+
+    body, encoding = encode_json(
+        lambda: build_report(interview_data, state),
+        request.headers.get('accept-encoding', ''),
+        cache_key=('report', interview_id, state.version)
+    )
+    headers['content-type'] = 'application/json'
+    if encoding != 'identity':
+        headers['content-encoding'] = encoding
+    return 200, headers, body
+
+
+async def generate_overall_summary(request, interview_id):
+    if interview_id not in candidate_interview_data:
+        return reply({"error": "Interview not found"}, 404)
+
+    interview_data = candidate_interview_data[interview_id]
+
+    # The candidate is done, so their slot can go to the next one in the waiting room
+    admission.release(interview_id)
+
+    # Blocking AI calls, so on the shared AI executor like the Flask route's thread
+    asyncio.get_running_loop().run_in_executor(ai_executor, profiler.wrap(
+        f"overall summary {interview_id}", lambda: summarize_interview(interview_id, interview_data)
+    ))
+
+    return reply({
+        "status": "success",
+        "message": "Overall summary generation started"
+    })
+
+
+ROUTES = [
+    ('POST', re.compile(r'/api/start-interview'), start_interview),
+    ('POST', re.compile(r'/api/submit-answer/(?P<interview_id>[^/]+)/(?P<question_index>\d+)'), submit_answer),
+    ('GET', re.compile(r'/api/get-report/(?P<interview_id>[^/]+)'), get_report),
+    ('POST', re.compile(r'/api/generate-overall-summary/(?P<interview_id>[^/]+)'), generate_overall_summary),
+]
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+def wsgi_environ(scope, body):
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        # The whole body is buffered, so chunked uploads without Content-Length read fine
+        'wsgi.input_terminated': True,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[name] = value
+        else:
+            key = f"HTTP_{name}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+async def call_flask(scope, body, send):
+    """Serve a request with the Flask app on the WSGI thread pool, streaming its body."""
+    loop = asyncio.get_running_loop()
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = headers
+        return lambda data: None
+
+    result = await loop.run_in_executor(wsgi_executor, flask_app, wsgi_environ(scope, body), start_response)
+    try:
+        iterator = iter(result)
+        # Streamed responses (NDJSON starts, videos) are forwarded chunk by chunk
+        chunk = await loop.run_in_executor(wsgi_executor, next, iterator, None)
+        await send({
+            'type': 'http.response.start',
+            'status': started['status'],
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in started['headers']]
+        })
+        while chunk is not None:
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            chunk = await loop.run_in_executor(wsgi_executor, next, iterator, None)
+        await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        if hasattr(result, 'close'):
+            await loop.run_in_executor(wsgi_executor, result.close)
+
+
+async def call_handler(scope, body, handler, params):
+    """Run an async route between the Flask app's before- and after-request hooks.
+
+    The request context lives in this task's context, so concurrent requests on the
+    event loop keep their own.
+    """
+    ctx = flask_app.request_context(wsgi_environ(scope, body))
+    ctx.push()
+    try:
+        response = flask_app.preprocess_request()
+        if response is None:
+            try:
+                status, headers, payload = await handler(Request(scope, body), **params)
+            except Exception as e:
+                logger.exception("Error handling %s %s", scope['method'], scope['path'])
+                status, headers, payload = reply({"error": "Internal server error"}, 500)
+            response = flask_app.response_class(payload, status=status, headers=headers)
+        else:
+            response = flask_app.make_response(response)
+        response = flask_app.process_response(response)
+        return response.status_code, {name.lower(): value for name, value in response.headers.items()}, response.get_data()
+    finally:
+        ctx.pop()
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] != 'http':
+        return
+
+    body = await read_body(receive)
+    for method, pattern, handler in ROUTES:
+        match = pattern.fullmatch(scope['path'])
+        if match and scope['method'] == method:
+            break
+    else:
+        return await call_flask(scope, body, send)
+
+    # A client that goes away cancels its request, so admitted starts give their slot back
+    handling = asyncio.ensure_future(call_handler(scope, body, handler, match.groupdict()))
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    await asyncio.wait([handling, disconnected], return_when=asyncio.FIRST_COMPLETED)
+    if not handling.done():
+        handling.cancel()
+        await asyncio.gather(handling, return_exceptions=True)
+        return
+    disconnected.cancel()
+    status, headers, payload = handling.result()
+
+    # Same open CORS policy as the Flask app
+    headers['access-control-allow-origin'] = '*'
+    headers['content-length'] = str(len(payload))
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
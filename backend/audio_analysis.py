@@ -0,0 +1,146 @@
+import os
+import logging
+import re
+import shutil
+import threading
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+# Optional vectorized analysis, delivery metrics are skipped without numpy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+# PCM is read from ffmpeg in blocks of whole frames, about one second each
+BLOCK_FRAMES = 1000 // FRAME_MS
+BLOCK_BYTES = BLOCK_FRAMES * FRAME_SAMPLES * 2
+
+# Silences shorter than this are gaps between words, not pauses
+MIN_PAUSE_SECONDS = float(os.getenv('AUDIO_MIN_PAUSE_SECONDS', '0.3'))
+LONG_PAUSE_SECONDS = float(os.getenv('AUDIO_LONG_PAUSE_SECONDS', '2.0'))
+# A decode still running after this long is killed
+DECODE_TIMEOUT_SECONDS = float(os.getenv('AUDIO_DECODE_TIMEOUT_SECONDS', '120'))
+
+# Only sounds that are never content words; "like" or "actually" are too often meant
+FILLERS = re.compile(r"\b(?:um+|uh+|erm|er|hmm+)\b", re.IGNORECASE)
+
+
+def _pcm_blocks(media_path):
+    """Yield mono 16kHz int16 PCM blocks decoded by ffmpeg, without holding the whole track."""
+    process = subprocess.Popen(
+        ['ffmpeg', '-v', 'error', '-i', media_path, '-vn', '-ac', '1', '-ar', str(SAMPLE_RATE), '-f', 's16le', '-'],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    # Output is read as it is decoded, so communicate() cannot bound the run; a stuck
+    # ffmpeg is killed instead, which ends the read loop
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+    watchdog = threading.Timer(DECODE_TIMEOUT_SECONDS, kill)
+    watchdog.daemon = True
+    watchdog.start()
+    try:
+        while True:
+            data = process.stdout.read(BLOCK_BYTES)
+            if not data:
+                break
+            yield np.frombuffer(data[:len(data) - len(data) % 2], dtype=np.int16)
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(process.args, DECODE_TIMEOUT_SECONDS)
+    finally:
+        watchdog.cancel()
+        process.stdout.close()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def frame_energies(blocks):
+    """Per-frame RMS energy in dBFS for a stream of PCM blocks.
+
+    Only the per-frame energies (a few KB per minute) are kept; samples that do not fill
+    a frame are carried over to the next block.
+    """
+    energies = []
+    carry = np.empty(0, dtype=np.int16)
+    for block in blocks:
+        samples = np.concatenate((carry, block)) if carry.size else block
+        usable = samples.size - samples.size % FRAME_SAMPLES
+        carry = samples[usable:]
+        if not usable:
+            continue
+        frames = samples[:usable].astype(np.float32).reshape(-1, FRAME_SAMPLES) / 32768.0
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energies.append(20 * np.log10(np.maximum(rms, 1e-5)))
+    return np.concatenate(energies) if energies else np.empty(0, dtype=np.float32)
+
+
+def _runs(mask):
+    """Start and end frame indices of the runs of True in a boolean array."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def delivery_metrics(energies, transcription=None):
+    """Voice activity, pause distribution and speaking rate from frame energies.
+
+    Speech is any frame 10dB above the noise floor (the 10th percentile energy), with a
+    -50dBFS minimum so near-silent recordings do not count as speech.
+    """
+    frame_seconds = FRAME_MS / 1000
+    duration = energies.size * frame_seconds
+    if not energies.size:
+        return None
+
+    threshold = max(float(np.percentile(energies, 10)) + 10.0, -50.0)
+    speech = energies > threshold
+
+    # Silent runs between the first and last speech frame are pauses
+    starts, ends = _runs(~speech)
+    inner = (starts > 0) & (ends < speech.size)
+    pauses = (ends[inner] - starts[inner]) * frame_seconds
+    pauses = pauses[pauses >= MIN_PAUSE_SECONDS]
+
+    speaking_seconds = float(speech.sum()) * frame_seconds
+    metrics = {
+        "duration_seconds": round(duration, 1),
+        "speaking_seconds": round(speaking_seconds, 1),
+        "speech_ratio": round(speaking_seconds / duration, 2) if duration else 0.0,
+        "pause_count": int(pauses.size),
+        "long_pause_count": int((pauses >= LONG_PAUSE_SECONDS).sum()),
+        "long_pause_seconds": LONG_PAUSE_SECONDS,
+        "mean_pause_seconds": round(float(pauses.mean()), 2) if pauses.size else 0.0,
+        "p90_pause_seconds": round(float(np.percentile(pauses, 90)), 2) if pauses.size else 0.0,
+        "longest_pause_seconds": round(float(pauses.max()), 2) if pauses.size else 0.0
+    }
+
+    # Transcript-based rates, unless the transcript is a demo or error marker
+    if transcription and not transcription.startswith('['):
+        words = len(transcription.split())
+        fillers = len(FILLERS.findall(transcription))
+        metrics["word_count"] = words
+        metrics["words_per_minute"] = round(words / (duration / 60), 1) if duration else 0.0
+        metrics["articulation_rate_wpm"] = round(words / (speaking_seconds / 60), 1) if speaking_seconds else 0.0
+        metrics["filler_count"] = fillers
+        metrics["fillers_per_100_words"] = round(100 * fillers / words, 1) if words else 0.0
+    return metrics
+
+
+def analyze_delivery(media_path, transcription=None):
+    """Delivery metrics for an answer recording, or None when it cannot be analyzed here."""
+    if np is None or not shutil.which('ffmpeg') or not media_path or not os.path.exists(media_path):
+        return None
+    try:
+        return delivery_metrics(frame_energies(_pcm_blocks(media_path)), transcription)
+    except Exception as e:
+        logger.error("Error analyzing audio of %s: %s", media_path, e)
+        return None
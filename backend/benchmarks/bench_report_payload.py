@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Compare CPU per request and bytes on the wire for get-report payloads:
+Flask's jsonify (the previous path) against response_encoding.json_response
+cold (encode + compress) and warm (cached bytes for an unchanged interview).
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import jsonify
+from app import app
+from response_encoding import json_response, encoded_cache
+
+ITERATIONS = 500
+WORDS = ("system", "design", "latency", "customer", "team", "deploy", "metrics", "debugging",
+         "tradeoff", "cache", "database", "incident", "ownership", "review", "testing")
+
+
+def build_report(seed=7):
+    rng = random.Random(seed)
+    questions = []
+    for i in range(7):
+        transcription = " ".join(rng.choice(WORDS) for _ in range(450))
+        questions.append({
+            "question_text": f"Question {i + 1}: describe a time you improved a production system?",
+            "video_path": f"/tmp/uploads/{i}_interview-answer.webm",
+            "transcription": transcription,
+            "summary": transcription[:240],
+            "evaluation": {
+                "skills_demonstrated": ["Communication", "Problem Solving", "Technical Knowledge"],
+                "strengths": ["Clear articulation", "Relevant experience"],
+                "weaknesses": ["Could provide more specific examples"],
+                "overall_assessment": "Strong",
+                "justification": "Demonstrated solid understanding with room for growth."
+            }
+        })
+    return {
+        "interview_id": "benchmark",
+        "candidate_id": "benchmark-candidate",
+        "role_title": "Software Engineer",
+        "role_description": "Benchmark role description",
+        "greeting_text": "Hello!",
+        "questions": questions,
+        "overall_evaluation": None,
+        "ai_processing_complete": True,
+        "total_questions": len(questions),
+        "completed_questions": len(questions)
+    }
+
+
+def measure(label, make_response):
+    start = time.process_time()
+    for _ in range(ITERATIONS):
+        response = make_response()
+        body = response.get_data()
+    cpu_us = (time.process_time() - start) / ITERATIONS * 1e6
+    encoding = response.headers.get('Content-Encoding', 'identity')
+    print(f"{label:<34} {cpu_us:>10.1f} us/req {len(body):>10} bytes  ({encoding})")
+
+
+def main():
+    report = build_report()
+    headers = {'Accept-Encoding': 'gzip, deflate, br'}
+
+    print(f"get-report payload, 7 long transcripts, {ITERATIONS} iterations")
+    with app.test_request_context('/api/get-report/benchmark', headers=headers):
+        measure("jsonify (previous path)", lambda: jsonify(report))
+
+        def cold():
+            encoded_cache._entries.clear()
+            return json_response(lambda: report, cache_key=('report', 'benchmark', 0))
+        measure("json_response, cold cache", cold)
+
+        measure("json_response, warm cache", lambda: json_response(lambda: report, cache_key=('report', 'benchmark', 0)))
+
+    with app.test_request_context('/api/get-report/benchmark'):
+        measure("json_response, no compression", lambda: json_response(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the per-request hot paths, with stored baselines.
+
+    python benchmarks/microbench.py run              # print timings
+    python benchmarks/microbench.py save             # record them in baselines.json
+    python benchmarks/microbench.py compare          # exit 1 on a regression
+
+Each benchmark is measured in several rounds (--rounds, default 7). A round takes the
+best time per call over a few repeats and divides it by a fixed pure-Python calibration
+loop timed right after, so baselines recorded on one machine stay comparable on another.
+The normalized time is the median of the rounds, and the us/call column shows the best
+raw time. The median distance of the rounds from their median, relative to it, is kept
+as the benchmark's noise. `compare` fails when a benchmark's normalized time
+exceeds its baseline by more than --threshold (default 30%) plus the noise of both the
+baseline and the current run, so a jittery benchmark does not fail on its own jitter.
+"""
+
+import os
+import sys
+import json
+import timeit
+import argparse
+import platform
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import (app, get_report, get_randomized_fallback_questions, generate_unique_evaluation,
+                 generate_fast_overall_summary)
+from interview_store import InterviewRecord
+from response_encoding import encoded_cache
+from tenants import default_tenant_config
+from role_profile import compile_role_profile
+from replay_traffic import stub_ai_service
+from bench_report_payload import build_report, WORDS
+
+BASELINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+REPEAT = 3
+ROUNDS = int(os.getenv('BENCH_ROUNDS', '7'))
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a setup function that returns the callable to time."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def calibration():
+    return sum(i * i for i in range(1000))
+
+
+def calls_per_run(fn):
+    """Number of calls of fn that take at least 0.2s."""
+    number, _ = timeit.Timer(fn).autorange()
+    return number
+
+
+def time_per_call(fn, number):
+    """Best seconds per call of fn over REPEAT runs of `number` calls."""
+    return min(timeit.Timer(fn).repeat(repeat=REPEAT, number=number)) / number
+
+
+def sample_inputs():
+    report = build_report()
+    transcriptions = [f"Question {i + 1}: {q['transcription']}" for i, q in enumerate(report["questions"])]
+    evaluations = [q["evaluation"] for q in report["questions"]]
+    return report, transcriptions, evaluations
+
+
+@benchmark("fallback_questions")
+def bench_fallback_questions():
+    return lambda: get_randomized_fallback_questions(None, "Software Engineer")
+
+
+@benchmark("unique_evaluation")
+def bench_unique_evaluation():
+    report, _, _ = sample_inputs()
+    question = report["questions"][2]
+    return lambda: generate_unique_evaluation(report["role_description"], question["question_text"],
+                                              question["transcription"], 2)
+
+
+@benchmark("fast_overall_summary")
+def bench_fast_overall_summary():
+    report, transcriptions, evaluations = sample_inputs()
+    return lambda: generate_fast_overall_summary(report["role_title"], report["role_description"],
+                                                 transcriptions, evaluations, "benchmark")
+
+
+def _report_record():
+    report = build_report()
+    record = InterviewRecord("benchmark", report["candidate_id"], report["role_title"], report["role_description"],
+                             report["greeting_text"], [q["question_text"] for q in report["questions"]])
+    for index, question in enumerate(report["questions"]):
+        record.begin_analysis(index, index, question["video_path"])
+        record.finish_analysis(index, index, transcription=question["transcription"], summary=question["summary"],
+                               evaluation=question["evaluation"])
+    import app as backend
+    backend.candidate_interview_data["benchmark"] = record
+
+
+@benchmark("get_report_cold")
+def bench_get_report_cold():
+    """Completion scan, payload build and JSON encoding of a 7-answer report."""
+    _report_record()
+
+    def run():
+        encoded_cache._entries.clear()
+        with app.test_request_context('/api/get-report/benchmark'):
+            return get_report("benchmark").get_data()
+    return run
+
+
+@benchmark("get_report_warm")
+def bench_get_report_warm():
+    _report_record()
+
+    def run():
+        with app.test_request_context('/api/get-report/benchmark'):
+            return get_report("benchmark").get_data()
+    return run
+
+
+def _stub_service():
+    return stub_ai_service(0)(default_tenant_config())
+
+
+@benchmark("questions_prompt")
+def bench_questions_prompt():
+    service = _stub_service()
+    description = " ".join(WORDS * 20)
+    return lambda: service._questions_messages("Software Engineer", description)
+
+
+@benchmark("ai_evaluation")
+def bench_ai_evaluation():
+    """Prompt assembly, truncation and JSON parsing around a zero-latency stubbed completion."""
+    service = _stub_service()
+    report, _, _ = sample_inputs()
+    question = report["questions"][0]
+    role_profile = compile_role_profile(report["role_title"], report["role_description"])
+    return lambda: service.generate_evaluation(role_profile, question["question_text"], question["transcription"])
+
+
+@benchmark("ai_overall_summary")
+def bench_ai_overall_summary():
+    service = _stub_service()
+    report, transcriptions, evaluations = sample_inputs()
+    role_profile = compile_role_profile(report["role_title"], report["role_description"])
+    return lambda: service.generate_overall_summary(role_profile, transcriptions, evaluations)
+
+
+def run_benchmarks(selected=None, rounds=ROUNDS):
+    """Best seconds per call, median calibration-normalized time and noise of each selected benchmark."""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if selected and not any(pattern in name for pattern in selected):
+            continue
+        fn = setup()
+        number, reference_number = calls_per_run(fn), calls_per_run(calibration)
+        # Calibrated next to each measurement, so load and frequency changes during the run
+        # cancel out; the median round discards rounds disturbed by other processes
+        samples = sorted(
+            (time_per_call(fn, number), time_per_call(calibration, reference_number)) for _ in range(rounds)
+        )
+        ratios = sorted(seconds / reference for seconds, reference in samples)
+        median = ratios[len(ratios) // 2]
+        deviations = sorted(abs(ratio - median) for ratio in ratios)
+        results[name] = (samples[0][0], median, deviations[len(deviations) // 2] / median)
+    return results
+
+
+def load_baselines(path):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('command', choices=['run', 'save', 'compare'])
+    parser.add_argument('benchmarks', nargs='*', help="only run benchmarks whose name contains one of these")
+    parser.add_argument('--baselines', default=BASELINES_FILE)
+    parser.add_argument('--threshold', type=float, default=float(os.getenv('BENCH_REGRESSION_THRESHOLD', '0.3')),
+                        help="allowed slowdown against the baseline, as a fraction")
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help="measurements per benchmark, the median is used")
+    options = parser.parse_args()
+
+    results = run_benchmarks(options.benchmarks, options.rounds)
+    baselines = load_baselines(options.baselines) if options.command == 'compare' else None
+    if options.command == 'compare' and baselines is None:
+        print(f"No baselines at {options.baselines}, run 'save' first")
+        sys.exit(2)
+
+    regressions = []
+    print(f"{'benchmark':<24} {'us/call':>10} {'normalized':>11} {'noise':>6} {'baseline':>10} {'change':>8} {'allowed':>8}")
+    for name, (seconds, normalized, noise) in results.items():
+        line = f"{name:<24} {seconds * 1e6:>10.1f} {normalized:>11.3f} {noise:>6.0%}"
+        baseline = (baselines or {}).get("benchmarks", {}).get(name)
+        if baseline is not None:
+            change = normalized / baseline["normalized"] - 1
+            allowed = options.threshold + noise + baseline.get("noise", 0.0)
+            line += f" {baseline['normalized']:>10.3f} {change:>+7.0%} {allowed:>+8.0%}"
+            if change > allowed:
+                regressions.append(name)
+                line += "  REGRESSION"
+        elif options.command == 'compare':
+            line += f" {'new':>10}"
+        print(line)
+
+    if options.command == 'save':
+        saved = load_baselines(options.baselines) or {"benchmarks": {}}
+        saved["benchmarks"].update({
+            name: {"us_per_call": round(seconds * 1e6, 2), "normalized": round(normalized, 4), "noise": round(noise, 4)}
+            for name, (seconds, normalized, noise) in results.items()
+        })
+        saved["python"] = platform.python_version()
+        with open(options.baselines, 'w') as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved {len(results)} baselines to {options.baselines}")
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {options.threshold:.0%} plus noise: "
+              f"{', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Replay a traffic capture against a local instance and report latency percentiles per route.
+
+Record a trace by running the backend with TRAFFIC_CAPTURE_FILE=/path/trace.jsonl, then:
+
+    python benchmarks/replay_traffic.py /path/trace.jsonl --speed 4
+
+Requests are sent at their captured offsets divided by --speed, with bodies rebuilt from
+the recorded shapes. Interview ids in the trace are tokens; each one is bound to the id
+the replayed start-interview returns, and requests for it wait until that start is done.
+By default the app runs in-process with a stubbed OpenAI client that answers after a
+fixed delay (--ai-latency), so runs are repeatable and cost nothing. Use --target to
+drive an instance that is already running instead.
+"""
+
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import random
+import logging
+import argparse
+import itertools
+import threading
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+ROUTE_ARG = re.compile(r"<(?:[^:<>]+:)?([^<>]+)>")
+
+# Canned replies keyed by the system prompt of each AIService call
+STUB_REPLIES = {
+    "You are a professional AI interview assistant.":
+        "Hello and welcome! Thank you for joining this first-round interview. "
+        "We will go through a few questions about your experience, take your time with each answer.",
+    "You are a concise HR analyst.":
+        "The candidate described a relevant project and explained the tradeoffs they made.",
+    "You are a fast HR evaluator.": json.dumps({
+        "skills_demonstrated": ["Communication", "Problem Solving"],
+        "strengths": ["Clear structure", "Relevant example"],
+        "weaknesses": ["Few measurable results"],
+        "overall_assessment": "Moderate",
+        "justification": "Solid answer that could use more specifics."
+    }),
+    "You are a fast HR analyst.": json.dumps({
+        "overall_assessment": "Moderate",
+        "key_insights": ["Structured answers", "Relevant experience", "Some gaps in depth"],
+        "recommendations": ["Technical follow-up", "Reference check", "Team interview"],
+        "strengths": ["Communication", "Ownership", "Curiosity"],
+        "areas_for_improvement": ["Depth", "Metrics", "Brevity"],
+        "final_recommendation": "Further evaluation"
+    })
+}
+QUESTION_WORDS = ("migrate", "legacy", "service", "scale", "database", "mentor", "junior", "engineers", "debug",
+                  "outage", "design", "api", "prioritize", "roadmap", "negotiate", "deadline", "measure", "latency",
+                  "automate", "deployment", "review", "code", "secure", "pipeline", "refactor", "module", "estimate",
+                  "project", "document", "decision", "test", "release", "onboard", "customer", "reduce", "cost")
+STUB_TRANSCRIPT = ("In my last role I owned the deployment pipeline. We had slow releases, so I split the "
+                   "build into stages, added caching and cut release time from an hour to fifteen minutes.")
+
+
+class StubCompletions:
+    """Stands in for client.chat.completions, replying after a fixed delay."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self._questions = itertools.count()
+
+    def _reply(self, messages):
+        system = messages[0]["content"]
+        if system.startswith("You are an expert HR interviewer"):
+            # Distinct per call so the question history does not reject them as near-duplicates
+            rng = random.Random(next(self._questions))
+            return "\n".join(f"How would you {' '.join(rng.sample(QUESTION_WORDS, 6))}?" for _ in range(7))
+        reply = next((text for prompt, text in STUB_REPLIES.items() if system.startswith(prompt)), None)
+        return reply or STUB_REPLIES["You are a fast HR evaluator."]
+
+    def create(self, model, messages, stream=False, **kwargs):
+        content = self._reply(messages)
+        if not stream:
+            if self.latency:
+                time.sleep(self.latency)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        return self._stream(content)
+
+    def _stream(self, content):
+        pieces = re.findall(r"\S*\s*", content)[:-1] or [content]
+        for piece in pieces:
+            if self.latency:
+                time.sleep(self.latency / len(pieces))
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+
+
+class StubTranscriptionEngine:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def transcribe(self, video_path, prompt=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return STUB_TRANSCRIPT
+
+
+def stub_ai_service(latency):
+    """AIService factory whose OpenAI calls are answered by the stubs above."""
+    from ai_service import AIService
+
+    def factory(config):
+        service = AIService(config)
+        service.client = SimpleNamespace(chat=SimpleNamespace(completions=StubCompletions(latency)))
+        service.has_api_key = True
+        service.transcription_engine = StubTranscriptionEngine(latency)
+        return service
+    return factory
+
+
+def start_local_server(ai_latency):
+    """Run the app in a background thread with the stubbed AI backend; returns its base URL."""
+    from werkzeug.serving import make_server
+    import app as backend
+    from tenants import TenantRegistry
+
+    backend.ai_services = TenantRegistry(stub_ai_service(ai_latency))
+    backend.ai_service = backend.ai_services.get()
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, backend.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def load_trace(path):
+    with open(path) as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    return sorted(entries, key=lambda entry: entry["t"])
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, int(round(p / 100 * len(values) + 0.5)) - 1))]
+
+
+class Replayer:
+    def __init__(self, base_url, speed=1.0, concurrency=64, timeout=60.0, seed=7):
+        self.base_url = base_url.rstrip('/')
+        self.speed = speed
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.rng = random.Random(seed)
+
+        self._lock = threading.Lock()
+        self._interviews = {}
+        self._created = defaultdict(threading.Event)
+        self._creatable = set()
+        self._chunk_seq = defaultdict(itertools.count)
+        self.results = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.captured = defaultdict(list)
+        self.max_lag = 0.0
+
+    def _event(self, token):
+        with self._lock:
+            return self._created[token]
+
+    def _interview_id(self, token):
+        """Real id bound to a trace token, waiting for the start that creates it."""
+        # Interviews started before the capture began cannot be replayed
+        if token not in self._creatable or not self._event(token).wait(self.timeout):
+            return None
+        return self._interviews.get(token)
+
+    def build_request(self, entry):
+        args = dict(entry.get("args", {}))
+        if "interview_id" in args:
+            token = args["interview_id"]
+            args["interview_id"] = self._interview_id(token)
+            if args["interview_id"] is None:
+                return None
+        path = ROUTE_ARG.sub(lambda m: str(args.get(m.group(1), m.group(1))), entry["route"])
+        recording = f"replay-{entry.get('args', {}).get('interview_id')}-{args.get('question_index', 0)}"
+
+        query = {name: 1 for name in entry.get("query", [])}
+        if 'seq' in query:
+            with self._lock:
+                query['seq'] = next(self._chunk_seq[recording])
+        if 'end_ms' in query:
+            query['end_ms'] = (query.get('seq', 0) + 1) * 1000
+        if 'recording_id' in query:
+            query['recording_id'] = recording
+        if query:
+            path += "?" + "&".join(f"{name}={value}" for name, value in query.items())
+
+        headers = {'Accept-Encoding': 'gzip'}
+        body = None
+        keys = entry.get("json_keys", [])
+        if keys:
+            data = {}
+            if 'role_title' in keys:
+                data['role_title'] = "Software Engineer"
+            if 'video_path' in keys:
+                data['video_path'] = f"/tmp/uploads/{recording}.webm"
+            if 'role_description' in keys:
+                # Pad to the captured body size, which is mostly the description
+                size = max(entry.get("body_bytes", 0) - len(json.dumps(data)) - 24, 20)
+                data['role_description'] = ("Build and operate backend services. " * (size // 36 + 1))[:size]
+            body = json.dumps(data).encode()
+            headers['Content-Type'] = 'application/json'
+        elif entry.get("body_bytes"):
+            body = self.rng.randbytes(entry["body_bytes"])
+            headers['Content-Type'] = 'application/octet-stream'
+        return urllib.request.Request(self.base_url + path, data=body, headers=headers, method=entry["method"])
+
+    def _send(self, entry, scheduled):
+        route = f"{entry['method']} {entry['route']}"
+        body = b''
+        status = None
+        try:
+            req = self.build_request(entry)
+            if req is None:
+                status = 'unresolved'
+                return
+            start = time.monotonic()
+            with self._lock:
+                self.max_lag = max(self.max_lag, start - scheduled)
+            try:
+                with urllib.request.urlopen(req, timeout=self.timeout) as response:
+                    body = response.read()
+                    status = response.status
+                    if response.headers.get('Content-Encoding') == 'gzip':
+                        body = gzip.decompress(body)
+            except urllib.error.HTTPError as e:
+                body = e.read()
+                status = e.code
+            latency = time.monotonic() - start
+            with self._lock:
+                self.results[route].append(latency * 1000)
+        except Exception as e:
+            status = type(e).__name__
+        finally:
+            with self._lock:
+                self.statuses[route][status] += 1
+            if "creates" in entry:
+                self._bind(entry["creates"], status, body)
+
+    def _bind(self, token, status, body):
+        if status == 200:
+            try:
+                # Plain JSON, or the first line of the NDJSON stream
+                first = body.split(b"\n", 1)[0] if body.lstrip().startswith(b'{"type"') else body
+                self._interviews[token] = json.loads(first)["interview_id"]
+            except (ValueError, KeyError):
+                pass
+        # Set even on failure, requests for this interview then count as unresolved
+        self._event(token).set()
+
+    def run(self, entries):
+        self._creatable = {entry["creates"] for entry in entries if "creates" in entry}
+        started = time.monotonic()
+        futures = []
+        for entry in entries:
+            self.captured[f"{entry['method']} {entry['route']}"].append(entry.get("duration_ms", 0.0))
+            scheduled = started + entry["t"] / self.speed
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(self.executor.submit(self._send, entry, scheduled))
+        for future in futures:
+            future.result()
+        return time.monotonic() - started
+
+    def report(self):
+        rows = []
+        for route in sorted(self.statuses):
+            latencies = sorted(self.results.get(route, []))
+            captured = sorted(self.captured.get(route, []))
+            rows.append({
+                "route": route,
+                "requests": sum(self.statuses[route].values()),
+                "statuses": {str(status): count for status, count in self.statuses[route].items()},
+                "p50_ms": round(percentile(latencies, 50), 1),
+                "p90_ms": round(percentile(latencies, 90), 1),
+                "p99_ms": round(percentile(latencies, 99), 1),
+                "max_ms": round(latencies[-1], 1) if latencies else 0.0,
+                "captured_p50_ms": round(percentile(captured, 50), 1)
+            })
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('trace', help="JSONL file written with TRAFFIC_CAPTURE_FILE")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay N times faster than captured")
+    parser.add_argument('--target', help="base URL of a running instance instead of an in-process one")
+    parser.add_argument('--ai-latency', type=float, default=0.5, help="seconds each stubbed AI call takes")
+    parser.add_argument('--concurrency', type=int, default=64, help="maximum requests in flight")
+    parser.add_argument('--timeout', type=float, default=60.0, help="per-request timeout in seconds")
+    parser.add_argument('--json', help="also write the report to this file")
+    options = parser.parse_args()
+
+    entries = load_trace(options.trace)
+    base_url = options.target or start_local_server(options.ai_latency)
+    replayer = Replayer(base_url, options.speed, options.concurrency, options.timeout)
+
+    print(f"Replaying {len(entries)} requests against {base_url} at {options.speed:g}x")
+    elapsed = replayer.run(entries)
+    rows = replayer.report()
+
+    print(f"{'route':<68} {'reqs':>6} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'capt p50':>9}  statuses")
+    for row in rows:
+        statuses = " ".join(f"{status}:{count}" for status, count in sorted(row["statuses"].items()))
+        print(f"{row['route']:<68} {row['requests']:>6} {row['p50_ms']:>8} {row['p90_ms']:>8} "
+              f"{row['p99_ms']:>8} {row['max_ms']:>8} {row['captured_p50_ms']:>9}  {statuses}")
+    # Starts slip when --concurrency is exhausted or a request waits for its interview to be created
+    print(f"Finished in {elapsed:.1f}s, largest start delay past schedule {replayer.max_lag * 1000:.0f}ms")
+
+    if options.json:
+        with open(options.json, 'w') as f:
+            json.dump({"speed": options.speed, "elapsed_seconds": round(elapsed, 2), "routes": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import os
+import json
+import mmap
+import time
+import array
+import struct
+import atexit
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'AIBSNAP1'
+# Magic bytes and the length of the JSON table of contents that follows them
+HEADER = struct.Struct('<8sI')
+# Sections start on 8-byte boundaries so integer arrays can be read in place
+ALIGNMENT = 8
+
+
+def _aligned(offset):
+    return offset + (-offset % ALIGNMENT)
+
+
+class CacheSnapshot:
+    """Periodic on-disk snapshot of in-memory caches, so a restarted process starts warm.
+
+    The file is a JSON table of contents followed by raw sections, each a JSON document,
+    an integer array or an encoded response body. It is memory-mapped on first use and
+    a section is only decoded when the cache that owns it asks for it, so a fresh process
+    pays only for the roles and tenants it actually serves. Caches register a source
+    returning their sections by name; a background thread writes them all to a temporary
+    file every CACHE_SNAPSHOT_INTERVAL_SECONDS and swaps it in atomically. Disabled
+    unless CACHE_SNAPSHOT_FILE is set.
+    """
+
+    def __init__(self, path=None, interval_seconds=None):
+        self.path = path or os.getenv('CACHE_SNAPSHOT_FILE')
+        self.interval_seconds = float(interval_seconds or os.getenv('CACHE_SNAPSHOT_INTERVAL_SECONDS', '300'))
+        self.enabled = bool(self.path)
+        self._lock = threading.Lock()
+        self._sources = []
+        self._loaded = False
+        self._map = None
+        self._sections = {}
+        self._thread = None
+
+    def add_source(self, source):
+        """Include the sections returned by `source()`, a dict of name -> bytes, in every snapshot."""
+        self._sources.append(source)
+
+    @staticmethod
+    def json_section(value):
+        return json.dumps(value, separators=(',', ':')).encode('utf-8')
+
+    @staticmethod
+    def array_section(typecode, values):
+        return array.array(typecode, values).tobytes()
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                with open(self.path, 'rb') as f:
+                    # The mapping stays valid after the file is closed or replaced by the next save
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, table_size = HEADER.unpack_from(self._map)
+                if magic != MAGIC:
+                    raise ValueError("not a cache snapshot")
+                table = json.loads(self._map[HEADER.size:HEADER.size + table_size])
+                base = _aligned(HEADER.size + table_size)
+                self._sections = {
+                    name: (base + offset, length) for name, (offset, length) in table["sections"].items()
+                }
+                logger.info("Loaded cache snapshot %s from %s", self.path,
+                            time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(table["created"])))
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, KeyError, struct.error) as e:
+                logger.warning("Ignoring unreadable cache snapshot %s: %s", self.path, e)
+                self._sections = {}
+
+    def get(self, name):
+        """Return a section as a read-only memoryview of the mapped file, or None."""
+        if not self.enabled:
+            return None
+        if not self._loaded:
+            self._load()
+        location = self._sections.get(name)
+        if location is None:
+            return None
+        offset, length = location
+        return memoryview(self._map)[offset:offset + length]
+
+    def get_json(self, name):
+        section = self.get(name)
+        return json.loads(section.tobytes()) if section is not None else None
+
+    def get_array(self, name, typecode):
+        """Return an integer array section without copying it out of the mapped file."""
+        section = self.get(name)
+        return section.cast(typecode) if section is not None else None
+
+    def save(self):
+        """Write every source's sections to the snapshot file, replacing it atomically."""
+        if not self.enabled:
+            return
+        sections = {}
+        for source in self._sources:
+            try:
+                sections.update(source())
+            except Exception as e:
+                logger.error("Error collecting cache snapshot section: %s", e)
+
+        table = {"created": time.time(), "sections": {}}
+        offset = 0
+        for name, data in sections.items():
+            offset = _aligned(offset)
+            table["sections"][name] = (offset, len(data))
+            offset += len(data)
+        table_bytes = json.dumps(table, separators=(',', ':')).encode('utf-8')
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, len(table_bytes)))
+                f.write(table_bytes)
+                base = _aligned(HEADER.size + len(table_bytes))
+                for name, data in sections.items():
+                    f.seek(base + table["sections"][name][0])
+                    f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error("Error saving cache snapshot: %s", e)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval_seconds)
+            self.save()
+
+    def start(self):
+        """Start the periodic snapshot thread and save once more at exit, if enabled."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run)
+            self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.save)
+
+# Create a global instance
+cache_snapshot = CacheSnapshot()
@@ -0,0 +1,140 @@
+import time
+import threading
+from collections import namedtuple
+from role_profile import compile_role_profile
+
+PROCESSING = "Processing..."
+
+# Immutable per-question record; updates build a new tuple instead of mutating in place
+QuestionRecord = namedtuple('QuestionRecord', ['question_text', 'video_path', 'transcription', 'summary', 'evaluation', 'video_metrics'])
+QuestionRecord.__new__.__defaults__ = (None, None, None, None, None)
+
+# Everything background threads change lives in one immutable state object, so a reader
+# that grabs `record.state` once sees questions and overall evaluation from the same moment.
+# `upgradable` holds the slots whose placeholder question may still be replaced by a late AI one.
+# `updated_at` is the wall-clock time of the last change, used as the export watermark.
+InterviewState = namedtuple('InterviewState', ['questions', 'overall_evaluation', 'upgradable', 'version', 'updated_at'])
+
+
+class InterviewRecord:
+    """Interview data shared between request threads and background analysis.
+
+    Identity fields never change after creation (a streamed start sets `greeting_text`
+    once, through set_greeting). Mutable data lives in an immutable
+    `InterviewState` that writers replace under a per-interview lock (copy-on-write),
+    while readers take the current state without locking. Only the tuples along the
+    changed path are copied, transcripts and evaluations are shared between versions.
+    """
+
+    __slots__ = ('interview_id', 'candidate_id', 'role_title', 'role_description', 'role_profile', 'greeting_text',
+                 'tenant_id', 'state', '_analysis_keys', '_analysis_results', '_lock')
+
+    def __init__(self, interview_id, candidate_id, role_title, role_description, greeting_text, questions, upgradable=(),
+                 tenant_id=None):
+        self.interview_id = interview_id
+        self.candidate_id = candidate_id
+        self.role_title = role_title
+        self.role_description = role_description
+        # Parsed once here; every evaluation and summary prompt of the interview reuses it
+        self.role_profile = compile_role_profile(role_title, role_description)
+        self.greeting_text = greeting_text
+        # Hiring company whose AI settings and quotas apply to this interview
+        self.tenant_id = tenant_id
+        self.state = InterviewState(tuple(QuestionRecord(q) for q in questions), None, frozenset(upgradable), 0, time.time())
+        self._analysis_keys = {}
+        # Results of every analysis job, so a resubmitted earlier recording can get its results back
+        self._analysis_results = {}
+        self._lock = threading.Lock()
+
+    @property
+    def questions(self):
+        return self.state.questions
+
+    def _replace(self, **changes):
+        # Callers hold self._lock. Every change bumps the version, which response caches key on
+        self.state = self.state._replace(version=self.state.version + 1, updated_at=time.time(), **changes)
+
+    def set_greeting(self, greeting_text):
+        """Set the greeting of a streamed interview once it is complete."""
+        with self._lock:
+            self.greeting_text = greeting_text
+            self._replace()
+
+    def append_question(self, question_text):
+        """Add a question to the end of the interview, for questions that arrive streamed."""
+        with self._lock:
+            self._replace(questions=self.state.questions + (QuestionRecord(question_text),))
+
+    def update_question(self, index, **fields):
+        """Replace fields of one question."""
+        with self._lock:
+            questions = list(self.state.questions)
+            questions[index] = questions[index]._replace(**fields)
+            self._replace(questions=tuple(questions))
+
+    def claim_question(self, index):
+        """Return the question text for display, fixing it so it can no longer be upgraded."""
+        with self._lock:
+            if index in self.state.upgradable:
+                self._replace(upgradable=self.state.upgradable - {index})
+            return self.state.questions[index].question_text
+
+    def upgrade_questions(self, questions):
+        """Replace placeholder questions in still-upgradable slots with late AI questions.
+
+        Returns the indices that were replaced. Upgrading happens once; slots not filled
+        by this call keep their placeholder.
+        """
+        with self._lock:
+            upgraded = sorted(index for index in self.state.upgradable if index < len(questions))
+            current = list(self.state.questions)
+            for index in upgraded:
+                current[index] = current[index]._replace(question_text=questions[index])
+            self._replace(questions=tuple(current), upgradable=frozenset())
+            return upgraded
+
+    def begin_analysis(self, index, job_key, video_path):
+        """Mark a question as processing for the analysis job identified by job_key."""
+        with self._lock:
+            self._analysis_keys[index] = job_key
+            self._analysis_results[job_key] = {'video_path': video_path}
+            questions = list(self.state.questions)
+            questions[index] = questions[index]._replace(
+                video_path=video_path, transcription=PROCESSING, summary=PROCESSING, evaluation=PROCESSING,
+                video_metrics=None
+            )
+            self._replace(questions=tuple(questions), upgradable=self.state.upgradable - {index})
+
+    def resume_analysis(self, index, job_key):
+        """Point a question back at an earlier analysis job whose recording was resubmitted.
+
+        Restores whatever results that job has stored; fields it has not produced yet show
+        as processing until it finishes.
+        """
+        with self._lock:
+            if self._analysis_keys.get(index) == job_key:
+                return
+            self._analysis_keys[index] = job_key
+            fields = dict(transcription=PROCESSING, summary=PROCESSING, evaluation=PROCESSING, video_metrics=None)
+            fields.update(self._analysis_results.get(job_key, {}))
+            questions = list(self.state.questions)
+            questions[index] = questions[index]._replace(**fields)
+            self._replace(questions=tuple(questions), upgradable=self.state.upgradable - {index})
+
+    def finish_analysis(self, index, job_key, **fields):
+        """Store analysis results unless a newer job has superseded job_key.
+
+        Returns True if the results were stored.
+        """
+        with self._lock:
+            self._analysis_results.setdefault(job_key, {}).update(fields)
+            if self._analysis_keys.get(index) != job_key:
+                return False
+            questions = list(self.state.questions)
+            questions[index] = questions[index]._replace(**fields)
+            self._replace(questions=tuple(questions))
+            return True
+
+    def set_overall_evaluation(self, overall_evaluation):
+        with self._lock:
+            self._replace(overall_evaluation=overall_evaluation)
@@ -0,0 +1,340 @@
+import os
+import re
+import time
+import logging
+import uuid
+import asyncio
+import shutil
+import tempfile
+import threading
+import subprocess
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Characters of the previous segment passed to Whisper as a prompt for continuity
+PROMPT_TAIL_LENGTH = 200
+# Longest run of words that consecutive overlapping segments are checked for sharing
+MAX_OVERLAP_WORDS = 12
+
+
+def _normalise_word(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def _drop_repeated_words(previous, text):
+    """Drop the words at the start of `text` that repeat the end of `previous`.
+
+    Segments overlap, so a word cut in half at one boundary is heard whole in one of the
+    two; the overlapping audio then appears at the end of one text and the start of the
+    next. Runs of a single word are left alone, they repeat by chance too often.
+    """
+    words = text.split()
+    tail = [_normalise_word(word) for word in previous.split()[-MAX_OVERLAP_WORDS:]]
+    head = [_normalise_word(word) for word in words[:MAX_OVERLAP_WORDS]]
+    for size in range(min(len(tail), len(head)), 1, -1):
+        if tail[-size:] == head[:size]:
+            return " ".join(words[size:])
+    return text
+
+
+def _resolve_waiter(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class LiveTranscriptionSession:
+    """One answer being recorded and transcribed while the candidate is still talking.
+
+    MediaRecorder chunks are appended to a single webm file in order. A chunk that is
+    still missing after `gap_seconds`, or once `max_pending` later chunks are waiting
+    behind it, is given up on and the recording continues without it. Whenever another
+    `segment_seconds` of audio has arrived, that time range is cut out with ffmpeg and
+    queued for transcription, so by the time the recording stops only the last segment
+    is left to transcribe. Each cut starts `overlap_seconds` before the previous one
+    ended, so words on a boundary are not lost, and the repeated words are dropped when
+    the texts are joined. Segments are transcribed in order, each one prompted with the
+    tail of the previous text. Without ffmpeg the whole file is transcribed once the
+    recording finishes, which still saves the upload round trip.
+    """
+
+    def __init__(self, video_path, segment_seconds, executor, transcribe, recording_id=None,
+                 overlap_seconds=0, gap_seconds=5, max_pending=32):
+        self.video_path = video_path
+        self.recording_id = recording_id
+        self.segment_ms = int(segment_seconds * 1000)
+        self.overlap_ms = int(overlap_seconds * 1000)
+        self.gap_seconds = gap_seconds
+        self.max_pending = max_pending
+        self.can_cut = shutil.which('ffmpeg') is not None
+        self.finished = False
+        self.failed = False
+        self.skipped_chunks = 0
+        self.last_activity = time.monotonic()
+
+        self._executor = executor
+        self._transcribe = transcribe
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        # (loop, future) of coroutines awaiting the transcript
+        self._async_waiters = []
+        self._next_seq = 0
+        self._pending_chunks = {}
+        self._gap_since = None
+        self._end_ms = 0
+        self._segment_start_ms = 0
+        self._segments = []
+        self._segments_queued = 0
+        self._texts = []
+        self._draining = False
+
+    def append(self, seq, data, end_ms=None):
+        """Append chunk `seq` of the recording; chunks may arrive out of order."""
+        with self._lock:
+            if self.finished or seq < self._next_seq:
+                return
+            now = time.monotonic()
+            self.last_activity = now
+            self._pending_chunks[seq] = (data, end_ms)
+            if self._next_seq not in self._pending_chunks:
+                if self._gap_since is None:
+                    self._gap_since = now
+                if now - self._gap_since >= self.gap_seconds or len(self._pending_chunks) > self.max_pending:
+                    self._skip_gap()
+            self._write_pending(now)
+
+            if self.can_cut and self._end_ms - self._segment_start_ms >= self.segment_ms:
+                self._queue_segment(self._segment_start_ms, self._end_ms)
+                self._segment_start_ms = self._end_ms
+
+    def _skip_gap(self):
+        # Callers hold self._lock
+        next_seq = min(self._pending_chunks)
+        logger.warning("Chunks %d-%d of %s never arrived, continuing without them",
+                       self._next_seq, next_seq - 1, self.video_path)
+        self.skipped_chunks += next_seq - self._next_seq
+        self._next_seq = next_seq
+
+    def _write_pending(self, now):
+        # Callers hold self._lock
+        if self._next_seq not in self._pending_chunks:
+            return
+        with open(self.video_path, 'ab') as f:
+            while self._next_seq in self._pending_chunks:
+                data, end_ms = self._pending_chunks.pop(self._next_seq)
+                f.write(data)
+                self._next_seq += 1
+                if end_ms is not None:
+                    self._end_ms = max(self._end_ms, int(end_ms))
+        # Chunks still waiting are now behind a new gap
+        self._gap_since = now if self._pending_chunks else None
+
+    def finish(self):
+        """Mark the recording complete and queue whatever audio is left."""
+        with self._lock:
+            if self.finished:
+                return
+            # No more chunks are coming, so the ones still waiting go in over any gaps
+            while self._pending_chunks:
+                self._skip_gap()
+                self._write_pending(time.monotonic())
+            self.finished = True
+            if not self.can_cut:
+                self._queue_segment(None, None)
+            elif self._end_ms > self._segment_start_ms or not self._segments_queued:
+                # The last segment runs to the end of the file
+                self._queue_segment(self._segment_start_ms, None)
+            elif not self._draining:
+                self._set_done()
+
+    def abandon(self):
+        """Stop a recording the client walked away from, without transcribing it, and delete it."""
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+            self.failed = True
+            self._pending_chunks.clear()
+            self._segments = []
+            if not self._draining:
+                self._set_done()
+        # A segment still being cut keeps its open file; later cuts are cancelled above
+        try:
+            os.remove(self.video_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error("Error deleting abandoned recording %s: %s", self.video_path, e)
+
+    def _set_done(self):
+        # Callers hold self._lock
+        self._done.set()
+        for loop, future in self._async_waiters:
+            loop.call_soon_threadsafe(_resolve_waiter, future)
+        self._async_waiters = []
+
+    def _queue_segment(self, start_ms, end_ms):
+        # Callers hold self._lock
+        self._segments.append((start_ms, end_ms))
+        self._segments_queued += 1
+        if not self._draining:
+            self._draining = True
+            self._executor.submit(self._drain)
+
+    def _cut(self, start_ms, end_ms):
+        fd, segment_path = tempfile.mkstemp(suffix='.webm', prefix='segment-')
+        os.close(fd)
+        # Start a little before the segment, over the end of the previous one
+        start_ms = max(start_ms - self.overlap_ms, 0)
+        command = ['ffmpeg', '-y', '-loglevel', 'error', '-ss', f"{start_ms / 1000:.3f}"]
+        if end_ms is not None:
+            command += ['-t', f"{(end_ms - start_ms) / 1000:.3f}"]
+        command += ['-i', self.video_path, '-vn', '-ac', '1', '-c:a', 'libopus', '-b:a', '32k', '-f', 'webm', segment_path]
+        subprocess.run(command, check=True, timeout=60)
+        return segment_path
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._segments:
+                    self._draining = False
+                    if self.finished:
+                        self._set_done()
+                    return
+                start_ms, end_ms = self._segments.pop(0)
+                prompt = self._texts[-1][-PROMPT_TAIL_LENGTH:] if self._texts else None
+
+            segment_path = None
+            try:
+                if start_ms is None:
+                    text = self._transcribe(self.video_path)
+                else:
+                    segment_path = self._cut(start_ms, end_ms)
+                    text = self._transcribe(segment_path, prompt=prompt)
+                if text.startswith('['):
+                    raise RuntimeError(text)
+                with self._lock:
+                    if start_ms and self.overlap_ms and self._texts:
+                        text = _drop_repeated_words(self._texts[-1], text)
+                    self._texts.append(text)
+            except Exception as e:
+                logger.error("Error transcribing live segment of %s: %s", self.video_path, e)
+                with self._lock:
+                    self.failed = True
+            finally:
+                if segment_path and os.path.exists(segment_path):
+                    os.remove(segment_path)
+
+    def _text(self):
+        with self._lock:
+            if self.failed or not self._texts:
+                return None
+            return " ".join(text.strip() for text in self._texts if text.strip())
+
+    def transcription(self, timeout=None):
+        """Wait for outstanding segments and return the full transcript, or None if unusable."""
+        if not self._done.wait(timeout):
+            return None
+        return self._text()
+
+    async def transcription_async(self, timeout=None):
+        """transcription() for coroutines; waits without holding a thread."""
+        with self._lock:
+            if not self._done.is_set():
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                self._async_waiters.append((loop, future))
+            else:
+                future = None
+        if future is not None:
+            try:
+                await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._text()
+
+
+class LiveTranscriptionManager:
+    """Tracks live transcription sessions per (interview_id, question_index) and per file.
+
+    Recordings that receive no chunk for LIVE_SESSION_IDLE_SECONDS are abandoned and
+    deleted without being transcribed; the check runs at most once per that interval, on a
+    new chunk. Recordings left behind when no chunk ever comes again are removed by the
+    video storage sweep once they reach VIDEO_MAX_AGE_HOURS.
+    """
+
+    def __init__(self, upload_folder, segment_seconds=None, workers=None, max_sessions=None,
+                 overlap_seconds=None, gap_seconds=None, max_pending=None, idle_seconds=None):
+        self.upload_folder = upload_folder
+        self.segment_seconds = float(segment_seconds if segment_seconds is not None else os.getenv('LIVE_SEGMENT_SECONDS', '15'))
+        self.max_sessions = max_sessions if max_sessions is not None else int(os.getenv('LIVE_MAX_SESSIONS', '500'))
+        self.overlap_seconds = float(overlap_seconds if overlap_seconds is not None else os.getenv('LIVE_SEGMENT_OVERLAP_SECONDS', '1'))
+        self.gap_seconds = float(gap_seconds if gap_seconds is not None else os.getenv('LIVE_CHUNK_GAP_SECONDS', '5'))
+        self.max_pending = max_pending if max_pending is not None else int(os.getenv('LIVE_MAX_PENDING_CHUNKS', '32'))
+        self.idle_seconds = float(idle_seconds if idle_seconds is not None else os.getenv('LIVE_SESSION_IDLE_SECONDS', '300'))
+        self._last_sweep = time.monotonic()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers if workers is not None else int(os.getenv('LIVE_TRANSCRIPTION_WORKERS', '4')),
+            thread_name_prefix='live-transcription'
+        )
+        self._lock = threading.Lock()
+        self._active = {}
+        self._by_path = OrderedDict()
+
+    def append_chunk(self, interview_id, question_index, seq, data, transcribe, end_ms=None, recording_id=None):
+        """Append a recording chunk, starting a new session for a new recording_id.
+
+        `transcribe` is the interview tenant's transcribe function, used by a new session.
+        """
+        key = (interview_id, question_index)
+        with self._lock:
+            idle = self._expire_idle()
+            session = self._active.get(key)
+            if session is None or session.finished or session.recording_id != recording_id:
+                video_path = os.path.abspath(os.path.join(self.upload_folder, f"{uuid.uuid4()}_interview-answer.webm"))
+                session = LiveTranscriptionSession(
+                    video_path, self.segment_seconds, self._executor, transcribe, recording_id,
+                    overlap_seconds=self.overlap_seconds, gap_seconds=self.gap_seconds, max_pending=self.max_pending
+                )
+                self._active[key] = session
+                self._by_path[video_path] = session
+                while len(self._by_path) > self.max_sessions:
+                    self._by_path.popitem(last=False)
+        for idle_session in idle:
+            idle_session.abandon()
+        session.append(seq, data, end_ms)
+        return session
+
+    def _expire_idle(self):
+        # Callers hold self._lock; returns the sessions to abandon
+        now = time.monotonic()
+        if now - self._last_sweep < self.idle_seconds:
+            return []
+        self._last_sweep = now
+        idle = [key for key, session in self._active.items() if now - session.last_activity > self.idle_seconds]
+        return [self._active.pop(key) for key in idle]
+
+    def finish(self, interview_id, question_index):
+        """Finish the active recording for a question and return its session."""
+        with self._lock:
+            session = self._active.pop((interview_id, question_index), None)
+        if session is not None:
+            session.finish()
+        return session
+
+    def get_transcription(self, video_path, timeout=None):
+        """Return the live transcript for a finished recording, or None if there is none."""
+        with self._lock:
+            session = self._by_path.get(os.path.abspath(video_path)) if video_path else None
+        if session is None or not session.finished:
+            return None
+        return session.transcription(timeout)
+
+    async def get_transcription_async(self, video_path, timeout=None):
+        """get_transcription for coroutines."""
+        with self._lock:
+            session = self._by_path.get(os.path.abspath(video_path)) if video_path else None
+        if session is None or not session.finished:
+            return None
+        return await session.transcription_async(timeout)
@@ -0,0 +1,176 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Tier each task starts on before input length and model health are considered
+DEFAULT_TASK_TIERS = {
+    "greeting": 0,
+    "questions": 0,
+    "summary": 0,
+    "evaluation": 0,
+    "overall_summary": 1
+}
+
+# Seconds a model may take on a task, on average, before requests route around it
+DEFAULT_LATENCY_BUDGETS = {
+    "greeting": 4.0,
+    "questions": 8.0,
+    "summary": 4.0,
+    "evaluation": 6.0,
+    "overall_summary": 10.0
+}
+
+
+def _parse_overrides(value, cast):
+    """Parse "task=value,task=value" settings."""
+    overrides = {}
+    for item in (value or "").split(','):
+        if '=' in item:
+            task, setting = item.split('=', 1)
+            overrides[task.strip()] = cast(setting.strip())
+    return overrides
+
+
+class ModelStats:
+    """Smoothed latency and error rate of one model on one task."""
+
+    __slots__ = ('latency', 'error_rate', 'samples', 'last_used')
+
+    def __init__(self):
+        self.latency = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.last_used = 0.0
+
+
+class CallTimer:
+    """Time spent waiting on the model during one call, yielded by ModelRouter.track.
+
+    Streaming callers pause it while a chunk is handed to their reader, so a slow client
+    does not count against the model.
+    """
+
+    __slots__ = ('elapsed', '_started')
+
+    def __init__(self):
+        self.elapsed = 0.0
+        self._started = time.monotonic()
+
+    @contextmanager
+    def paused(self):
+        self.elapsed += time.monotonic() - self._started
+        try:
+            yield
+        finally:
+            self._started = time.monotonic()
+
+    def stop(self):
+        self.elapsed += time.monotonic() - self._started
+        return self.elapsed
+
+
+class ModelRouter:
+    """Picks a model per call from a tier list ordered cheapest first.
+
+    A call starts on its task's tier (ROUTING_TASK_TIERS) and moves up one tier when its
+    input is longer than ROUTING_LONG_INPUT_CHARS. Models whose smoothed error rate on
+    the task exceeds ROUTING_MAX_ERROR_RATE, or whose latency on it exceeds its budget
+    (ROUTING_LATENCY_BUDGETS), are skipped in favour of the next stronger tier, then the
+    next cheaper one. A skipped model gets a probe request for the task after
+    ROUTING_COOLDOWN_SECONDS so it can recover. With a single tier every call uses that
+    model.
+    """
+
+    def __init__(self, tiers, long_input_chars=None, max_error_rate=None, min_samples=None, cooldown=None):
+        self.tiers = list(tiers)
+        self.long_input_chars = long_input_chars or int(os.getenv('ROUTING_LONG_INPUT_CHARS', '1500'))
+        self.max_error_rate = max_error_rate if max_error_rate is not None else float(os.getenv('ROUTING_MAX_ERROR_RATE', '0.5'))
+        self.min_samples = min_samples if min_samples is not None else int(os.getenv('ROUTING_MIN_SAMPLES', '5'))
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv('ROUTING_COOLDOWN_SECONDS', '60'))
+        self.task_tiers = {**DEFAULT_TASK_TIERS, **_parse_overrides(os.getenv('ROUTING_TASK_TIERS'), int)}
+        self.latency_budgets = {**DEFAULT_LATENCY_BUDGETS, **_parse_overrides(os.getenv('ROUTING_LATENCY_BUDGETS'), float)}
+
+        self._lock = threading.Lock()
+        self._stats = {}   # (model, task) -> ModelStats
+
+    def _task_stats(self, model, task):
+        # Callers hold self._lock
+        stats = self._stats.get((model, task))
+        if stats is None:
+            stats = self._stats[(model, task)] = ModelStats()
+        return stats
+
+    def _healthy(self, model, task, now):
+        # Callers hold self._lock
+        stats = self._stats.get((model, task))
+        if stats is None or stats.samples < self.min_samples or now - stats.last_used > self.cooldown:
+            return True
+        budget = self.latency_budgets.get(task)
+        if stats.latency is not None and budget is not None and stats.latency > budget:
+            return False
+        return stats.error_rate <= self.max_error_rate
+
+    def choose(self, task, input_chars=0):
+        """Return the model to use for a call."""
+        start = self.task_tiers.get(task, 0) + (1 if input_chars > self.long_input_chars else 0)
+        start = min(start, len(self.tiers) - 1)
+        # Prefer the starting tier, then stronger tiers, then cheaper ones
+        candidates = self.tiers[start:] + self.tiers[:start][::-1]
+        now = time.monotonic()
+        with self._lock:
+            chosen = next((model for model in candidates if self._healthy(model, task, now)), self.tiers[start])
+            # Counts as use, so a model past its cooldown gets one probe rather than a burst
+            self._task_stats(chosen, task).last_used = now
+        return chosen
+
+    def escalate(self, model):
+        """Next stronger model after `model`, or None if it is already the strongest."""
+        index = self.tiers.index(model) if model in self.tiers else len(self.tiers) - 1
+        return self.tiers[index + 1] if index + 1 < len(self.tiers) else None
+
+    def record(self, model, task, latency, ok):
+        with self._lock:
+            stats = self._task_stats(model, task)
+            stats.latency = latency if stats.latency is None else 0.8 * stats.latency + 0.2 * latency
+            stats.error_rate = 0.8 * stats.error_rate + 0.2 * (0.0 if ok else 1.0)
+            stats.samples += 1
+            stats.last_used = time.monotonic()
+
+    @contextmanager
+    def track(self, model, task):
+        """Time a call to `model` and record whether it raised; yields the CallTimer."""
+        timer = CallTimer()
+        ok = False
+        try:
+            yield timer
+            ok = True
+        except GeneratorExit:
+            # A stream closed early by its reader is not a model failure
+            ok = True
+            raise
+        finally:
+            duration = timer.stop()
+            self.record(model, task, duration, ok)
+            logger.debug("AI call %s", "ok" if ok else "failed", extra={
+                'method': task, 'model': model, 'duration_ms': round(duration * 1000, 1)
+            })
+
+    def stats(self):
+        with self._lock:
+            result = {
+                model: {"tier": index, "tasks": {}} for index, model in enumerate(self.tiers)
+            }
+            for (model, task), stats in self._stats.items():
+                if not stats.samples:
+                    continue
+                entry = result.setdefault(model, {"tier": None, "tasks": {}})
+                entry["tasks"][task] = {
+                    "samples": stats.samples,
+                    "error_rate": round(stats.error_rate, 3),
+                    "latency_seconds": round(stats.latency, 3)
+                }
+            return result
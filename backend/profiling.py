@@ -0,0 +1,252 @@
+import os
+import logging
+import sys
+import json
+import time
+import uuid
+import random
+import threading
+import contextvars
+from collections import Counter, deque
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_TOKEN_HEADER = 'X-Profile-Token'
+
+
+class Profile:
+    """Stack samples collected for one request or background job."""
+
+    def __init__(self, name, kind):
+        self.profile_id = str(uuid.uuid4())
+        self.name = name
+        self.kind = kind
+        self.thread_id = threading.get_ident()
+        self.started_at = time.time()
+        self.duration_ms = None
+        self.stacks = Counter()
+        self.files = {}
+
+    def add_sample(self, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        stack.reverse()
+        self.stacks[tuple(stack)] += 1
+
+    @property
+    def sample_count(self):
+        return sum(self.stacks.values())
+
+    def to_folded(self):
+        """Folded stacks, one `frame;frame;frame count` line each, for flamegraph.pl and friends."""
+        lines = []
+        for stack, count in self.stacks.items():
+            frames = ";".join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack)
+            lines.append(f"{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def to_speedscope(self, interval_ms):
+        """A sampled profile in the speedscope file format."""
+        frame_index = {}
+        frames = []
+        samples = []
+        weights = []
+        for stack, count in self.stacks.items():
+            sample = []
+            for name, filename, line in stack:
+                key = (name, filename, line)
+                if key not in frame_index:
+                    frame_index[key] = len(frames)
+                    frames.append({"name": name, "file": filename, "line": line})
+                sample.append(frame_index[key])
+            samples.append(sample)
+            weights.append(count * interval_ms)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": self.duration_ms or 0,
+                "samples": samples,
+                "weights": weights
+            }],
+            "name": self.name,
+            "exporter": "ai-interview-bot profiling"
+        }
+
+    def summary(self):
+        return {
+            "profile_id": self.profile_id,
+            "name": self.name,
+            "kind": self.kind,
+            "started_at": self.started_at,
+            "duration_ms": self.duration_ms,
+            "samples": self.sample_count,
+            "files": self.files
+        }
+
+
+class SamplingProfiler:
+    """Low-overhead wall-clock sampling of selected threads.
+
+    Profiling is off unless a request is sampled (PROFILE_SAMPLE_RATE, adjustable at
+    runtime) or forced with the X-Profile header. While at least one profile is active, a
+    single sampler thread reads every profiled thread's current stack every
+    PROFILE_INTERVAL_MS; unprofiled requests pay only a random() call. Async requests
+    served by asgi.py share the event loop thread, so their profiles sample whatever the
+    loop runs meanwhile, other requests included. Finished profiles
+    are written as speedscope JSON and folded stacks. The last PROFILE_WINDOW of them are
+    kept, and the summary endpoint lists the slowest PROFILE_KEEP of those, so one old
+    outlier does not hide recent regressions forever. A profile's files are deleted when
+    it drops out of that window, so PROFILE_OUTPUT_DIR stays bounded too.
+    """
+
+    def __init__(self, sample_rate=None, interval_ms=None, output_dir=None, keep=None, window=None):
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+        self.interval_ms = interval_ms if interval_ms is not None else float(os.getenv('PROFILE_INTERVAL_MS', '5'))
+        self.output_dir = output_dir or os.getenv('PROFILE_OUTPUT_DIR', '/tmp/profiles')
+        self.keep = keep if keep is not None else int(os.getenv('PROFILE_KEEP', '50'))
+        window = window if window is not None else int(os.getenv('PROFILE_WINDOW', '500'))
+        # Forcing a profile by header or changing settings requires this token
+        self.token = os.getenv('PROFILING_TOKEN')
+
+        self._lock = threading.Lock()
+        self._active = {}    # thread id -> profiles running on it
+        self._wake = threading.Event()
+        self._sampler = None
+        self._recent = deque(maxlen=max(window, self.keep))
+        # Per context rather than per thread, so concurrent async requests keep their own
+        self._current = contextvars.ContextVar('profile', default=None)
+
+    def authorized(self, token):
+        return bool(self.token) and token == self.token
+
+    def should_profile(self, forced=False):
+        return forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def current(self):
+        """The profile of the request or job running in this context, if any."""
+        return self._current.get()
+
+    def start(self, name, kind='request'):
+        profile = Profile(name, kind)
+        self._current.set(profile)
+        with self._lock:
+            self._active.setdefault(profile.thread_id, []).append(profile)
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler')
+                self._sampler.daemon = True
+                self._sampler.start()
+            self._wake.set()
+        return profile
+
+    def stop(self, profile):
+        profile.duration_ms = (time.time() - profile.started_at) * 1000
+        self._current.set(None)
+        with self._lock:
+            # Samples are only added under the lock, so the stacks are final from here on
+            profiles = self._active.get(profile.thread_id, [])
+            if profile in profiles:
+                profiles.remove(profile)
+            if not profiles:
+                self._active.pop(profile.thread_id, None)
+            if not self._active:
+                self._wake.clear()
+        self._write(profile)
+        with self._lock:
+            dropped = self._recent[0] if len(self._recent) == self._recent.maxlen else None
+            self._recent.append(profile)
+        if dropped is not None:
+            self._remove_files(dropped)
+
+    def _sample_loop(self):
+        interval = self.interval_ms / 1000
+        own_id = threading.get_ident()
+        while True:
+            self._wake.wait()
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, profiles in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None and thread_id != own_id:
+                        for profile in profiles:
+                            profile.add_sample(frame)
+            del frames
+            time.sleep(interval)
+
+    def _write(self, profile):
+        if not profile.stacks:
+            return
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            base = os.path.join(self.output_dir, profile.profile_id)
+            with open(base + '.speedscope.json', 'w') as f:
+                json.dump(profile.to_speedscope(self.interval_ms), f)
+            with open(base + '.folded', 'w') as f:
+                f.write(profile.to_folded())
+            profile.files = {"speedscope": base + '.speedscope.json', "folded": base + '.folded'}
+        except Exception as e:
+            logger.error("Error writing profile %s: %s", profile.profile_id, e)
+
+    def _remove_files(self, profile):
+        for path in profile.files.values():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error("Error deleting profile file %s: %s", path, e)
+        profile.files = {}
+
+    def wrap(self, name, target):
+        """Wrap a background job so it is profiled when sampled or started by a profiled request."""
+        forced = self.current() is not None
+
+        def run(*args, **kwargs):
+            if not self.should_profile(forced):
+                return target(*args, **kwargs)
+            profile = self.start(name, kind='job')
+            try:
+                return target(*args, **kwargs)
+            finally:
+                self.stop(profile)
+        return run
+
+    def slowest(self):
+        with self._lock:
+            recent = list(self._recent)
+        recent.sort(key=lambda p: p.duration_ms, reverse=True)
+        return [profile.summary() for profile in recent[:self.keep]]
+
+    def find(self, profile_id):
+        with self._lock:
+            for profile in self._recent:
+                if profile.profile_id == profile_id:
+                    return profile
+        return None
+
+    def init_app(self, app):
+        """Install before/after request hooks that profile sampled or forced requests."""
+        from flask import request
+
+        @app.before_request
+        def start_request_profile():
+            forced = request.headers.get(PROFILE_HEADER) == '1' and self.authorized(request.headers.get(PROFILE_TOKEN_HEADER))
+            if self.should_profile(forced):
+                self.start(f"{request.method} {request.path}")
+
+        @app.teardown_request
+        def stop_request_profile(exc):
+            profile = self.current()
+            if profile is not None and profile.kind == 'request':
+                self.stop(profile)
+
+# Create a global instance
+profiler = SamplingProfiler()
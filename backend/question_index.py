@@ -0,0 +1,294 @@
+import os
+import re
+import zlib
+import random
+import threading
+from collections import deque
+from cache_snapshot import cache_snapshot
+
+# Words that carry no meaning for similarity between interview questions
+STOPWORDS = frozenset([
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "at", "by",
+    "you", "your", "we", "us", "our", "i", "me", "my", "it", "its", "is", "are", "was",
+    "were", "be", "been", "do", "does", "did", "have", "has", "had", "can", "could",
+    "would", "will", "should", "how", "what", "when", "where", "which", "who", "why",
+    "that", "this", "these", "those", "there", "about", "as", "from", "tell", "describe",
+    "time", "walk", "through", "explain", "give", "example"
+])
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Large Mersenne prime used for the MinHash permutations
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+class QuestionDiversityIndex:
+    """Near-duplicate detection for interview questions using MinHash + LSH.
+
+    Every role keeps a bounded history of recently issued questions. Each question
+    is reduced to a set of word unigrams and bigrams, summarised by a MinHash
+    signature and bucketed by LSH bands, so a lookup only compares against the
+    handful of questions that share a band instead of the whole history.
+    """
+
+    def __init__(self, threshold=None, history_size=None, num_perm=32, bands=8):
+        self.threshold = threshold if threshold is not None else float(os.getenv('QUESTION_SIMILARITY_THRESHOLD', '0.6'))
+        self.history_size = history_size if history_size is not None else int(os.getenv('QUESTION_HISTORY_SIZE', '200'))
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = random.Random(1337)
+        self._perms = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)]
+
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._history = {}   # role -> deque of entry ids (oldest first)
+        self._entries = {}   # entry id -> (role, shingles, band keys)
+        self._buckets = {}   # (role, band, band hash) -> set of entry ids
+        self._saved = None   # role -> location of its history in the cache snapshot
+        self._warmed = set()
+
+    def _shingles(self, text):
+        words = [w for w in WORD_RE.findall(text.lower()) if w not in STOPWORDS]
+        shingles = set(words)
+        shingles.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+        return frozenset(zlib.crc32(s.encode('utf-8')) for s in shingles)
+
+    def _band_keys(self, role, shingles):
+        if not shingles:
+            return ()
+        signature = [min((a * s + b) % MERSENNE_PRIME for s in shingles) for a, b in self._perms]
+        return tuple(
+            (role, band, hash(tuple(signature[band * self.rows:(band + 1) * self.rows])))
+            for band in range(self.bands)
+        )
+
+    @staticmethod
+    def _jaccard(a, b):
+        if not a or not b:
+            return 0.0
+        return len(a & b) / len(a | b)
+
+    def _find_duplicate(self, shingles, band_keys):
+        candidates = set()
+        for key in band_keys:
+            candidates.update(self._buckets.get(key, ()))
+        for entry_id in candidates:
+            if self._jaccard(shingles, self._entries[entry_id][1]) >= self.threshold:
+                return entry_id
+        return None
+
+    def _saved_roles(self):
+        if self._saved is None:
+            saved = cache_snapshot.get_json("questions") or {}
+            # Band hashes are only reusable if this interpreter hashes integer tuples the same way
+            compatible = saved.get("bands") == self.bands and saved.get("hash_probe") == hash((self.num_perm, self.bands))
+            self._saved = {role: (location, compatible) for role, location in saved.get("roles", {}).items()}
+        return self._saved
+
+    def _warm(self, role):
+        """Restore the role's history from the cache snapshot before it is first used."""
+        if role in self._warmed:
+            return
+        with self._lock:
+            if role in self._warmed:
+                return
+            self._warmed.add(role)
+            saved = self._saved_roles().get(role)
+            if saved is None:
+                return
+            (first_entry, first_shingle, counts), compatible = saved
+            shingle_values = cache_snapshot.get_array("question_shingles", 'I')
+            band_values = cache_snapshot.get_array("question_bands", 'q')
+            if shingle_values is None or band_values is None:
+                return
+            start = first_shingle
+            for entry, count in enumerate(counts, first_entry):
+                shingles = frozenset(shingle_values[start:start + count])
+                start += count
+                if not shingles:
+                    band_keys = ()
+                elif compatible:
+                    band_keys = tuple((role, band, band_values[entry * self.bands + band]) for band in range(self.bands))
+                else:
+                    band_keys = self._band_keys(role, shingles)
+                self._add(role, shingles, band_keys)
+
+    def snapshot_sections(self):
+        """Every role's question history, for the cache snapshot."""
+        for role in self._saved_roles():
+            self._warm(role)
+        with self._lock:
+            histories = {role: [self._entries[entry_id] for entry_id in history] for role, history in self._history.items()}
+
+        roles, shingle_values, band_values = {}, [], []
+        for role, entries in histories.items():
+            counts = []
+            roles[role] = (len(band_values) // self.bands, len(shingle_values), counts)
+            for _, shingles, band_keys in entries:
+                counts.append(len(shingles))
+                shingle_values.extend(shingles)
+                if band_keys:
+                    band_values.extend(key[2] for key in band_keys)
+                else:
+                    band_values.extend([0] * self.bands)
+        return {
+            "questions": cache_snapshot.json_section({
+                "bands": self.bands, "hash_probe": hash((self.num_perm, self.bands)), "roles": roles
+            }),
+            "question_shingles": cache_snapshot.array_section('I', shingle_values),
+            "question_bands": cache_snapshot.array_section('q', band_values)
+        }
+
+    def is_near_duplicate(self, role_title, question):
+        """Return True if the question is too similar to one recently issued for the role."""
+        self._warm(role_title)
+        shingles = self._shingles(question)
+        band_keys = self._band_keys(role_title, shingles)
+        with self._lock:
+            return self._find_duplicate(shingles, band_keys) is not None
+
+    def _add(self, role_title, shingles, band_keys):
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (role_title, shingles, band_keys)
+        for key in band_keys:
+            self._buckets.setdefault(key, set()).add(entry_id)
+
+        history = self._history.setdefault(role_title, deque())
+        history.append(entry_id)
+        while len(history) > self.history_size:
+            self._evict(history.popleft())
+
+    def _evict(self, entry_id):
+        _, _, band_keys = self._entries.pop(entry_id)
+        for key in band_keys:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def add(self, role_title, question):
+        """Record an issued question in the role's history."""
+        self._warm(role_title)
+        shingles = self._shingles(question)
+        band_keys = self._band_keys(role_title, shingles)
+        with self._lock:
+            self._add(role_title, shingles, band_keys)
+
+    def forget(self, role_title, questions):
+        """Drop questions that were recorded but never shown, newest matching entry first."""
+        self._warm(role_title)
+        for question in questions:
+            shingles = self._shingles(question.strip())
+            with self._lock:
+                history = self._history.get(role_title, ())
+                for entry_id in reversed(history):
+                    if self._entries[entry_id][1] == shingles:
+                        history.remove(entry_id)
+                        self._evict(entry_id)
+                        break
+
+    def selector(self, role_title, count):
+        """Return a QuestionSelector that assembles one question set incrementally."""
+        self._warm(role_title)
+        return QuestionSelector(self, role_title, count)
+
+    def select(self, role_title, candidates, count, fallback=()):
+        """Pick up to `count` mutually distinct questions, preferring ones not issued recently.
+
+        Candidates are considered first and fallback questions pad the set. Questions
+        that are near-duplicates of each other are never selected together; questions
+        that repeat recent interviews are only used when nothing fresher is left.
+        """
+        selector = self.selector(role_title, count)
+        for question in candidates:
+            selector.offer(question)
+        selector.pad(fallback)
+        selector.commit()
+        return selector.questions
+
+
+class QuestionSelector:
+    """Assembles one question set from questions that arrive one at a time.
+
+    Used directly when questions are streamed from the model, so each one can be
+    accepted or rejected as soon as its line is complete. Accepted questions only
+    enter the role's history on commit(), so a set that is abandoned halfway does not
+    hold back questions the candidate never saw.
+    """
+
+    def __init__(self, index, role_title, count):
+        self.index = index
+        self.role_title = role_title
+        self.count = count
+        self._selected = []
+        self._pending = []
+        self._stale = []
+        self._seen = set()
+
+    @property
+    def questions(self):
+        return [question for question, _ in self._selected]
+
+    @property
+    def full(self):
+        return len(self._selected) >= self.count
+
+    def _conflicts(self, shingles):
+        return any(self.index._jaccard(shingles, other) >= self.index.threshold for _, other in self._selected)
+
+    def offer(self, question):
+        """Accept the question if it is new to this set and to recent interviews."""
+        question = question.strip()
+        if self.full or not question or question in self._seen:
+            return False
+        self._seen.add(question)
+        shingles = self.index._shingles(question)
+        band_keys = self.index._band_keys(self.role_title, shingles)
+
+        with self.index._lock:
+            if self._conflicts(shingles):
+                return False
+            if self.index._find_duplicate(shingles, band_keys) is not None:
+                # Held back in case nothing fresher turns up
+                self._stale.append((question, shingles, band_keys))
+                return False
+        self._selected.append((question, shingles))
+        self._pending.append((shingles, band_keys))
+        return True
+
+    def pad(self, fallback=()):
+        """Fill the set from fallback questions, then from held-back repeats.
+
+        Returns the questions added by this call.
+        """
+        before = len(self._selected)
+        for question in fallback:
+            if self.full:
+                break
+            self.offer(question)
+
+        with self.index._lock:
+            for question, shingles, band_keys in self._stale:
+                if self.full:
+                    break
+                if self._conflicts(shingles):
+                    continue
+                self._selected.append((question, shingles))
+                self._pending.append((shingles, band_keys))
+        self._stale = []
+        return self.questions[before:]
+
+    def commit(self):
+        """Record the accepted questions in the role's history."""
+        with self.index._lock:
+            for shingles, band_keys in self._pending:
+                self.index._add(self.role_title, shingles, band_keys)
+        self._pending = []
+
+# Create a global instance
+question_index = QuestionDiversityIndex()
+cache_snapshot.add_source(question_index.snapshot_sections)
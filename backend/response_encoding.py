@@ -0,0 +1,176 @@
+import os
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from flask import Response, request
+from cache_snapshot import cache_snapshot
+
+# Optional fast JSON encoder and brotli compression, used when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))
+GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', '5'))
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '4'))
+ENCODED_CACHE_SIZE = int(os.getenv('ENCODED_CACHE_SIZE', '256'))
+
+
+def dumps(payload):
+    """Encode a payload to compact JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+def _accepted_codings(accept_encoding):
+    """Map each coding listed in an Accept-Encoding header to its q-value."""
+    codings = {}
+    for token in accept_encoding.split(','):
+        coding, *params = token.split(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        codings[coding] = quality
+    return codings
+
+
+def negotiate_encoding(accept_encoding, size):
+    """Pick the content coding for a body of `size` bytes, or 'identity'.
+
+    The client's q-values rank the codings and q=0 rules one out ("gzip;q=0"); a "*"
+    entry covers codings not listed. Ties go to brotli.
+    """
+    if size < COMPRESSION_MIN_BYTES:
+        return 'identity'
+    codings = _accepted_codings(accept_encoding)
+    wildcard = codings.get('*', 0.0)
+    best, best_quality = 'identity', 0.0
+    for coding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        quality = codings.get(coding, wildcard)
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+class EncodedResponseCache:
+    """LRU of encoded (and compressed) bodies keyed by the version of the data they encode."""
+
+    def __init__(self, max_entries=ENCODED_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._persistent = {}   # key -> snapshot section prefix
+
+    def persist(self, key, name):
+        """Keep the key's bodies in the cache snapshot under `name`, and reuse them after a restart.
+
+        The name must change whenever the data does, like the key itself.
+        """
+        self._persistent[key] = name
+
+    def get(self, key, encoding):
+        with self._lock:
+            variants = self._entries.get(key)
+            if variants is not None:
+                self._entries.move_to_end(key)
+                body = variants.get(encoding)
+                if body is not None:
+                    return body
+        name = self._persistent.get(key)
+        saved = cache_snapshot.get(f"{name}:{encoding}") if name is not None else None
+        if saved is None:
+            return None
+        body = saved.tobytes()
+        self.put(key, encoding, body)
+        return body
+
+    def put(self, key, encoding, body):
+        with self._lock:
+            variants = self._entries.get(key)
+            if variants is None:
+                variants = self._entries[key] = {}
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._entries.move_to_end(key)
+            variants[encoding] = body
+
+    def snapshot_sections(self):
+        """Cached bodies of the persistent keys, for the cache snapshot."""
+        sections = {}
+        with self._lock:
+            for key, name in self._persistent.items():
+                for encoding, body in self._entries.get(key, {}).items():
+                    sections[f"{name}:{encoding}"] = body
+        return sections
+
+
+encoded_cache = EncodedResponseCache()
+cache_snapshot.add_source(encoded_cache.snapshot_sections)
+
+
+def encode_json(payload, accept_encoding, cache_key=None):
+    """Encode and compress a payload for a client's Accept-Encoding.
+
+    Returns the body and its content coding. `payload` is a dict or a zero-argument
+    callable returning one, so a cache hit skips building the payload entirely. With
+    `cache_key` the encoded bytes are reused for as long as the key stays the same, so
+    the key must change whenever the data does.
+    """
+    raw = None
+    if cache_key is not None:
+        raw = encoded_cache.get(cache_key, 'identity')
+    if raw is None:
+        raw = dumps(payload() if callable(payload) else payload)
+        if cache_key is not None:
+            encoded_cache.put(cache_key, 'identity', raw)
+
+    encoding = negotiate_encoding(accept_encoding, len(raw))
+    body = raw
+    if encoding != 'identity':
+        body = encoded_cache.get(cache_key, encoding) if cache_key is not None else None
+        if body is None:
+            body = compress(raw, encoding)
+            if cache_key is not None:
+                encoded_cache.put(cache_key, encoding, body)
+    return body, encoding
+
+
+def json_response(payload, status=200, cache_key=None, etag=None):
+    """Build a JSON response with fast encoding and negotiated compression.
+
+    Arguments are as for encode_json. With `etag` the response honours If-None-Match.
+    """
+    body, encoding = encode_json(payload, request.headers.get('Accept-Encoding', ''), cache_key)
+    response = Response(body, status=status, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    if etag is not None:
+        # Weak, since the same data may be sent with different content codings
+        response.set_etag(etag, weak=True)
+        response = response.make_conditional(request)
+    return response
@@ -0,0 +1,263 @@
+import os
+import logging
+import json
+import time
+import threading
+from interview_store import PROCESSING
+
+logger = logging.getLogger(__name__)
+
+# Optional columnar output, exports are unavailable without pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+def _text(value):
+    return value if isinstance(value, str) else None
+
+
+def _text_list(value):
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value]
+    if isinstance(value, str):
+        return [value]
+    return None
+
+
+def _schemas():
+    strings = pa.list_(pa.string())
+    common = [("version", pa.int64()), ("updated_at", pa.timestamp('ms', tz='UTC'))]
+    return {
+        "interviews": pa.schema([
+            ("interview_id", pa.string()),
+            ("candidate_id", pa.string()),
+            ("tenant_id", pa.string()),
+            ("role_title", pa.string()),
+            ("role_description", pa.string()),
+            ("total_questions", pa.int32()),
+            ("completed_questions", pa.int32()),
+        ] + common),
+        "answers": pa.schema([
+            ("interview_id", pa.string()),
+            ("question_index", pa.int32()),
+            ("question_text", pa.string()),
+            ("transcription", pa.string()),
+            ("summary", pa.string()),
+            ("skills_demonstrated", strings),
+            ("strengths", strings),
+            ("weaknesses", strings),
+            ("overall_assessment", pa.string()),
+            ("justification", pa.string()),
+        ] + common),
+        "summaries": pa.schema([
+            ("interview_id", pa.string()),
+            ("overall_assessment", pa.string()),
+            ("key_insights", strings),
+            ("recommendations", strings),
+            ("strengths", strings),
+            ("areas_for_improvement", strings),
+            ("final_recommendation", pa.string()),
+        ] + common),
+    }
+
+
+def interview_rows(record, state):
+    """Yield (table, row) pairs for one interview snapshot."""
+    common = {"version": state.version, "updated_at": int(state.updated_at * 1000)}
+    answered = [
+        (index, question) for index, question in enumerate(state.questions)
+        if question.transcription and question.transcription != PROCESSING
+    ]
+
+    yield "interviews", dict(
+        interview_id=record.interview_id,
+        candidate_id=record.candidate_id,
+        tenant_id=getattr(record, 'tenant_id', None),
+        role_title=record.role_title,
+        role_description=record.role_description,
+        total_questions=len(state.questions),
+        completed_questions=len(answered),
+        **common
+    )
+
+    for index, question in answered:
+        evaluation = question.evaluation if isinstance(question.evaluation, dict) else {}
+        yield "answers", dict(
+            interview_id=record.interview_id,
+            question_index=index,
+            question_text=question.question_text,
+            transcription=question.transcription,
+            summary=_text(question.summary),
+            skills_demonstrated=_text_list(evaluation.get('skills_demonstrated')),
+            strengths=_text_list(evaluation.get('strengths')),
+            weaknesses=_text_list(evaluation.get('weaknesses')),
+            overall_assessment=_text(evaluation.get('overall_assessment')),
+            justification=_text(evaluation.get('justification')),
+            **common
+        )
+
+    summary = state.overall_evaluation
+    if isinstance(summary, dict):
+        yield "summaries", dict(
+            interview_id=record.interview_id,
+            overall_assessment=_text(summary.get('overall_assessment')),
+            key_insights=_text_list(summary.get('key_insights')),
+            recommendations=_text_list(summary.get('recommendations')),
+            strengths=_text_list(summary.get('strengths')),
+            areas_for_improvement=_text_list(summary.get('areas_for_improvement')),
+            final_recommendation=_text(summary.get('final_recommendation')),
+            **common
+        )
+
+
+class ResultsExporter:
+    """Streams interview results to Parquet (or Arrow IPC) files for analytics.
+
+    Each run writes one file per table (interviews, answers, summaries) under
+    RESULTS_EXPORT_DIR. Rows are buffered and written as record batches of
+    EXPORT_BATCH_SIZE, so memory stays bounded however many interviews there are. Runs
+    are incremental: only interviews changed since the previous run's watermark are
+    exported, each as a full snapshot with its `version`, so the newest version of an
+    interview_id wins when files are combined. Only one run happens at a time.
+    """
+
+    def __init__(self, interviews, output_dir=None, batch_size=None, file_format=None, interval=None):
+        self.interviews = interviews
+        self.output_dir = output_dir or os.getenv('RESULTS_EXPORT_DIR', '/tmp/exports')
+        self.batch_size = batch_size or int(os.getenv('EXPORT_BATCH_SIZE', '5000'))
+        self.file_format = (file_format or os.getenv('EXPORT_FORMAT', 'parquet')).lower()
+        self.interval = interval if interval is not None else float(os.getenv('EXPORT_INTERVAL_SECONDS', '0'))
+        self.watermark_path = os.path.join(self.output_dir, '.export_watermark.json')
+
+        self._lock = threading.Lock()
+        self._running = False
+        self.last_run = None
+
+    @property
+    def available(self):
+        return pa is not None
+
+    def watermark(self):
+        try:
+            with open(self.watermark_path) as f:
+                return json.load(f).get('watermark', 0.0)
+        except (OSError, ValueError):
+            return 0.0
+
+    def _save_watermark(self, watermark):
+        tmp_path = self.watermark_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({"watermark": watermark}, f)
+        os.replace(tmp_path, self.watermark_path)
+
+    def _open_writer(self, path, schema):
+        if self.file_format == 'arrow':
+            return pa.ipc.new_file(path, schema)
+        return pq.ParquetWriter(path, schema, compression='zstd')
+
+    def export(self, full=False):
+        """Run one export and return a summary of what was written."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        since = 0.0 if full else self.watermark()
+        # Changes that land while the run is reading are picked up again next time
+        started_at = time.time()
+        run_id = time.strftime('%Y%m%dT%H%M%S', time.gmtime(started_at)) + f"{int(started_at * 1000) % 1000:03d}"
+        extension = 'arrow' if self.file_format == 'arrow' else 'parquet'
+
+        schemas = _schemas()
+        buffers = {table: [] for table in schemas}
+        writers = {}
+        counts = {table: 0 for table in schemas}
+        files = {}
+
+        def flush(table):
+            rows = buffers[table]
+            if not rows:
+                return
+            if table not in writers:
+                files[table] = os.path.join(self.output_dir, f"{table}-{run_id}.{extension}")
+                writers[table] = self._open_writer(files[table], schemas[table])
+            writers[table].write_batch(pa.RecordBatch.from_pylist(rows, schema=schemas[table]))
+            counts[table] += len(rows)
+            buffers[table] = []
+
+        interviews_exported = 0
+        try:
+            # Copy only the references; records are read one at a time below
+            for record in list(self.interviews.values()):
+                state = record.state
+                if state.updated_at <= since:
+                    continue
+                interviews_exported += 1
+                for table, row in interview_rows(record, state):
+                    buffers[table].append(row)
+                    if len(buffers[table]) >= self.batch_size:
+                        flush(table)
+            for table in schemas:
+                flush(table)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        self._save_watermark(started_at)
+        return {
+            "run_id": run_id,
+            "since": since,
+            "watermark": started_at,
+            "interviews": interviews_exported,
+            "rows": counts,
+            "files": files,
+            "duration_seconds": round(time.time() - started_at, 3)
+        }
+
+    def start_run(self, full=False):
+        """Start an export on a background thread; returns False if one is already running."""
+        with self._lock:
+            if self._running:
+                return False
+            self._running = True
+
+        def run():
+            try:
+                self.last_run = self.export(full)
+            except Exception as e:
+                logger.error("Error exporting interview results: %s", e)
+                self.last_run = {"error": str(e)}
+            finally:
+                with self._lock:
+                    self._running = False
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+        return True
+
+    def status(self):
+        with self._lock:
+            running = self._running
+        return {
+            "available": self.available,
+            "running": running,
+            "format": self.file_format,
+            "output_dir": self.output_dir,
+            "watermark": self.watermark(),
+            "last_run": self.last_run
+        }
+
+    def start(self):
+        """Export every EXPORT_INTERVAL_SECONDS in the background, if configured."""
+        if not self.available or self.interval <= 0:
+            return
+
+        def loop():
+            while True:
+                time.sleep(self.interval)
+                self.start_run()
+
+        thread = threading.Thread(target=loop)
+        thread.daemon = True
+        thread.start()
@@ -0,0 +1,153 @@
+import os
+import re
+import functools
+from collections import namedtuple
+
+# Compact view of a job description, built once per interview and sent with every
+# evaluation and summary prompt instead of the raw text
+RoleProfile = namedtuple('RoleProfile', ['title', 'seniority', 'key_skills', 'must_haves', 'focus'])
+
+MAX_SKILLS = 8
+MAX_MUST_HAVES = 3
+MAX_PHRASE_CHARS = 120
+
+# Skills recognised by name on word boundaries; names with capitals must match exactly,
+# so ordinary words ("rest", "spring", "swift") are not taken for technologies
+SKILL_TERMS = (
+    "Python", "Java", "JavaScript", "TypeScript", "Golang", "Rust", "C++", "C#", "Ruby", "PHP", "Kotlin", "Swift", "Scala",
+    "SQL", "NoSQL", "PostgreSQL", "MySQL", "MongoDB", "Redis", "Kafka", "Spark", "Hadoop", "Airflow",
+    "React", "Angular", "Vue", "Node.js", "Django", "Flask", "Spring", "GraphQL", "REST", "APIs", "microservices",
+    "AWS", "Azure", "GCP", "cloud", "Docker", "Kubernetes", "Terraform", "Linux", "CI/CD", "infrastructure",
+    "monitoring", "security", "distributed systems", "system design", "testing", "clean code",
+    "machine learning", "deep learning", "statistics", "data analysis", "data visualization", "predictive models",
+    "NLP", "computer vision", "A/B testing", "experimentation", "TensorFlow", "PyTorch", "pandas",
+    "product strategy", "roadmaps", "user research", "prototyping", "wireframing", "Figma", "usability testing",
+    "interaction design", "visual design", "stakeholder management", "analytics", "SEO", "Agile", "Scrum",
+    "leadership", "mentoring", "communication", "collaboration", "problem solving", "project management",
+)
+
+
+def _terms_re(terms, flags=0):
+    alternatives = "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True))
+    return re.compile(r"(?<![\w+#/])(" + alternatives + r")(?![\w+#])", flags)
+
+
+_NAMED_SKILL_RE = _terms_re([term for term in SKILL_TERMS if term != term.lower()])
+_GENERIC_SKILL_RE = _terms_re([term for term in SKILL_TERMS if term == term.lower()], re.IGNORECASE)
+
+# "experience with X, Y and Z" style lists name skills outside the vocabulary
+_SKILL_LIST_RE = re.compile(
+    r"\b(?:experience (?:with|in)|proficien(?:t|cy) (?:with|in)|knowledge of|familiar(?:ity)? with|skilled in|expertise in)\s+([^.;:\n]+)",
+    re.IGNORECASE
+)
+_LIST_SPLIT_RE = re.compile(r",\s*(?:and\s+|or\s+)?|\s+and\s+|\s+or\s+")
+
+_MUST_HAVE_RE = re.compile(
+    r"\b(?:must|required|requires?|requirements?|essential|mandatory|minimum|at least|need to|you have|you will have)\b",
+    re.IGNORECASE
+)
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+\s*(?:[-*•]\s*)?")
+# "Requirements:" or "Nice to have: Go, Kubernetes" - a short label opening a section
+_LABEL_RE = re.compile(r"^([A-Za-z][\w '/-]{0,40}):\s*(.*)$", re.DOTALL)
+_YEARS_RE = re.compile(r"(\d+)\s*\+?\s*(?:-\s*\d+\s*)?years?", re.IGNORECASE)
+
+# Checked in order, the first level whose words appear in the title wins. Words that are
+# also common verbs or nouns ("lead", "staff", "graduate" as in a graduate degree) are only
+# trusted in the title; the rest are looked for in the description too
+SENIORITY_LEVELS = (
+    ("Intern", ("intern", "internship"), True),
+    ("Junior", ("junior", "jr", "entry level", "entry-level"), True),
+    ("Junior", ("graduate",), False),
+    ("Staff/Principal", ("staff", "principal", "distinguished", "architect"), False),
+    ("Lead", ("lead", "head of", "director", "vp"), False),
+    ("Senior", ("senior", "sr"), True),
+    ("Mid-level", ("mid-level", "mid level", "intermediate"), True),
+)
+
+
+def _mentions(text, words):
+    return any(re.search(r"\b" + re.escape(word) + r"\b", text) for word in words)
+
+
+def _seniority(role_title, description):
+    for level, words, _ in SENIORITY_LEVELS:
+        if _mentions(role_title.lower(), words):
+            return level
+    for level, words, in_description in SENIORITY_LEVELS:
+        if in_description and _mentions(description.lower(), words):
+            return level
+    years = [int(match) for match in _YEARS_RE.findall(description)]
+    if years:
+        most = max(years)
+        if most >= 8:
+            return "Staff/Principal"
+        if most >= 5:
+            return "Senior"
+        return "Mid-level" if most >= 2 else "Junior"
+    return "Not specified"
+
+
+def _shorten(text):
+    text = " ".join(text.split()).strip(" -*•")
+    return text if len(text) <= MAX_PHRASE_CHARS else text[:MAX_PHRASE_CHARS].rsplit(" ", 1)[0] + "..."
+
+
+def _key_skills(description):
+    skills = {}
+    matches = sorted(list(_NAMED_SKILL_RE.finditer(description)) + list(_GENERIC_SKILL_RE.finditer(description)),
+                     key=lambda match: match.start())
+    for match in matches:
+        skills.setdefault(match.group(1).lower(), match.group(1))
+    for match in _SKILL_LIST_RE.finditer(description):
+        for item in _LIST_SPLIT_RE.split(match.group(1)):
+            item = re.sub(r"^(?:a|an|the)\s+", "", item.strip(), flags=re.IGNORECASE)
+            # Long fragments are sentence tails, not skill names
+            if item and len(item.split()) <= 4:
+                skills.setdefault(item.lower(), item)
+    # Dict order keeps first appearance; listed phrases containing a known term are kept once
+    result = []
+    for key, skill in skills.items():
+        if not any(key != other and key in other for other in skills):
+            result.append(skill)
+    return tuple(result[:MAX_SKILLS])
+
+
+@functools.lru_cache(maxsize=int(os.getenv('ROLE_PROFILE_CACHE_SIZE', '256')))
+def compile_role_profile(role_title, role_description):
+    """Extract seniority, key skills and must-haves from a job description.
+
+    Cached by title and description, so the catalog roles every candidate picks are
+    parsed once per process.
+    """
+    role_title = (role_title or "").strip()
+    description = role_description or ""
+    sentences = [sentence.strip() for sentence in _SENTENCE_SPLIT_RE.split(description) if sentence.strip()]
+    must_haves = []
+    in_requirements = False
+    for sentence in sentences:
+        label = _LABEL_RE.match(sentence)
+        if label:
+            # Everything under a "Requirements:" heading is required, until the next heading
+            in_requirements = bool(_MUST_HAVE_RE.search(label.group(1)))
+            sentence = label.group(2).strip()
+            if not sentence or not in_requirements:
+                continue
+        if in_requirements or _MUST_HAVE_RE.search(sentence):
+            must_haves.append(_shorten(sentence))
+    must_haves = tuple(must_haves[:MAX_MUST_HAVES])
+    key_skills = _key_skills(description)
+    # Without anything extracted, the opening sentence is the best summary of the role
+    focus = _shorten(sentences[0]) if sentences and not (key_skills or must_haves) else ""
+    return RoleProfile(role_title, _seniority(role_title, description), key_skills, must_haves, focus)
+
+
+def role_profile_text(profile):
+    """Render a profile as the few prompt lines that describe the role."""
+    lines = [f"Role: {profile.title or 'Not specified'} (seniority: {profile.seniority})"]
+    if profile.key_skills:
+        lines.append(f"Key skills: {', '.join(profile.key_skills)}")
+    if profile.must_haves:
+        lines.append(f"Must-haves: {'; '.join(profile.must_haves)}")
+    if profile.focus:
+        lines.append(f"Focus: {profile.focus}")
+    return "\n".join(lines)
@@ -0,0 +1,189 @@
+import os
+import sys
+import copy
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+# Fields copied from the logging context and from `extra=` into every JSON record
+CONTEXT_FIELDS = ('interview_id', 'question_index', 'method', 'duration_ms', 'tenant_id', 'route', 'http_method',
+                  'status', 'model', 'suppressed')
+
+_context = contextvars.ContextVar('log_context', default={})
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach fields (interview_id, question_index, method, ...) to records logged inside the block.
+
+    The context follows the current thread and asyncio task; new threads start empty.
+    """
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the current log_context onto records, without overriding explicit `extra=` fields."""
+
+    def filter(self, record):
+        for name, value in _context.get().items():
+            if not hasattr(record, name):
+                setattr(record, name, value)
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through at most `burst` identical warnings or errors per `window` seconds.
+
+    Records are identical when they share logger, level, message template and exception
+    type, so an upstream outage that fails every request in the same way costs one dict
+    lookup per failure rather than a log line. The first record after a quiet window
+    carries the number suppressed in between.
+    """
+
+    def __init__(self, burst=None, window=None, max_keys=10000):
+        super().__init__()
+        self.burst = burst or int(os.getenv('LOG_RATE_LIMIT_BURST', '5'))
+        self.window = window or float(os.getenv('LOG_RATE_LIMIT_WINDOW_SECONDS', '60'))
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+        error = record.args[-1] if isinstance(record.args, tuple) and record.args else None
+        key = (record.name, record.levelno, record.msg, type(error).__name__ if isinstance(error, BaseException) else None)
+        now = time.monotonic()
+        with self._lock:
+            window_start, count, suppressed = self._counts.get(key, (now, 0, 0))
+            if now - window_start >= self.window:
+                window_start, count = now, 0
+            if count >= self.burst:
+                self._counts[key] = (window_start, count, suppressed + 1)
+                return False
+            if len(self._counts) >= self.max_keys and key not in self._counts:
+                self._counts.clear()
+            self._counts[key] = (window_start, count + 1, 0)
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking or raising."""
+
+    dropped = 0
+
+    def prepare(self, record):
+        # Resolve the message now, since its arguments may change; formatting is left to the listener.
+        # Work on a copy so other handlers on the logger still see the original record
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+_listener = None
+
+
+def configure_logging():
+    """Route backend logging through a bounded queue to a background writer. Safe to call twice.
+
+    LOG_LEVEL sets the level (INFO), LOG_FORMAT picks "json" lines or plain "text",
+    LOG_QUEUE_SIZE bounds the records waiting to be written.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if os.getenv('LOG_FORMAT', 'json').lower() == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    # Context and rate limiting run in the calling thread, formatting and I/O on the listener
+    handler = DroppingQueueHandler(queue.Queue(int(os.getenv('LOG_QUEUE_SIZE', '10000'))))
+    handler.addFilter(ContextFilter())
+    handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def init_request_logging(app):
+    """Log one record per API request and tag records logged while handling it.
+
+    Records carry the route, HTTP method, status and duration, plus the interview_id and
+    question_index from the URL. Disabled with LOG_REQUESTS=false.
+    """
+    from flask import g, request
+
+    log_requests = os.getenv('LOG_REQUESTS', 'true').lower() == 'true'
+    logger = logging.getLogger('app.requests')
+
+    @app.before_request
+    def start_request_context():
+        g.log_started = time.monotonic()
+        fields = {name: value for name, value in (request.view_args or {}).items() if name in ('interview_id', 'question_index')}
+        g.log_token = _context.set({**fields, 'method': request.endpoint})
+
+    @app.after_request
+    def log_request(response):
+        if log_requests and request.path.startswith('/api/'):
+            logger.info("request", extra={
+                'route': request.url_rule.rule if request.url_rule else request.path,
+                'http_method': request.method,
+                'status': response.status_code,
+                'duration_ms': round((time.monotonic() - g.get('log_started', time.monotonic())) * 1000, 1)
+            })
+        return response
+
+    @app.teardown_request
+    def end_request_context(exc):
+        token = g.pop('log_token', None)
+        if token is not None:
+            try:
+                _context.reset(token)
+            except ValueError:
+                # Set in another context, e.g. by a streamed response's generator
+                pass
@@ -0,0 +1,182 @@
+import re
+import json
+from collections import namedtuple
+
+# One expected field of a JSON object returned by the model.
+# kind is 'text' or 'list'; choices are canonical spellings for 'text' values.
+# A required field has no default: a reply without it is treated as unusable.
+Field = namedtuple('Field', ['kind', 'default', 'choices', 'required'])
+Field.__new__.__defaults__ = (None, False)
+
+EVALUATION_SCHEMA = {
+    "skills_demonstrated": Field('list', []),
+    "strengths": Field('list', []),
+    "weaknesses": Field('list', []),
+    "overall_assessment": Field('text', None, ("Strong", "Moderate", "Needs Development"), True),
+    "justification": Field('text', "")
+}
+
+OVERALL_SUMMARY_SCHEMA = {
+    "overall_assessment": Field('text', None, ("Strong", "Moderate", "Needs Development"), True),
+    "key_insights": Field('list', []),
+    "recommendations": Field('list', []),
+    "strengths": Field('list', []),
+    "areas_for_improvement": Field('list', []),
+    "final_recommendation": Field('text', None, ("Proceed", "Reject", "Further evaluation"), True)
+}
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def _scan(text, start):
+    """Scan a JSON value starting at text[start].
+
+    Returns (end, stack, in_string): end is the index after the value if it closed,
+    otherwise None with the still-open brackets and whether a string was left open.
+    """
+    stack = []
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+        elif char in '}]':
+            if stack and _CLOSERS[stack[-1]] == char:
+                stack.pop()
+                if not stack:
+                    return index + 1, [], False
+    return None, stack, in_string
+
+
+def _drop_trailing_key(fragment):
+    """Remove an object key left without a value at the end of a fragment."""
+    key_start = fragment.rfind('"', 0, len(fragment) - 1)
+    before = fragment[:key_start].rstrip()
+    if key_start != -1 and before.endswith((',', '{')):
+        return before
+    return fragment
+
+
+def _repair_truncated(fragment, stack, in_string):
+    """Close a JSON value cut off mid-way, dropping the incomplete last member."""
+    if in_string:
+        fragment += '"'
+    fragment = fragment.rstrip()
+    if fragment.endswith(':'):
+        fragment = _drop_trailing_key(fragment[:-1].rstrip())
+    elif stack[-1] == '{' and fragment.endswith('"'):
+        fragment = _drop_trailing_key(fragment)
+    fragment = fragment.rstrip().rstrip(',')
+    return fragment + ''.join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def iter_json_objects(text):
+    """Yield each JSON object found in a model response, in order.
+
+    Tolerates code fences, prose before, between or after objects, trailing commas and
+    a final object truncated by max_tokens.
+    """
+    if not text:
+        return
+
+    fenced = _FENCE.search(text)
+    candidates = [fenced.group(1), text] if fenced else [text]
+    for candidate in candidates:
+        start = candidate.find('{')
+        while start != -1:
+            end, stack, in_string = _scan(candidate, start)
+            if end is not None:
+                fragment = candidate[start:end]
+            else:
+                fragment = _repair_truncated(candidate[start:], stack, in_string)
+            try:
+                value = json.loads(_TRAILING_COMMA.sub(r"\1", fragment))
+            except ValueError:
+                value = None
+            if isinstance(value, dict):
+                yield value
+            if end is None:
+                break
+            start = candidate.find('{', end)
+
+
+def extract_json(text):
+    """Return the first JSON object in a model response, or None if there is none."""
+    return next(iter_json_objects(text), None)
+
+
+def _coerce_list(value):
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return [str(item).strip() for item in value if item is not None and str(item).strip()]
+    if isinstance(value, str):
+        parts = re.split(r"\s*(?:\n|;|•)\s*", value.strip())
+        return [part.lstrip('-* ').strip() for part in parts if part.lstrip('-* ').strip()]
+    if value is None:
+        return None
+    return [str(value)]
+
+
+def _coerce_text(value, choices):
+    if isinstance(value, list):
+        value = "; ".join(str(item) for item in value)
+    elif value is not None and not isinstance(value, str):
+        value = str(value)
+    if not value:
+        return None
+    value = value.strip()
+    if choices:
+        for choice in choices:
+            if value.lower() == choice.lower():
+                return choice
+    return value
+
+
+def validate(value, schema):
+    """Coerce a parsed object to the schema.
+
+    Missing or empty fields get the schema default, strings become lists and lists
+    become strings where needed, and known values are normalised to their canonical
+    spelling. Returns None when none of the schema's fields are present at all, or
+    when a required field is missing, so a made-up verdict is never reported.
+    """
+    if not isinstance(value, dict):
+        return None
+    # Keys are matched case- and separator-insensitively ("Overall Assessment")
+    normalised = {re.sub(r"[\s\-]+", "_", str(key).strip().lower()): item for key, item in value.items()}
+    if not any(name in normalised for name in schema):
+        return None
+
+    result = {}
+    for name, field in schema.items():
+        raw = normalised.get(name)
+        coerced = _coerce_list(raw) if field.kind == 'list' else _coerce_text(raw, field.choices)
+        if field.required and not coerced:
+            return None
+        result[name] = coerced if coerced else (list(field.default) if field.kind == 'list' else field.default)
+    return result
+
+
+def parse_structured(text, schema):
+    """Return the first JSON object in model output that fits the schema, coerced to it.
+
+    Returns None when the output is unrecoverable.
+    """
+    for value in iter_json_objects(text):
+        result = validate(value, schema)
+        if result is not None:
+            return result
+    return None
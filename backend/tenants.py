@@ -0,0 +1,188 @@
+import os
+import hmac
+import logging
+import json
+import threading
+from contextlib import contextmanager
+from collections import namedtuple, OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = 'default'
+
+# Settings of one hiring company. The default tenant is configured from the environment
+# (OPENAI_API_KEY, COMPANY_NAME, OPENAI_MODEL, ...), other tenants come from TENANTS_FILE
+# and inherit any setting they leave out. `hosts` and `access_key` decide which requests
+# belong to the tenant; they are never inherited.
+TenantConfig = namedtuple('TenantConfig', [
+    'tenant_id', 'company_name', 'api_key', 'openai_model', 'whisper_model', 'max_concurrency', 'max_connections',
+    'model_tiers', 'hosts', 'access_key'
+])
+
+
+def default_tenant_config():
+    openai_model = os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')
+    # Models for routing, cheapest first; by default just OPENAI_MODEL
+    model_tiers = tuple(model.strip() for model in os.getenv('MODEL_TIERS', '').split(',') if model.strip())
+    return TenantConfig(
+        tenant_id=DEFAULT_TENANT,
+        company_name=os.getenv('COMPANY_NAME', 'TechCorp'),
+        api_key=os.getenv('OPENAI_API_KEY'),
+        openai_model=openai_model,
+        whisper_model=os.getenv('WHISPER_MODEL', 'whisper-1'),
+        max_concurrency=int(os.getenv('TENANT_MAX_CONCURRENCY', '8')),
+        max_connections=int(os.getenv('TENANT_MAX_CONNECTIONS', '20')),
+        model_tiers=model_tiers or (openai_model,),
+        hosts=(),
+        access_key=None
+    )
+
+
+def load_tenant_configs(path=None):
+    """Read tenant settings from TENANTS_FILE, a JSON object keyed by tenant id.
+
+    API keys are referenced by environment variable name (`api_key_env`, and
+    `access_key_env` for the key clients authenticate with) so the file itself holds no
+    secrets. `hosts` lists the host names served as the tenant. A missing file means only
+    the default tenant exists.
+    """
+    path = path or os.getenv('TENANTS_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tenants.json'))
+    default = default_tenant_config()
+    configs = {DEFAULT_TENANT: default}
+    if not os.path.exists(path):
+        return configs
+
+    try:
+        with open(path) as f:
+            tenants = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error("Error reading tenants file %s: %s", path, e)
+        return configs
+
+    for tenant_id, settings in tenants.items():
+        api_key_env = settings.get('api_key_env')
+        access_key_env = settings.get('access_key_env')
+        settings = dict(settings)
+        if 'model_tiers' in settings:
+            settings['model_tiers'] = tuple(settings['model_tiers'])
+        elif 'openai_model' in settings:
+            settings['model_tiers'] = (settings['openai_model'],)
+        configs[tenant_id] = default._replace(
+            tenant_id=tenant_id,
+            api_key=os.getenv(api_key_env) if api_key_env else default.api_key,
+            hosts=tuple(host.lower() for host in settings.get('hosts', ())),
+            access_key=os.getenv(access_key_env) if access_key_env else None,
+            **{field: settings[field] for field in TenantConfig._fields
+               if field not in ('tenant_id', 'api_key', 'hosts', 'access_key') and field in settings}
+        )
+    return configs
+
+
+class TenantRegistry:
+    """Lazily created per-tenant services, least recently used evicted first.
+
+    Each tenant's service is built on its first request and dropped once more than
+    TENANT_CACHE_SIZE other tenants have been used since, so idle tenants hold no clients
+    or caches. The default tenant is never evicted. Evicted services are closed once
+    their calls in flight finish and every lease on them has ended, so work that outlives
+    a request (analysis jobs, live transcription) takes a lease instead of keeping the
+    service from get(). Unknown tenant ids resolve to the default tenant, so requests
+    cannot create unbounded instances.
+    """
+
+    def __init__(self, factory, configs=None, max_tenants=None):
+        self.factory = factory
+        self.configs = configs if configs is not None else load_tenant_configs()
+        self.max_tenants = max_tenants or int(os.getenv('TENANT_CACHE_SIZE', '32'))
+        self._lock = threading.Lock()
+        self._services = OrderedDict()
+        self._hosts = {host: tenant_id for tenant_id, config in self.configs.items() for host in config.hosts}
+
+    def resolve(self, tenant_id):
+        return tenant_id if tenant_id in self.configs else DEFAULT_TENANT
+
+    def authenticate(self, host=None, access_key=None):
+        """Tenant a request belongs to: the one whose access key it presents, else the one
+        serving its host name, else the default tenant.
+
+        Client-supplied tenant ids are never trusted, so a candidate cannot run on another
+        company's API key, quota or branding.
+        """
+        if access_key:
+            for tenant_id, config in self.configs.items():
+                if config.access_key and hmac.compare_digest(config.access_key.encode(), access_key.encode()):
+                    return tenant_id
+        if host:
+            return self._hosts.get(host.split(':')[0].lower(), DEFAULT_TENANT)
+        return DEFAULT_TENANT
+
+    @staticmethod
+    def _close(service):
+        close = getattr(service, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                logger.error("Error closing tenant service: %s", e)
+
+    @staticmethod
+    def _retain(service):
+        retain = getattr(service, 'retain', None)
+        if retain is not None:
+            retain()
+
+    @staticmethod
+    def _release(service):
+        release = getattr(service, 'release', None)
+        if release is not None:
+            release()
+
+    def get(self, tenant_id=None, retain=False):
+        """The tenant's service; with `retain` it stays open until release() even if evicted."""
+        tenant_id = self.resolve(tenant_id)
+        with self._lock:
+            service = self._services.get(tenant_id)
+            if service is not None:
+                self._services.move_to_end(tenant_id)
+                if retain:
+                    self._retain(service)
+                return service
+
+        # Built outside the lock, creating a client must not stall other tenants
+        service = self.factory(self.configs[tenant_id])
+
+        discarded = []
+        with self._lock:
+            # Another request may have created it meanwhile; keep the first one
+            existing = self._services.setdefault(tenant_id, service)
+            if existing is not service:
+                discarded.append(service)
+                service = existing
+            self._services.move_to_end(tenant_id)
+            if retain:
+                # Taken under the lock, before any eviction can close it
+                self._retain(service)
+            while len(self._services) > self.max_tenants:
+                # The default tenant and the one being returned are never evicted
+                oldest = next((other for other in self._services if other not in (DEFAULT_TENANT, tenant_id)), None)
+                if oldest is None:
+                    break
+                discarded.append(self._services.pop(oldest))
+        # Closed outside the lock, closing clients must not stall other tenants
+        for unused in discarded:
+            self._close(unused)
+        return service
+
+    @contextmanager
+    def lease(self, tenant_id=None):
+        """The tenant's service, kept open until the block exits even if it is evicted meanwhile."""
+        service = self.get(tenant_id, retain=True)
+        try:
+            yield service
+        finally:
+            self._release(service)
+
+    def services(self):
+        """The services created so far, default tenant included once used."""
+        with self._lock:
+            return list(self._services.values())
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Backend modules import each other by bare name, as they do when run from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the tests independent of any cache snapshot left on the machine
+os.environ.pop('CACHE_SNAPSHOT_FILE', None)
@@ -0,0 +1,87 @@
+from question_index import QuestionDiversityIndex
+
+ROLE = "Software Engineer"
+
+
+def make_index(**kwargs):
+    kwargs.setdefault("threshold", 0.6)
+    kwargs.setdefault("history_size", 50)
+    return QuestionDiversityIndex(**kwargs)
+
+
+def test_detects_rephrased_question():
+    index = make_index()
+    index.add(ROLE, "Tell me about a time you debugged a production outage.")
+    assert index.is_near_duplicate(ROLE, "Describe a time when you debugged a production outage?")
+    assert not index.is_near_duplicate(ROLE, "How do you approach designing a public REST API?")
+
+
+def test_history_is_per_role():
+    index = make_index()
+    index.add(ROLE, "How do you review pull requests from junior engineers?")
+    assert not index.is_near_duplicate("Data Scientist", "How do you review pull requests from junior engineers?")
+
+
+def test_history_is_bounded():
+    index = make_index(history_size=2)
+    index.add(ROLE, "How do you handle database schema migrations safely?")
+    index.add(ROLE, "What is your approach to writing integration tests?")
+    index.add(ROLE, "How would you scale a websocket notification service?")
+    assert not index.is_near_duplicate(ROLE, "How do you handle database schema migrations safely?")
+    assert index.is_near_duplicate(ROLE, "How would you scale a websocket notification service?")
+
+
+def test_select_skips_duplicates_within_a_set():
+    index = make_index()
+    questions = index.select(ROLE, [
+        "How do you handle database schema migrations safely?",
+        "How do you handle database schema migrations safely in production?",
+        "What is your approach to writing integration tests?"
+    ], 2)
+    assert questions == [
+        "How do you handle database schema migrations safely?",
+        "What is your approach to writing integration tests?"
+    ]
+
+
+def test_select_prefers_fresh_questions_and_pads_with_fallback():
+    index = make_index()
+    index.add(ROLE, "How do you handle database schema migrations safely?")
+    questions = index.select(
+        ROLE,
+        ["How do you handle database schema migrations safely?"],
+        2,
+        fallback=["What is your approach to writing integration tests?"]
+    )
+    # The recent repeat is held back until nothing fresher is left
+    assert questions == [
+        "What is your approach to writing integration tests?",
+        "How do you handle database schema migrations safely?"
+    ]
+
+
+def test_selector_stops_when_full():
+    index = make_index()
+    selector = index.selector(ROLE, 1)
+    assert selector.offer("How do you handle database schema migrations safely?")
+    assert selector.full
+    assert not selector.offer("What is your approach to writing integration tests?")
+    assert selector.questions == ["How do you handle database schema migrations safely?"]
+
+
+def test_forget_removes_unserved_question():
+    index = make_index()
+    index.add(ROLE, "How do you handle database schema migrations safely?")
+    index.add(ROLE, "What is your approach to writing integration tests?")
+    index.forget(ROLE, ["How do you handle database schema migrations safely?"])
+    assert not index.is_near_duplicate(ROLE, "How do you handle database schema migrations safely?")
+    assert index.is_near_duplicate(ROLE, "What is your approach to writing integration tests?")
+
+
+def test_selector_records_history_only_on_commit():
+    index = make_index()
+    selector = index.selector(ROLE, 2)
+    assert selector.offer("How do you handle database schema migrations safely?")
+    assert not index.is_near_duplicate(ROLE, "How do you handle database schema migrations safely?")
+    selector.commit()
+    assert index.is_near_duplicate(ROLE, "How do you handle database schema migrations safely?")
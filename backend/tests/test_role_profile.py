@@ -0,0 +1,70 @@
+from role_profile import compile_role_profile, role_profile_text
+
+
+def test_seniority_from_title():
+    assert compile_role_profile("Senior Backend Engineer", "").seniority == "Senior"
+    assert compile_role_profile("Staff Engineer", "").seniority == "Staff/Principal"
+    assert compile_role_profile("Engineering Lead", "").seniority == "Lead"
+    assert compile_role_profile("Software Engineering Intern", "").seniority == "Intern"
+
+
+def test_title_only_words_are_ignored_in_description():
+    profile = compile_role_profile("Backend Engineer", "You will lead the design of our staff scheduling tools.")
+    assert profile.seniority == "Not specified"
+    profile = compile_role_profile("Senior Data Scientist", "A graduate degree in statistics is required.")
+    assert profile.seniority == "Senior"
+    profile = compile_role_profile("Data Scientist", "A graduate degree in statistics is required.")
+    assert profile.seniority == "Not specified"
+    assert compile_role_profile("Graduate Software Engineer", "").seniority == "Junior"
+
+
+def test_seniority_from_years_of_experience():
+    assert compile_role_profile("Backend Engineer", "5+ years of experience building APIs.").seniority == "Senior"
+    assert compile_role_profile("Backend Engineer", "2-3 years of professional experience.").seniority == "Mid-level"
+
+
+def test_named_skills_match_case_sensitively():
+    profile = compile_role_profile(
+        "Backend Engineer",
+        "Build Python services on AWS with Docker. Get some rest and go home on time."
+    )
+    assert profile.key_skills == ("Python", "AWS", "Docker")
+
+
+def test_skill_lists_outside_the_vocabulary():
+    profile = compile_role_profile("Data Engineer", "Experience with dbt, Snowflake and Looker.")
+    assert profile.key_skills == ("dbt", "Snowflake", "Looker")
+
+
+def test_must_haves_under_requirements_heading():
+    description = (
+        "We build payment infrastructure.\n"
+        "Requirements:\n"
+        "- Production experience with Kafka\n"
+        "- Comfortable on call\n"
+        "Nice to have:\n"
+        "- Rust"
+    )
+    profile = compile_role_profile("Backend Engineer", description)
+    assert profile.must_haves == ("Production experience with Kafka", "Comfortable on call")
+
+
+def test_must_have_sentences_are_capped():
+    description = "You must know SQL. Python is required. At least 3 years in data. Must be able to travel."
+    assert len(compile_role_profile("Analyst", description).must_haves) == 3
+
+
+def test_focus_only_when_nothing_else_extracted():
+    profile = compile_role_profile("Office Manager", "Keep our office running smoothly. Order supplies.")
+    assert profile.focus == "Keep our office running smoothly."
+    assert compile_role_profile("Backend Engineer", "Build Python services.").focus == ""
+
+
+def test_profile_text():
+    profile = compile_role_profile("Senior Backend Engineer", "Must have Python.")
+    assert role_profile_text(profile) == (
+        "Role: Senior Backend Engineer (seniority: Senior)\n"
+        "Key skills: Python\n"
+        "Must-haves: Must have Python."
+    )
+    assert role_profile_text(compile_role_profile("", "")) == "Role: Not specified (seniority: Not specified)"
@@ -0,0 +1,98 @@
+from structured_output import (
+    EVALUATION_SCHEMA, OVERALL_SUMMARY_SCHEMA, extract_json, iter_json_objects, parse_structured, validate
+)
+
+EVALUATION = (
+    '{"skills_demonstrated": ["Python"], "strengths": ["Clear"], "weaknesses": ["Brief"], '
+    '"overall_assessment": "Strong", "justification": "Good answer"}'
+)
+
+
+def test_plain_object():
+    assert extract_json(EVALUATION)["overall_assessment"] == "Strong"
+
+
+def test_code_fence():
+    text = f"```json\n{EVALUATION}\n```"
+    assert parse_structured(text, EVALUATION_SCHEMA)["skills_demonstrated"] == ["Python"]
+
+
+def test_unclosed_code_fence():
+    text = f"```json\n{EVALUATION}"
+    assert parse_structured(text, EVALUATION_SCHEMA)["justification"] == "Good answer"
+
+
+def test_prose_around_object():
+    text = f"Here is the evaluation you asked for:\n{EVALUATION}\nLet me know if you need more."
+    assert parse_structured(text, EVALUATION_SCHEMA)["strengths"] == ["Clear"]
+
+
+def test_braces_inside_strings():
+    text = '{"justification": "Used {curly} braces and a \\"quote\\"", "overall_assessment": "Moderate"}'
+    assert extract_json(text)["justification"] == 'Used {curly} braces and a "quote"'
+
+
+def test_trailing_commas():
+    text = '{"strengths": ["Clear", "Concise",], "overall_assessment": "Strong",}'
+    assert extract_json(text) == {"strengths": ["Clear", "Concise"], "overall_assessment": "Strong"}
+
+
+def test_truncated_inside_string():
+    text = '{"overall_assessment": "Strong", "strengths": ["Clear", "Conc'
+    assert extract_json(text) == {"overall_assessment": "Strong", "strengths": ["Clear", "Conc"]}
+
+
+def test_truncated_after_key():
+    text = '{"overall_assessment": "Strong", "justification":'
+    assert extract_json(text) == {"overall_assessment": "Strong"}
+
+
+def test_truncated_mid_key():
+    text = '{"overall_assessment": "Strong", "justif'
+    assert extract_json(text) == {"overall_assessment": "Strong"}
+
+
+def test_multiple_objects_in_order():
+    text = '{"a": 1} and then {"b": 2}'
+    assert list(iter_json_objects(text)) == [{"a": 1}, {"b": 2}]
+
+
+def test_unrecoverable_output():
+    assert parse_structured("I cannot evaluate this answer.", EVALUATION_SCHEMA) is None
+    assert parse_structured("", EVALUATION_SCHEMA) is None
+
+
+def test_skips_objects_outside_the_schema():
+    text = '{"note": "draft"} ' + EVALUATION
+    assert parse_structured(text, EVALUATION_SCHEMA)["overall_assessment"] == "Strong"
+
+
+def test_coercion_and_canonical_spelling():
+    value = {
+        "Overall Assessment": "needs development",
+        "skills-demonstrated": "Python; SQL\n- Docker",
+        "strengths": {"first": "Clear"},
+        "justification": ["Short", "but relevant"]
+    }
+    result = validate(value, EVALUATION_SCHEMA)
+    assert result["overall_assessment"] == "Needs Development"
+    assert result["skills_demonstrated"] == ["Python", "SQL", "Docker"]
+    assert result["strengths"] == ["Clear"]
+    assert result["weaknesses"] == []
+    assert result["justification"] == "Short; but relevant"
+
+
+def test_missing_verdict_is_not_invented():
+    # A truncated reply that lost its verdict must be retried, not reported as "Moderate"
+    text = '{"skills_demonstrated": ["Python"], "strengths": ["Clear"], "weaknesses": ["Brief"], "overall_ass'
+    assert parse_structured(text, EVALUATION_SCHEMA) is None
+    assert validate({"strengths": ["Clear"], "overall_assessment": ""}, EVALUATION_SCHEMA) is None
+
+
+def test_summary_requires_both_verdicts():
+    summary = {"overall_assessment": "Strong", "key_insights": ["Solid"]}
+    assert validate(summary, OVERALL_SUMMARY_SCHEMA) is None
+    summary["final_recommendation"] = "proceed"
+    result = validate(summary, OVERALL_SUMMARY_SCHEMA)
+    assert result["final_recommendation"] == "Proceed"
+    assert result["recommendations"] == []
@@ -0,0 +1,45 @@
+from tenants import TenantRegistry, DEFAULT_TENANT, default_tenant_config
+
+
+class FakeService:
+    def __init__(self, config):
+        self.tenant_id = config.tenant_id
+        self.holders = 0
+        self.closing = False
+        self.closed = False
+
+    def retain(self):
+        self.holders += 1
+
+    def release(self):
+        self.holders -= 1
+        if self.closing and not self.holders:
+            self.closed = True
+
+    def close(self):
+        self.closing = True
+        if not self.holders:
+            self.closed = True
+
+
+def make_registry(max_tenants):
+    default = default_tenant_config()
+    configs = {tenant_id: default._replace(tenant_id=tenant_id) for tenant_id in (DEFAULT_TENANT, "acme", "globex")}
+    return TenantRegistry(FakeService, configs, max_tenants)
+
+
+def test_never_returns_an_evicted_service():
+    registry = make_registry(1)
+    registry.get()
+    acme = registry.get("acme")
+    assert not acme.closed
+    assert registry.get("acme") is acme
+
+
+def test_leased_service_closes_when_the_lease_ends():
+    registry = make_registry(2)
+    registry.get()
+    with registry.lease("acme") as acme:
+        registry.get("globex")
+        assert acme.closing and not acme.closed
+    assert acme.closed
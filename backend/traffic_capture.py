@@ -0,0 +1,99 @@
+import os
+import hmac
+import json
+import time
+import queue
+import hashlib
+import threading
+
+# Path parameters that identify people or sessions and are replaced by stable tokens
+ANONYMIZED_ARGS = {'interview_id': 'i', 'ticket_id': 't', 'profile_id': 'p'}
+
+
+class TrafficCapture:
+    """Records the timing and shape of API requests to a JSONL trace for replay.
+
+    Enabled by TRAFFIC_CAPTURE_FILE. Each line holds the request's offset from the
+    start of the capture, method, route, path arguments, query and JSON field names,
+    body size, status and handler duration (for streamed responses, until the stream
+    starts). Ids in path arguments are replaced by a keyed hash such as "i-3f9c2a71d0",
+    stable within the capture; the key is random per process and never written, so the
+    tokens cannot be traced back to ids. No values from bodies or query strings are
+    written. Records go through a bounded queue to a writer thread and are dropped
+    rather than slowing requests when the queue is full.
+    """
+
+    def __init__(self, path=None, max_queue=None):
+        self.path = path if path is not None else os.getenv('TRAFFIC_CAPTURE_FILE')
+        self.max_queue = max_queue or int(os.getenv('TRAFFIC_CAPTURE_QUEUE', '10000'))
+        self._queue = queue.Queue(self.max_queue)
+        self._token_key = os.urandom(16)
+        self._started_at = None
+        self.dropped = 0
+
+    @property
+    def enabled(self):
+        return bool(self.path)
+
+    def token(self, kind, value):
+        """Stable anonymous token for an id seen during this capture."""
+        digest = hmac.new(self._token_key, f"{kind}:{value}".encode('utf-8'), hashlib.sha256).hexdigest()
+        return f"{ANONYMIZED_ARGS[kind]}-{digest[:10]}"
+
+    def record(self, entry):
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        with open(self.path, 'a') as f:
+            while True:
+                entry = self._queue.get()
+                f.write(json.dumps(entry) + "\n")
+                if self._queue.empty():
+                    f.flush()
+
+    def init_app(self, app):
+        """Install request hooks that capture every API request, if capture is enabled."""
+        if not self.enabled:
+            return
+        from flask import g, request
+
+        self._started_at = time.time()
+        thread = threading.Thread(target=self._write_loop, name='traffic-capture')
+        thread.daemon = True
+        thread.start()
+
+        @app.before_request
+        def start_capture():
+            g.capture_started = time.time()
+
+        @app.after_request
+        def capture_request(response):
+            if request.url_rule is None or not request.path.startswith('/api/'):
+                return response
+            started = g.get('capture_started', time.time())
+            args = {}
+            for name, value in (request.view_args or {}).items():
+                args[name] = self.token(name, value) if name in ANONYMIZED_ARGS else value
+            data = request.get_json(silent=True) if request.is_json else None
+            entry = {
+                "t": round(started - self._started_at, 4),
+                "method": request.method,
+                "route": request.url_rule.rule,
+                "args": args,
+                "query": sorted(request.args.keys()),
+                "json_keys": sorted(data.keys()) if isinstance(data, dict) else [],
+                "body_bytes": request.content_length or 0,
+                "status": response.status_code,
+                "duration_ms": round((time.time() - started) * 1000, 2)
+            }
+            # Lets the replay tool map later requests to the interview this one created
+            if g.get('created_interview_id'):
+                entry["creates"] = self.token('interview_id', g.created_interview_id)
+            self.record(entry)
+            return response
+
+# Create a global instance
+traffic_capture = TrafficCapture()
@@ -0,0 +1,205 @@
+import os
+import logging
+import queue
+import threading
+import multiprocessing
+import importlib.util
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionEngine(ABC):
+    """Speech-to-text backend used by AIService.transcribe_video.
+
+    Implementations return the transcript text and raise on failure; AIService turns
+    failures into its usual [TRANSCRIPTION_ERROR] marker.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def transcribe(self, audio_path, prompt=None):
+        """Return the transcript of an audio or video file."""
+
+
+class OpenAIWhisperEngine(TranscriptionEngine):
+    """Hosted Whisper through the OpenAI audio API."""
+
+    name = "openai"
+
+    def __init__(self, client, model):
+        self.client = client
+        self.model = model
+
+    def transcribe(self, audio_path, prompt=None):
+        options = {"prompt": prompt} if prompt else {}
+        with open(audio_path, "rb") as audio_file:
+            transcript = self.client.audio.transcriptions.create(
+                model=self.model,
+                file=audio_file,
+                response_format="text",
+                language="en",  # Specify language for faster processing
+                **options
+            )
+        return transcript
+
+
+# Model loaded once per worker process by _init_local_worker
+_worker_model = None
+
+
+def _init_local_worker(model_size, compute_type):
+    global _worker_model
+    from faster_whisper import WhisperModel
+    # One thread per process, parallelism comes from the pool
+    _worker_model = WhisperModel(model_size, device="cpu", compute_type=compute_type, cpu_threads=1)
+
+
+def _transcribe_local_batch(items):
+    """Transcribe a batch of (path, prompt) pairs inside a worker process."""
+    results = []
+    for audio_path, prompt in items:
+        try:
+            segments, _ = _worker_model.transcribe(
+                audio_path, language="en", initial_prompt=prompt, beam_size=1, vad_filter=True
+            )
+            results.append((True, " ".join(segment.text.strip() for segment in segments)))
+        except Exception as e:
+            results.append((False, str(e)))
+    return results
+
+
+class LocalWhisperEngine(TranscriptionEngine):
+    """CPU transcription with an int8-quantized Whisper model (faster-whisper).
+
+    Requests are queued and a dispatcher thread hands them to the worker processes, at
+    most one batch per worker in flight. While a worker is idle each request goes out on
+    its own; only once every worker is busy are the requests that queued up meanwhile
+    sent together, up to `batch_size`, so load grows batches instead of oversubscribing
+    the cores. Each worker process loads the model once. If a worker dies (killed, out of
+    memory) the batch it was running fails and the next batch starts a fresh pool.
+    """
+
+    name = "local"
+
+    def __init__(self, model_size=None, compute_type=None, workers=None, batch_size=None):
+        self.model_size = model_size or os.getenv('LOCAL_WHISPER_MODEL', 'base.en')
+        self.compute_type = compute_type or os.getenv('LOCAL_WHISPER_COMPUTE_TYPE', 'int8')
+        self.workers = workers or int(os.getenv('LOCAL_WHISPER_WORKERS', '0')) or os.cpu_count() or 1
+        self.batch_size = batch_size or int(os.getenv('LOCAL_WHISPER_BATCH_SIZE', '4'))
+
+        self._queue = queue.Queue()
+        self._slots = threading.Semaphore(self.workers)
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._pool = None
+        self._dispatcher = None
+
+    def _start(self):
+        # The dispatcher and the pool are created on first use so importing the app stays cheap
+        with self._lock:
+            if self._dispatcher is not None:
+                return
+            self._dispatcher = threading.Thread(target=self._dispatch)
+            self._dispatcher.daemon = True
+            self._dispatcher.start()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # Spawned, not forked: forking copies the parent's threads' locks in whatever state they are in
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_local_worker,
+                    initargs=(self.model_size, self.compute_type)
+                )
+            return self._pool
+
+    def _discard_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def _dispatch(self):
+        while True:
+            batch = [self._queue.get()]
+            self._slots.acquire()
+            with self._lock:
+                self._busy += 1
+                all_busy = self._busy == self.workers
+            # Requests that queued while every worker was busy share this one
+            while all_busy and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            pool = self._get_pool()
+            try:
+                pool_future = pool.submit(_transcribe_local_batch, [(path, prompt) for path, prompt, _ in batch])
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    self._discard_pool(pool)
+                self._release()
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            pool_future.add_done_callback(lambda f, batch=batch, pool=pool: self._resolve(f, batch, pool))
+
+    def _release(self):
+        with self._lock:
+            self._busy -= 1
+        self._slots.release()
+
+    def _resolve(self, pool_future, batch, pool):
+        self._release()
+        try:
+            results = pool_future.result()
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self._discard_pool(pool)
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, _, future), (ok, value) in zip(batch, results):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(RuntimeError(value))
+
+    def transcribe(self, audio_path, prompt=None):
+        self._start()
+        future = Future()
+        self._queue.put((audio_path, prompt, future))
+        return future.result()
+
+
+# One local engine per process; its worker pool is shared by every tenant's AIService
+_local_engine = None
+_local_engine_lock = threading.Lock()
+
+
+def create_transcription_engine(client, whisper_model):
+    """Build the engine selected by TRANSCRIPTION_ENGINE ("openai" or "local").
+
+    Returns None when no engine is usable, in which case AIService stays in demo mode.
+    """
+    global _local_engine
+    engine_name = os.getenv('TRANSCRIPTION_ENGINE', 'openai').lower()
+
+    if engine_name == 'local':
+        if importlib.util.find_spec('faster_whisper') is not None:
+            with _local_engine_lock:
+                if _local_engine is None:
+                    _local_engine = LocalWhisperEngine()
+                return _local_engine
+        logger.warning("TRANSCRIPTION_ENGINE=local requires faster-whisper. Falling back to OpenAI Whisper.")
+
+    if client is not None:
+        return OpenAIWhisperEngine(client, whisper_model)
+    return None
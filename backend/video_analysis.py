@@ -0,0 +1,193 @@
+import os
+import logging
+import shutil
+import threading
+import subprocess
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from analysis_jobs import video_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Optional vectorized frame statistics, video analysis is skipped without numpy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Keyframes are decoded straight to small grayscale images
+FRAME_WIDTH = 320
+FRAME_HEIGHT = 240
+MIN_KEYFRAMES = 3
+
+# Loaded once per worker process by _face_detector, when OpenCV is installed
+_face_cascade = None
+
+
+def _face_detector():
+    global _face_cascade
+    if _face_cascade is None:
+        try:
+            import cv2
+            _face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        except ImportError:
+            _face_cascade = False
+    return _face_cascade or None
+
+
+def _decode_frames(video_path, max_frames, keyframes_only):
+    """Decode up to max_frames grayscale frames with ffmpeg.
+
+    With keyframes_only the decoder skips every non-key frame, which is what keeps this
+    cheap; otherwise one frame every two seconds is sampled.
+    """
+    command = ['ffmpeg', '-v', 'error']
+    if keyframes_only:
+        command += ['-skip_frame', 'nokey']
+    command += ['-i', video_path, '-an']
+    scale = f"scale={FRAME_WIDTH}:{FRAME_HEIGHT}"
+    command += ['-vf', scale if keyframes_only else f"fps=1/2,{scale}", '-vsync', 'vfr']
+    command += ['-frames:v', str(max_frames), '-f', 'rawvideo', '-pix_fmt', 'gray', '-']
+
+    output = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=120).stdout
+    frame_size = FRAME_WIDTH * FRAME_HEIGHT
+    count = len(output) // frame_size
+    return np.frombuffer(output[:count * frame_size], dtype=np.uint8).reshape(count, FRAME_HEIGHT, FRAME_WIDTH)
+
+
+def _analyze_keyframes(video_path, max_frames):
+    """Engagement metrics from sampled frames; runs inside a worker process."""
+    frames = _decode_frames(video_path, max_frames, keyframes_only=True)
+    if len(frames) < MIN_KEYFRAMES:
+        # Some recorders write very few keyframes, sample by time instead
+        frames = _decode_frames(video_path, max_frames, keyframes_only=False)
+    if not len(frames):
+        return None
+
+    brightness = frames.mean(axis=(1, 2))
+    contrast = frames.std(axis=(1, 2))
+    # A covered or disabled camera produces near-uniform dark frames
+    camera_on = (brightness > 15) & (contrast > 8)
+    well_lit = camera_on & (brightness > 60) & (brightness < 200) & (contrast > 25)
+
+    metrics = {
+        "frames_sampled": int(len(frames)),
+        "camera_presence_ratio": round(float(camera_on.mean()), 2),
+        "face_in_frame_ratio": None,
+        "well_lit_ratio": round(float(well_lit.sum() / camera_on.sum()), 2) if camera_on.any() else 0.0,
+        "mean_brightness": round(float(brightness[camera_on].mean()), 1) if camera_on.any() else 0.0,
+        "movement": round(float(np.abs(np.diff(frames.astype(np.int16), axis=0)).mean() / 255), 3) if len(frames) > 1 else 0.0
+    }
+
+    mean_brightness = metrics["mean_brightness"]
+    if not camera_on.any():
+        metrics["lighting"] = "no video"
+    elif mean_brightness <= 60:
+        metrics["lighting"] = "dark"
+    elif mean_brightness >= 200:
+        metrics["lighting"] = "overexposed"
+    elif metrics["well_lit_ratio"] < 0.5:
+        metrics["lighting"] = "low contrast"
+    else:
+        metrics["lighting"] = "good"
+
+    detector = _face_detector()
+    if detector is not None and camera_on.any():
+        faces = [len(detector.detectMultiScale(frame, scaleFactor=1.2, minNeighbors=4, minSize=(40, 40))) > 0
+                 for frame in frames[camera_on]]
+        metrics["face_in_frame_ratio"] = round(sum(faces) / len(frames), 2)
+    return metrics
+
+
+class VideoAnalyzer:
+    """Camera presence, face-in-frame and lighting metrics for answer videos.
+
+    Work runs on a process pool (VIDEO_ANALYSIS_WORKERS, default half the cores, leaving
+    the rest for transcription) created on first use, and only sampled keyframes are
+    decoded (at most VIDEO_ANALYSIS_MAX_FRAMES).
+    Results are cached per video fingerprint, and concurrent requests for the same video
+    share one analysis. Callers are never blocked; results arrive through a callback.
+    """
+
+    def __init__(self, workers=None, max_frames=None, cache_size=None):
+        self.workers = workers or int(os.getenv('VIDEO_ANALYSIS_WORKERS', '0')) or max(1, (os.cpu_count() or 1) // 2)
+        self.max_frames = max_frames or int(os.getenv('VIDEO_ANALYSIS_MAX_FRAMES', '30'))
+        self.cache_size = cache_size or int(os.getenv('VIDEO_ANALYSIS_CACHE_SIZE', '1000'))
+        self.enabled = os.getenv('VIDEO_ANALYSIS_ENABLED', 'true').lower() == 'true'
+
+        self._lock = threading.Lock()
+        self._pool = None
+        self._cache = OrderedDict()
+        self._pending = {}
+
+    @property
+    def available(self):
+        return self.enabled and np is not None and shutil.which('ffmpeg') is not None
+
+    def analyze_async(self, video_path, callback):
+        """Analyze a video in the background and call callback(metrics) when done.
+
+        Does nothing when analysis is unavailable or the file is missing. A failed
+        analysis calls back with None.
+        """
+        if not self.available or not video_path or not os.path.isfile(video_path):
+            return
+        key = video_fingerprint(video_path)
+
+        with self._lock:
+            metrics = self._cache.get(key)
+            if metrics is not None:
+                self._cache.move_to_end(key)
+            elif key in self._pending:
+                self._pending[key].append(callback)
+                return
+            else:
+                self._pending[key] = [callback]
+                pool = None
+                try:
+                    if self._pool is None:
+                        # Spawned, since forking a multithreaded server can deadlock the children
+                        self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                         mp_context=multiprocessing.get_context('spawn'))
+                    pool = self._pool
+                    future = pool.submit(_analyze_keyframes, video_path, self.max_frames)
+                except Exception as e:
+                    # A broken pool is replaced on the next call
+                    self._pool = None
+                    future = Future()
+                    future.set_exception(e)
+
+        if metrics is not None:
+            callback(metrics)
+            return
+        future.add_done_callback(lambda f: self._resolve(key, f, pool))
+
+    def _resolve(self, key, future, pool=None):
+        try:
+            metrics = future.result()
+        except Exception as e:
+            logger.error("Error analyzing video %s: %s", key, e)
+            metrics = None
+            if isinstance(e, BrokenProcessPool):
+                # A worker died; replace the pool now rather than failing the next video too
+                with self._lock:
+                    if self._pool is pool:
+                        self._pool = None
+
+        with self._lock:
+            callbacks = self._pending.pop(key, [])
+            if metrics is not None:
+                self._cache[key] = metrics
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        for callback in callbacks:
+            try:
+                callback(metrics)
+            except Exception as e:
+                logger.error("Error storing video analysis %s: %s", key, e)
+
+# Create a global instance
+video_analyzer = VideoAnalyzer()
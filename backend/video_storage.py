@@ -0,0 +1,334 @@
+import os
+import logging
+import json
+import time
+import shutil
+import tempfile
+import threading
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = ('.webm', '.mp4', '.mov', '.mkv')
+AUDIO_EXTENSION = '.weba'
+PREVIEW_SUFFIX = '.preview.webm'
+# Files being written by ffmpeg; moved into place once complete
+PARTIAL_SUFFIX = '.part'
+INDEX_FILENAME = '.storage_index.json'
+
+
+class VideoStorageManager:
+    """Bounded-disk lifecycle for uploaded answer videos.
+
+    Every video under the managed directories is tracked in an index with its size,
+    last access time and whether its transcription has been cached. A background
+    sweep runs incrementally: once a transcribed video is past the retention window
+    it is compacted to its audio track (when ffmpeg is available and enabled) or
+    deleted, and when the directories exceed the disk quota the least recently used
+    transcribed videos are evicted early. Videos whose transcription is not cached yet
+    are kept until VIDEO_MAX_AGE_HOURS after their last access, which also clears out
+    failed uploads, abandoned recordings and interviews that never finished. Deleted
+    videos keep a zero-size index entry holding their transcription until the transcript
+    TTL runs out.
+    """
+
+    def __init__(self, storage_dirs, retention_hours=None, quota_mb=None, keep_audio=None,
+                 sweep_interval=None, batch_size=None, grace_seconds=None, max_age_hours=None):
+        self.storage_dirs = [os.path.abspath(d) for d in storage_dirs]
+        self.retention_seconds = float(retention_hours if retention_hours is not None else os.getenv('VIDEO_RETENTION_HOURS', '24')) * 3600
+        self.max_age_seconds = float(max_age_hours if max_age_hours is not None else os.getenv('VIDEO_MAX_AGE_HOURS', '72')) * 3600
+        self.quota_bytes = int(float(quota_mb if quota_mb is not None else os.getenv('VIDEO_DISK_QUOTA_MB', '1024')) * 1024 * 1024)
+        if keep_audio is None:
+            keep_audio = os.getenv('VIDEO_KEEP_AUDIO', 'false').lower() == 'true'
+        self.keep_audio = keep_audio and shutil.which('ffmpeg') is not None
+        self.sweep_interval = float(sweep_interval if sweep_interval is not None else os.getenv('VIDEO_SWEEP_INTERVAL', '300'))
+        self.batch_size = int(batch_size if batch_size is not None else os.getenv('VIDEO_SWEEP_BATCH_SIZE', '20'))
+        # Files touched this recently may still be uploading or transcribing
+        self.grace_seconds = float(grace_seconds if grace_seconds is not None else os.getenv('VIDEO_GRACE_SECONDS', '600'))
+        self.transcript_ttl_seconds = float(os.getenv('VIDEO_TRANSCRIPT_TTL_HOURS', '168')) * 3600
+        self.previews_enabled = os.getenv('VIDEO_PREVIEW_ENABLED', 'false').lower() == 'true' and shutil.which('ffmpeg') is not None
+
+        self.index_path = os.path.join(self.storage_dirs[0], INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._dirty = False
+        self._index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = json.dumps(self._index)
+            self._dirty = False
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(self.index_path), prefix='.index-')
+            with os.fdopen(fd, 'w') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.error("Error saving video storage index: %s", e)
+
+    def _managed_path(self, path):
+        """Return the absolute path if it lives inside a managed directory, else None."""
+        if not path:
+            return None
+        path = os.path.abspath(path)
+        for root in self.storage_dirs:
+            if os.path.commonpath([root, path]) == root and path != root:
+                return path
+        return None
+
+    def resolve(self, path):
+        """Return the stored file to play back for a video path, or None if it is gone.
+
+        A video that has been compacted resolves to its audio-only sibling.
+        """
+        path = self._managed_path(path)
+        if path is None:
+            return None
+        for candidate in (path, os.path.splitext(path)[0] + AUDIO_EXTENSION):
+            if os.path.isfile(candidate):
+                return candidate
+        return None
+
+    @staticmethod
+    def preview_path(path):
+        """Return where the low-bitrate preview rendition of a video is stored."""
+        return os.path.splitext(path)[0] + PREVIEW_SUFFIX
+
+    def generate_preview(self, path):
+        """Pre-generate a low-bitrate preview rendition for scrubbing in the report."""
+        path = self._managed_path(path)
+        if not self.previews_enabled or path is None or not os.path.isfile(path) or path.endswith(PREVIEW_SUFFIX):
+            return None
+        preview_path = self.preview_path(path)
+        if os.path.exists(preview_path):
+            return preview_path
+        tmp_path = preview_path + PARTIAL_SUFFIX
+        try:
+            subprocess.run(
+                ['ffmpeg', '-y', '-loglevel', 'error', '-i', path, '-vf', 'scale=-2:360', '-r', '15',
+                 '-c:v', 'libvpx', '-b:v', '250k', '-deadline', 'realtime', '-cpu-used', '8',
+                 '-c:a', 'libopus', '-b:a', '32k', '-f', 'webm', tmp_path],
+                check=True, timeout=300
+            )
+            os.replace(tmp_path, preview_path)
+            return preview_path
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error("Error generating preview for %s: %s", path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+    def _entry(self, path, stat=None):
+        entry = self._index.get(path)
+        if entry is None:
+            if stat is None:
+                stat = os.stat(path)
+            entry = {
+                "size": stat.st_size,
+                "last_access": stat.st_mtime,
+                "transcribed": False,
+                "audio_only": path.endswith(AUDIO_EXTENSION),
+                "deleted": False,
+            }
+            self._index[path] = entry
+            self._dirty = True
+        return entry
+
+    def touch(self, path):
+        """Record an access to a stored video."""
+        path = self._managed_path(path)
+        if path is None or not os.path.exists(path):
+            return
+        with self._lock:
+            entry = self._entry(path)
+            entry["last_access"] = time.time()
+            self._dirty = True
+
+    def mark_transcribed(self, path, transcription):
+        """Record that the video's transcription is cached so it may be compacted later."""
+        path = self._managed_path(path)
+        if path is None or not os.path.exists(path):
+            return
+        with self._lock:
+            entry = self._entry(path)
+            entry["transcribed"] = True
+            entry["transcription"] = transcription
+            entry["last_access"] = time.time()
+            self._dirty = True
+
+    def get_cached_transcription(self, path):
+        """Return the cached transcription for a video, if any."""
+        path = self._managed_path(path)
+        if path is None:
+            return None
+        with self._lock:
+            # A compacted video is tracked under its audio-only sibling
+            entry = self._index.get(path) or self._index.get(os.path.splitext(path)[0] + AUDIO_EXTENSION)
+            return entry.get("transcription") if entry else None
+
+    def usage(self):
+        """Return the tracked disk usage in bytes and number of files."""
+        with self._lock:
+            return sum(e["size"] for e in self._index.values()), len(self._index)
+
+    def _scan(self):
+        """Register untracked files and forget ones deleted out from under us."""
+        found = set()
+        for root in self.storage_dirs:
+            try:
+                entries = list(os.scandir(root))
+            except OSError:
+                continue
+            for dir_entry in entries:
+                name = dir_entry.name.lower()
+                if not dir_entry.is_file():
+                    continue
+                if name.endswith(PARTIAL_SUFFIX):
+                    # Left behind by a crash while ffmpeg was writing
+                    if time.time() - dir_entry.stat().st_mtime > self.grace_seconds:
+                        self._remove(dir_entry.path)
+                    continue
+                if not (name.endswith(VIDEO_EXTENSIONS) or name.endswith(AUDIO_EXTENSION)):
+                    continue
+                found.add(dir_entry.path)
+                stat = dir_entry.stat()
+                with self._lock:
+                    entry = self._entry(dir_entry.path, stat)
+                    entry.update(size=stat.st_size, deleted=False)
+
+        now = time.time()
+        with self._lock:
+            for path, entry in list(self._index.items()):
+                if path in found:
+                    continue
+                if entry.get("transcription") and now - entry["last_access"] < self.transcript_ttl_seconds:
+                    if not entry.get("deleted"):
+                        entry.update(size=0, deleted=True)
+                        self._dirty = True
+                else:
+                    del self._index[path]
+                    self._dirty = True
+
+    def _compact(self, path):
+        """Replace a video with its audio track, returning the new path or None."""
+        audio_path = os.path.splitext(path)[0] + AUDIO_EXTENSION
+        # Written beside the final name and moved into place, so a crash never leaves a truncated file
+        tmp_path = audio_path + PARTIAL_SUFFIX
+        try:
+            subprocess.run(
+                ['ffmpeg', '-y', '-loglevel', 'error', '-i', path, '-vn', '-c:a', 'copy', '-f', 'webm', tmp_path],
+                check=True, timeout=120
+            )
+            os.replace(tmp_path, audio_path)
+            os.remove(path)
+            return audio_path
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.error("Error compacting video %s: %s", path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error("Error deleting video %s: %s", path, e)
+            return
+        preview_path = self.preview_path(path)
+        if not path.endswith(PREVIEW_SUFFIX) and os.path.exists(preview_path):
+            self._remove(preview_path)
+        with self._lock:
+            entry = self._index.get(path)
+            if entry is not None and entry.get("transcription"):
+                # Keep the cached transcription after the file is gone
+                entry.update(size=0, deleted=True)
+            else:
+                self._index.pop(path, None)
+            self._dirty = True
+
+    def sweep(self):
+        """Run one incremental pass, performing at most `batch_size` deletions or compactions."""
+        self._scan()
+        now = time.time()
+        budget = self.batch_size
+
+        with self._lock:
+            expired = sorted(
+                (e["last_access"], p) for p, e in self._index.items()
+                if e["transcribed"] and not e["audio_only"] and not e.get("deleted")
+                and now - e["last_access"] > self.retention_seconds
+            )
+
+        for _, path in expired[:budget]:
+            budget -= 1
+            audio_path = self._compact(path) if self.keep_audio else None
+            if audio_path is None:
+                self._remove(path)
+                continue
+            with self._lock:
+                entry = self._index.pop(path)
+                entry.update(size=os.path.getsize(audio_path), audio_only=True)
+                self._index[audio_path] = entry
+                self._dirty = True
+
+        if budget > 0:
+            with self._lock:
+                # Never transcribed and untouched for long: failed, orphaned or abandoned recordings
+                stale = sorted(
+                    (e["last_access"], p) for p, e in self._index.items()
+                    if not e["transcribed"] and not e.get("deleted")
+                    and now - e["last_access"] > self.max_age_seconds
+                )
+            for _, path in stale[:budget]:
+                budget -= 1
+                self._remove(path)
+
+        total, _ = self.usage()
+        if total > self.quota_bytes and budget > 0:
+            with self._lock:
+                # Least recently used first; only videos whose transcription is cached may go
+                candidates = sorted(
+                    (e["last_access"], p, e["size"]) for p, e in self._index.items()
+                    if (e["transcribed"] or e["audio_only"]) and not e.get("deleted")
+                    and now - e["last_access"] > self.grace_seconds
+                )
+            for _, path, size in candidates:
+                if total <= self.quota_bytes or budget <= 0:
+                    break
+                self._remove(path)
+                total -= size
+                budget -= 1
+            if total > self.quota_bytes and budget > 0:
+                # Candidates ran out before the quota was met: the rest are untranscribed or in use
+                logger.warning("Video storage is %.0f MB over its %.0f MB quota with nothing left to evict",
+                               (total - self.quota_bytes) / 1048576, self.quota_bytes / 1048576)
+
+        self._save_index()
+
+    def _run(self):
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error("Error sweeping video storage: %s", e)
+            time.sleep(self.sweep_interval)
+
+    def start(self):
+        """Start the background sweep thread if it is not already running."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run)
+            self._thread.daemon = True
+        self._thread.start()
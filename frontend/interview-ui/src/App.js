@@ -17,6 +17,7 @@ const App = () => {
   const [progress, setProgress] = useState(0);
   const [uploadedVideoPath, setUploadedVideoPath] = useState(null);
   const [loading, setLoading] = useState(false);
+  const [waitingStatus, setWaitingStatus] = useState(null);
 
   const predefinedRoles = [
     {
@@ -102,35 +103,105 @@ const App = () => {
         throw new Error('Cannot connect to backend. Please ensure the backend server is running.');
       }
 
-      // Start the interview
-      const response = await fetch(`${backendUrl}/api/start-interview`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          role_title: roleData.title,
-          role_description: roleData.description
-        }),
-      });
+      // Start the interview, rendering the greeting and questions as they stream in.
+      // At capacity the backend answers 202 with a waiting-room ticket instead; poll it
+      // until admitted, then start again with the ticket.
+      let ticketId = null;
+      let response;
+      while (true) {
+        response = await fetch(`${backendUrl}/api/start-interview/stream`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+          },
+          body: JSON.stringify({
+            role_title: roleData.title,
+            role_description: roleData.description,
+            ticket_id: ticketId
+          }),
+        });
+        if (response.status !== 202) break;
+
+        let ticket = await response.json();
+        ticketId = ticket.ticket_id;
+        while (ticket.status === 'waiting') {
+          setWaitingStatus(ticket);
+          await new Promise(resolve => setTimeout(resolve, 2000));
+          const ticketResponse = await fetch(`${backendUrl}/api/waiting-room/${ticketId}`);
+          if (!ticketResponse.ok) {
+            throw new Error('Your place in the waiting room expired. Please try again.');
+          }
+          ticket = await ticketResponse.json();
+        }
+      }
+      setWaitingStatus(null);
 
       if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
+        const data = await response.json().catch(() => ({}));
+        throw new Error(data.error || `HTTP error! status: ${response.status}`);
       }
 
-      const data = await response.json();
-      
-      if (data.status === 'success') {
-        setInterviewData({
-          ...data,
-          role_title: roleData.title,
-          role_description: roleData.description
-        });
-        setCurrentQuestionIndex(0);
-        setProgress((1 / data.total_questions) * 100);
-        setCurrentView('interview');
-      } else {
-        throw new Error(data.error || 'Failed to start interview');
+      const handleStartEvent = (event) => {
+        switch (event.type) {
+          case 'interview':
+            setInterviewData({
+              status: event.status,
+              interview_id: event.interview_id,
+              greeting: '',
+              questions: [],
+              total_questions: 0,
+              role_title: roleData.title,
+              role_description: roleData.description
+            });
+            setCurrentQuestionIndex(0);
+            setCurrentView('interview');
+            break;
+          case 'greeting_delta':
+            setInterviewData(prev => ({ ...prev, greeting: prev.greeting + event.text }));
+            break;
+          case 'greeting':
+            setInterviewData(prev => ({ ...prev, greeting: event.text }));
+            break;
+          case 'question':
+            setInterviewData(prev => ({
+              ...prev,
+              questions: [...prev.questions, event.text],
+              total_questions: prev.questions.length + 1
+            }));
+            break;
+          case 'done':
+            setInterviewData(prev => ({ ...prev, total_questions: event.total_questions }));
+            setProgress((1 / event.total_questions) * 100);
+            break;
+          default:
+            break;
+        }
+      };
+
+      // The body is newline-delimited JSON, one event per line
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let started = false;
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+
+        for (const line of lines) {
+          if (!line.trim()) continue;
+          const event = JSON.parse(line);
+          started = started || event.type === 'interview';
+          handleStartEvent(event);
+        }
+      }
+
+      if (!started) {
+        throw new Error('Failed to start interview');
       }
     } catch (error) {
       console.error('Error starting interview:', error);
@@ -142,6 +213,7 @@ const App = () => {
 
       alert(`Failed to start interview:\n\n${errorMessage}`);
     } finally {
+      setWaitingStatus(null);
       setLoading(false);
     }
   };
@@ -169,6 +241,8 @@ const App = () => {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          // Lets the backend recognise double clicks and retries of the same answer
+          'Idempotency-Key': `${interviewData.interview_id}:${currentQuestionIndex}:${uploadedVideoPath}`,
         },
         body: JSON.stringify({
           video_path: uploadedVideoPath
@@ -351,7 +425,9 @@ const App = () => {
           {loading ? (
             <>
               <div className="loading-spinner"></div>
-              Starting Interview...
+              {waitingStatus
+                ? `In line: position ${waitingStatus.position}, about ${Math.ceil(waitingStatus.estimated_wait_seconds / 60)} min`
+                : 'Starting Interview...'}
             </>
           ) : (
             <>
@@ -463,6 +539,8 @@ const App = () => {
         </div>
 
         <VideoRecorder 
+          interviewId={interviewData?.interview_id}
+          questionIndex={currentQuestionIndex}
           onVideoUploaded={handleVideoUploaded}
           onRecordingComplete={() => {}}
           onBack={() => handlePreviousQuestion()}
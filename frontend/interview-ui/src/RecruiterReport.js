@@ -70,6 +70,26 @@ const RecruiterReport = ({ onBack }) => {
         <h4>Question {index + 1}: {question.question_text || 'Unknown question'}</h4>
         
         <div className="question-details">
+          {question.video_path && (
+            <div className="detail-section">
+              <h5>Answer Video:</h5>
+              <video
+                className="answer-video"
+                controls
+                preload="metadata"
+                src={`${process.env.REACT_APP_BACKEND_URL || 'http://localhost:5000'}/api/video/${report.interview_id}/${index}?rendition=preview`}
+              />
+              {question.video_metrics && (
+                <p className="video-metrics">
+                  Camera on {Math.round(question.video_metrics.camera_presence_ratio * 100)}% of the time
+                  {question.video_metrics.face_in_frame_ratio !== null &&
+                    `, face in frame ${Math.round(question.video_metrics.face_in_frame_ratio * 100)}%`}
+                  , lighting {question.video_metrics.lighting}
+                </p>
+              )}
+            </div>
+          )}
+          
           <div className="detail-section">
             <h5>Video Transcription:</h5>
             <p>{transcription}</p>
@@ -124,6 +144,25 @@ const RecruiterReport = ({ onBack }) => {
                     <p>{evaluation.justification}</p>
                   </div>
                 )}
+
+                {evaluation.delivery_metrics && (
+                  <div className="evaluation-item">
+                    <strong>Delivery:</strong>
+                    <ul>
+                      {evaluation.delivery_metrics.words_per_minute !== undefined && (
+                        <li>{evaluation.delivery_metrics.words_per_minute} words per minute</li>
+                      )}
+                      <li>
+                        Spoke {Math.round(evaluation.delivery_metrics.speech_ratio * 100)}% of {evaluation.delivery_metrics.duration_seconds}s,
+                        {' '}{evaluation.delivery_metrics.pause_count} pauses ({evaluation.delivery_metrics.long_pause_count} over {evaluation.delivery_metrics.long_pause_seconds}s,
+                        longest {evaluation.delivery_metrics.longest_pause_seconds}s)
+                      </li>
+                      {evaluation.delivery_metrics.fillers_per_100_words !== undefined && (
+                        <li>{evaluation.delivery_metrics.fillers_per_100_words} filler words per 100 words</li>
+                      )}
+                    </ul>
+                  </div>
+                )}
               </div>
             ) : (
               <p>Evaluation not available</p>
@@ -3,7 +3,10 @@ import { motion, AnimatePresence } from 'framer-motion';
 import './VideoRecorder.css';
 import { Square, Mic, Video, Upload, CheckCircle, AlertCircle } from 'lucide-react';
 
-const VideoRecorder = ({ onVideoUploaded, onRecordingComplete, onBack, showBackButton = false }) => {
+// Chunks are streamed to the backend at this interval so transcription can start while recording
+const STREAM_TIMESLICE_MS = 1000;
+
+const VideoRecorder = ({ interviewId, questionIndex, onVideoUploaded, onRecordingComplete, onBack, showBackButton = false }) => {
   const [isRecording, setIsRecording] = useState(false);
   const [recordedChunks, setRecordedChunks] = useState([]);
   const [mediaRecorder, setMediaRecorder] = useState(null);
@@ -16,6 +19,8 @@ const VideoRecorder = ({ onVideoUploaded, onRecordingComplete, onBack, showBackB
   const videoRef = useRef(null);
   const chunksRef = useRef([]);
   const streamRef = useRef(null);
+  const recordingRef = useRef(null);
+  const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:5000';
 
   const startCamera = useCallback(async () => {
     try {
@@ -84,9 +89,18 @@ const VideoRecorder = ({ onVideoUploaded, onRecordingComplete, onBack, showBackB
         mimeType: 'video/webm;codecs=vp9,opus'
       });
       
+      recordingRef.current = {
+        id: `${Date.now()}-${Math.random().toString(36).slice(2)}`,
+        seq: 0,
+        startedAt: Date.now(),
+        uploads: [],
+        failed: false
+      };
+
       recorder.ondataavailable = (event) => {
         if (event.data.size > 0) {
           chunksRef.current.push(event.data);
+          streamChunk(event.data);
         }
       };
 
@@ -96,7 +110,7 @@ const VideoRecorder = ({ onVideoUploaded, onRecordingComplete, onBack, showBackB
         handleRecordingComplete(blob);
       };
 
-      recorder.start();
+      recorder.start(STREAM_TIMESLICE_MS);
       setMediaRecorder(recorder);
       setIsRecording(true);
     } catch (err) {
@@ -112,6 +126,47 @@ const VideoRecorder = ({ onVideoUploaded, onRecordingComplete, onBack, showBackB
     }
   };
 
+  const streamChunk = (chunk) => {
+    const recording = recordingRef.current;
+    if (!recording || !interviewId) return;
+
+    const seq = recording.seq++;
+    const endMs = Date.now() - recording.startedAt;
+    recording.uploads.push(
+      fetch(`${backendUrl}/api/stream-answer/${interviewId}/${questionIndex}/chunk?recording_id=${recording.id}&seq=${seq}&end_ms=${endMs}`, {
+        method: 'POST',
+        body: chunk
+      })
+        .then(response => {
+          if (!response.ok) recording.failed = true;
+        })
+        .catch(() => {
+          recording.failed = true;
+        })
+    );
+  };
+
+  const finishStreaming = async () => {
+    const recording = recordingRef.current;
+    recordingRef.current = null;
+    if (!recording || !interviewId) return null;
+
+    await Promise.all(recording.uploads);
+    if (recording.failed) return null;
+
+    try {
+      const response = await fetch(`${backendUrl}/api/stream-answer/${interviewId}/${questionIndex}/finish`, {
+        method: 'POST'
+      });
+      if (!response.ok) return null;
+      const data = await response.json();
+      return data.video_path || null;
+    } catch (err) {
+      console.error('Error finishing streamed recording:', err);
+      return null;
+    }
+  };
+
   const handleRecordingComplete = async (blob) => {
     setUploading(true);
     const filePath = await uploadVideo(blob);
@@ -130,25 +185,33 @@ const VideoRecorder = ({ onVideoUploaded, onRecordingComplete, onBack, showBackB
     setUploadProgress(0);
 
     try {
-      // Create a blob from the recorded chunks
-      const videoBlob = new Blob(chunksRef.current, { type: 'video/webm' });
-      
-      // For deployment, we'll simulate the upload process
-      // In a real deployment, you'd upload to a cloud service
-      const formData = new FormData();
-      formData.append('videoFile', videoBlob, `interview_answer_${Date.now()}.webm`);
-
-      // Simulate upload progress
-      for (let i = 0; i <= 100; i += 10) {
-        setUploadProgress(i);
-        await new Promise(resolve => setTimeout(resolve, 100));
-      }
+      // The recording was already streamed chunk by chunk while it was made
+      const streamedFilePath = await finishStreaming();
 
-      // Generate a mock file path for demo purposes
-      const mockFilePath = `/tmp/interview_answer_${Date.now()}.webm`;
-      
-      // Call the callback with the file path
-      onVideoUploaded(mockFilePath);
+      if (streamedFilePath) {
+        setUploadProgress(100);
+        onVideoUploaded(streamedFilePath);
+      } else {
+        // Create a blob from the recorded chunks
+        const videoBlob = new Blob(chunksRef.current, { type: 'video/webm' });
+        
+        // For deployment, we'll simulate the upload process
+        // In a real deployment, you'd upload to a cloud service
+        const formData = new FormData();
+        formData.append('videoFile', videoBlob, `interview_answer_${Date.now()}.webm`);
+
+        // Simulate upload progress
+        for (let i = 0; i <= 100; i += 10) {
+          setUploadProgress(i);
+          await new Promise(resolve => setTimeout(resolve, 100));
+        }
+
+        // Generate a mock file path for demo purposes
+        const mockFilePath = `/tmp/interview_answer_${Date.now()}.webm`;
+        
+        // Call the callback with the file path
+        onVideoUploaded(mockFilePath);
+      }
       
       // Reset recording state
       chunksRef.current = [];